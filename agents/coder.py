@@ -4,6 +4,16 @@ from tools.sqlite_analyze_db_tool import analyze_sqlite_database
 from tools.sqlite_query_tool import execute_sqlite_query
 from tools.sqlite_execute_ddl_tool import execute_sqlite_ddl
 from tools.sqlite_execute_any_tool import execute_any_sql
+from tools.sqlite_export_tool import export_query_to_file
+from tools.sqlite_fts_tool import create_fulltext_index, search_fulltext
+from tools.sqlite_index_advisor_tool import advise_sqlite_indexes
+from tools.sqlite_migrate_tool import migrate_sqlite_schema
+from tools.sqlite_memory_tools import (
+    get_current_db_tool,
+    recall_facts_tool,
+    remember_fact_tool,
+    set_current_db_tool,
+)
 
 
 coder = Agent(
@@ -15,7 +25,16 @@ coder = Agent(
         analyze_sqlite_database, 
         execute_sqlite_query, 
         execute_sqlite_ddl,
-        execute_any_sql
+        execute_any_sql,
+        export_query_to_file,
+        create_fulltext_index,
+        search_fulltext,
+        advise_sqlite_indexes,
+        migrate_sqlite_schema,
+        set_current_db_tool,
+        get_current_db_tool,
+        remember_fact_tool,
+        recall_facts_tool
         ],  # ✅ passa a função decorada
     verbose=True
 )
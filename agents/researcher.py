@@ -1,4 +1,5 @@
 from crewai import Agent
+from tools.sqlite_memory_tools import recall_facts_tool, remember_fact_tool
 
 researcher = Agent(
     role="Researcher Agent",
@@ -7,5 +8,6 @@ researcher = Agent(
         "Você é um pesquisador técnico detalhista, focado em encontrar "
         "as melhores soluções de engenharia disponíveis."
     ),
+    tools=[recall_facts_tool, remember_fact_tool],  # achados compartilhados com o coder via memória
     verbose=True
 )
@@ -1,6 +1,36 @@
+import time
+
+_PROCESS_STARTED = time.perf_counter()
+
+import logging
+import os
+import queue
 import re
-import gradio as gr
-from main import run_devcrew_task
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+# main é leve: crewai, agentes e tools só são carregados no aquecimento ou no 1º pedido
+from main import run_devcrew_task, warmup
+from runtime.tracing import tracer
+from tools.sqlite_memory_store import memory
+from tools.sqlite_query_guard import query_guard
+
+logger = logging.getLogger("devcrew.startup")
+
+# Número máximo de execuções da Crew em paralelo (demais pedidos aguardam na fila)
+MAX_CONCURRENCY = int(os.getenv("DEVCREW_MAX_CONCURRENCY", "4"))
+# Tamanho máximo da fila de pedidos do Gradio (0 = ilimitada)
+MAX_QUEUE_SIZE = int(os.getenv("DEVCREW_MAX_QUEUE_SIZE", "32"))
+# Intervalo (segundos) entre atualizações do Chatbot enquanto a Crew executa
+_POLL_INTERVAL = 0.5
+# Aquecimento dos agentes: 'background' (padrão; depois que a UI já está ouvindo),
+# 'eager' (antes de abrir a porta) ou 'off' (no primeiro pedido)
+WARMUP_MODE = os.getenv("DEVCREW_WARMUP", "background").strip().lower()
+
+# Os workers do executor são as vagas de execução: pedidos além de MAX_CONCURRENCY esperam na fila dele
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="devcrew-run")
+
 
 def clean_markdown(text: str) -> str:
     """Garante que blocos de código e markdown sejam válidos para o Chatbot."""
@@ -18,24 +48,152 @@ def clean_markdown(text: str) -> str:
     text = re.sub(r"```(\w+)?", "```\\1\n", text)
     return text
 
-def chat_interface(user_input, history):
-    """Executa a CrewAI e retorna resposta formatada ao Chatbot."""
+
+def format_step(step) -> str:
+    """Resume um passo intermediário da Crew (ação de agente/tool ou resposta final)."""
+    tool_name = getattr(step, "tool", None)
+    if tool_name:
+        tool_input = str(getattr(step, "tool_input", "") or "")
+        if len(tool_input) > 120:
+            tool_input = tool_input[:117] + "..."
+        return f"🔧 `{tool_name}` ← {tool_input}"
+    thought = str(getattr(step, "thought", "") or getattr(step, "output", "") or step).strip()
+    first_line = thought.splitlines()[0] if thought else "..."
+    if len(first_line) > 120:
+        first_line = first_line[:117] + "..."
+    return f"💭 {first_line}"
+
+
+def _progress_text(steps, queued: bool) -> str:
+    if queued:
+        return "⏳ Aguardando na fila de execução..."
+    lines = ["⏳ Executando agentes..."]
+    lines += [f"{i}. {s}" for i, s in enumerate(steps, 1)]
+    return "\n".join(lines)
+
+
+def _run_request(user_input: str, events: "queue.Queue", started: threading.Event, scope: str,
+                 session_id: Optional[str] = None) -> str:
+    # Executado por um worker do executor: a partir daqui o pedido saiu da fila
+    started.set()
+    # Consultas SQLite deste pedido ficam associadas ao escopo (canceláveis pela UI);
+    # a memória (banco ativo, fatos) fica isolada no namespace da sessão do usuário
+    with query_guard.cancel_scope(scope), memory.session(session_id):
+        return run_devcrew_task(user_input, step_callback=events.put)
+
+
+def cancel_request(session):
+    """Interrompe as consultas SQLite em andamento do pedido atual desta sessão."""
+    scope = (session or {}).get("scope")
+    if scope:
+        query_guard.cancel(scope)
+
+
+def chat_interface(user_input, history, session=None):
+    """
+    Executa a CrewAI em segundo plano e transmite os passos intermediários ao Chatbot.
+
+    É um gerador: cada `yield` atualiza o Chatbot, de modo que o usuário vê o primeiro
+    passo dos agentes sem esperar o fim da execução, e o worker do Gradio não fica
+    preso a um único pedido.
+    """
+    history = history or []
+    history.append((user_input, _progress_text([], queued=True)))
+    yield "", history
+
+    events: "queue.Queue" = queue.Queue()
+    started = threading.Event()
+    scope = query_guard.new_scope()
+    session_id = None
+    if session is not None:
+        session["scope"] = scope
+        session_id = session.setdefault("id", uuid.uuid4().hex)
+    future = _executor.submit(_run_request, user_input, events, started, scope, session_id)
+    steps = []
+    was_started = False
+
     try:
-        response = run_devcrew_task(user_input)
+        while True:
+            done = future.done()
+            changed = started.is_set() and not was_started
+            was_started = started.is_set()
+            while True:
+                try:
+                    steps.append(format_step(events.get_nowait()))
+                    changed = True
+                except queue.Empty:
+                    break
+            if done:
+                break
+            if changed:
+                history[-1] = (user_input, _progress_text(steps, queued=not was_started))
+                yield "", history
+            try:
+                future.result(timeout=_POLL_INTERVAL)
+            except Exception:
+                pass  # o resultado (ou erro) é tratado após o loop
+
+        response = future.result()
         clean_response = clean_markdown(response)
-        history.append((user_input, clean_response))
+        history[-1] = (user_input, clean_response)
     except Exception as e:
-        history.append((user_input, f"⚠️ Erro: {str(e)}"))
-    return "", history
+        history[-1] = (user_input, f"⚠️ Erro: {str(e)}")
+    yield "", history
+
+
+def build_demo():
+    """
+    Monta a interface Gradio. Só a UI é montada aqui: crewai, agentes e tools continuam
+    carregados no aquecimento ou no 1º pedido (main.run_devcrew_task / main.warmup).
+    """
+    import gradio as gr
+
+    with gr.Blocks() as demo:
+        gr.Markdown("# 🤖 DevCrew AI — Seu time de agentes de desenvolvimento")
+        chatbot = gr.Chatbot(label="DevCrew Chat", render_markdown=True)
+        msg = gr.Textbox(
+            placeholder="Descreva a tarefa (ex: 'gerar API em Go com JWT')",
+            label="Envie uma instrução para seus agentes"
+        )
+
+        session = gr.State({})
+        cancel = gr.Button("⏹️ Cancelar consulta")
+
+        msg.submit(chat_interface, [msg, chatbot, session], [msg, chatbot])
+        cancel.click(cancel_request, [session], None)
+
+    demo.queue(default_concurrency_limit=MAX_CONCURRENCY, max_size=MAX_QUEUE_SIZE or None)
+    return demo
+
+
+# ✅ Interface no nível do módulo (`gradio app.py`, montagem em outro servidor, testes);
+# main() só a abre. UI_BUILD_MS (importação do gradio + montagem) alimenta o benchmark
+_ui_started = time.perf_counter()
+demo = build_demo()
+UI_BUILD_MS = (time.perf_counter() - _ui_started) * 1000
+
+
+def _warmup_in_background() -> None:
+    try:
+        elapsed = warmup()
+        logger.info("warmup concluído em %.0f ms (pronto para o 1º pedido em %.0f ms)",
+                    elapsed, (time.perf_counter() - _PROCESS_STARTED) * 1000)
+    except Exception:
+        # Falhas de aquecimento reaparecem (e são reportadas) no primeiro pedido
+        logger.exception("falha no aquecimento em segundo plano")
+
 
-with gr.Blocks() as demo:
-    gr.Markdown("# 🤖 DevCrew AI — Seu time de agentes de desenvolvimento")
-    chatbot = gr.Chatbot(label="DevCrew Chat", render_markdown=True)
-    msg = gr.Textbox(
-        placeholder="Descreva a tarefa (ex: 'gerar API em Go com JWT')",
-        label="Envie uma instrução para seus agentes"
-    )
+def main() -> None:
+    if WARMUP_MODE == "eager":
+        _warmup_in_background()
+    demo.launch(prevent_thread_lock=True)
+    listen_ms = (time.perf_counter() - _PROCESS_STARTED) * 1000
+    tracer.record("startup.listen", kind="startup", duration_ms=listen_ms, warmup=WARMUP_MODE)
+    logger.info("UI ouvindo em %.0f ms (warmup=%s)", listen_ms, WARMUP_MODE)
+    if WARMUP_MODE == "background":
+        threading.Thread(target=_warmup_in_background, name="devcrew-warmup", daemon=True).start()
+    demo.block_thread()
 
-    msg.submit(chat_interface, [msg, chatbot], [msg, chatbot])
 
-demo.launch()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark do overhead por pedido: Crew reconstruída a cada prompt vs. CrewRuntime aquecido.
+
+Mede apenas a preparação do pedido (construção de Task/Crew, ou checkout de um slot
+e interpolação das entradas), sem chamar o LLM.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_crew_runtime --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+# Evita que a criação do LLM padrão falhe por ausência de chave (nenhuma chamada é feita)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from crewai import Crew, Task  # noqa: E402
+
+from agents.coder import coder  # noqa: E402
+from runtime.crew_runtime import CrewRuntime  # noqa: E402
+
+_PROMPT = "liste os usuários da tabela users em devcrew.db"
+_EXPECTED = "Interação com o banco SQLite: criação, inserção ou listagem de dados."
+
+
+def _rebuild_per_request() -> None:
+    # Caminho antigo de run_devcrew_task: Task e Crew novas a cada prompt
+    task = Task(description=_PROMPT, expected_output=_EXPECTED, agent=coder)
+    crew = Crew(agents=[coder], tasks=[task], verbose=False)
+    crew._interpolate_inputs({"prompt": _PROMPT})
+
+
+def _make_runtime_request(runtime: CrewRuntime):
+    def run() -> None:
+        slot = runtime._slots.get()
+        try:
+            slot.crew._interpolate_inputs({"prompt": _PROMPT, "expected": _EXPECTED})
+        finally:
+            runtime._slots.put(slot)
+    return run
+
+
+def _measure(fn, requests: int):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "requests": requests,
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    runtime = CrewRuntime(agent=coder, size=args.pool_size, verbose=False)
+    startup_ms = (time.perf_counter() - started) * 1000
+
+    rebuild = _measure(_rebuild_per_request, args.requests)
+    warm = _measure(_make_runtime_request(runtime), args.requests)
+
+    print(json.dumps({
+        "benchmark": "crew_runtime",
+        "runtime_startup_ms": round(startup_ms, 1),
+        "rebuild_per_request": rebuild,
+        "warm_runtime": warm,
+        "speedup_mean": round(rebuild["mean_us"] / warm["mean_us"], 1) if warm["mean_us"] else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
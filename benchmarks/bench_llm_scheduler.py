@@ -0,0 +1,137 @@
+"""
+Agendador de chamadas ao LLM (runtime.llm_scheduler) contra o LLM falso, sem rede.
+
+Simula vários usuários chamando o modelo ao mesmo tempo. O servidor falso
+(benchmarks.fake_llm_server) responde 429 com Retry-After a cada N chamadas
+(--fail-every). Compara dois modos:
+
+- direct: chamadas diretas, sem fila nem novas tentativas (cada 429 vira erro, que
+  no app repetiria a Crew inteira);
+- scheduled: as mesmas chamadas pelo LLMScheduler (concorrência limitada, baldes de
+  requisições/tokens, backoff com jitter e coalescência de prompts idênticos).
+
+Reporta tempo de parede, erros, chamadas que chegaram ao provedor, maior
+concorrência vista pelo servidor e as métricas do agendador (fila e espera).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_llm_scheduler --users 16 --calls 10 --fail-every 7
+    python -m benchmarks.bench_llm_scheduler --rpm 600 --max-concurrency 4 --distinct 3
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import write_results
+from benchmarks.fake_llm_server import FakeLLMServer
+from runtime.llm_scheduler import LLMScheduler
+
+
+class ProviderError(Exception):
+    """Erro HTTP do provedor, com o status e os cabeçalhos (como os SDKs expõem)."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers})()
+
+
+def make_client(base_url: str, model: str = "fake-model"):
+    """Cliente mínimo compatível com a API de chat da OpenAI (mesma assinatura de `llm.call`)."""
+
+    def call(messages: List[Dict[str, Any]], **kwargs: Any) -> str:
+        body = json.dumps({"model": model, "messages": messages}).encode("utf-8")
+        request = urllib.request.Request(f"{base_url}/chat/completions", data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise ProviderError(e.code, {k.lower(): v for k, v in e.headers.items()}, e.reason)
+        return payload["choices"][0]["message"]["content"]
+
+    return call
+
+
+def run_mode(server: FakeLLMServer, users: int, calls: int, distinct: int,
+             scheduler: Optional[LLMScheduler]) -> Dict[str, Any]:
+    client = make_client(server.base_url)
+    errors = 0
+
+    def user(index: int) -> None:
+        nonlocal errors
+        for step in range(calls):
+            # Usuários no mesmo passo enviam um dos `distinct` prompts: simula pedidos repetidos
+            messages = [{"role": "user", "content": f"[bench:scheduler] passo {step} prompt {index % distinct}"}]
+            try:
+                if scheduler is None:
+                    client(messages)
+                else:
+                    scheduler.submit(client, messages, model="fake-model")
+            except Exception:
+                errors += 1
+
+    server.state.max_in_flight = 0
+    calls_before, limited_before = server.calls, server.state.rate_limited
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(user, range(users)))
+    wall_ms = (time.perf_counter() - started) * 1000
+    result = {
+        "wall_ms": round(wall_ms, 1),
+        "requests": users * calls,
+        "errors": errors,
+        "provider_calls": server.calls - calls_before,
+        "rate_limited_429": server.state.rate_limited - limited_before,
+        "server_max_in_flight": server.max_in_flight,
+    }
+    if scheduler is not None:
+        result["scheduler"] = scheduler.stats()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=16, help="usuários simultâneos")
+    parser.add_argument("--calls", type=int, default=10, help="chamadas ao LLM por usuário")
+    parser.add_argument("--distinct", type=int, default=4, help="prompts distintos por passo (coalescência)")
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0, help="atraso simulado por chamada")
+    parser.add_argument("--fail-every", type=int, default=7, help="429 a cada N chamadas (0 = nunca)")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After (s) das respostas 429")
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=0.0, help="requisições por minuto (0 = sem limite)")
+    parser.add_argument("--tpm", type=float, default=0.0, help="tokens por minuto (0 = sem limite)")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with FakeLLMServer(latency_ms=args.llm_latency_ms, fail_every=args.fail_every,
+                       retry_after=args.retry_after) as server:
+        results["direct"] = run_mode(server, args.users, args.calls, args.distinct, None)
+        scheduler = LLMScheduler(max_concurrency=args.max_concurrency, requests_per_minute=args.rpm,
+                                 tokens_per_minute=args.tpm, max_retries=args.max_retries,
+                                 backoff_base=0.05, backoff_max=2.0)
+        results["scheduled"] = run_mode(server, args.users, args.calls, args.distinct, scheduler)
+
+    for mode, stats in results.items():
+        print(f"  {mode:<10} parede={stats['wall_ms']:>9.1f} ms  erros={stats['errors']:<4} "
+              f"provedor={stats['provider_calls']:<4} 429={stats['rate_limited_429']:<4} "
+              f"concorrência máx.={stats['server_max_in_flight']}")
+    sched = results["scheduled"]["scheduler"]
+    print(f"  agendador: coalescidas={sched['coalesced']} novas tentativas={sched['retries']} "
+          f"fila máx.={sched['max_queue_depth']} espera p50={sched['wait_ms_p50']} ms "
+          f"p95={sched['wait_ms_p95']} ms")
+
+    path = write_results("llm_scheduler", {
+        "settings": vars(args),
+        "results": results,
+    }, args.output)
+    print(json.dumps({"results_file": path}))
+
+
+if __name__ == "__main__":
+    main()
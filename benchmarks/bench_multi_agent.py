@@ -0,0 +1,114 @@
+"""
+Compara o tempo de parede do modo multiagente com o caminho de agente único, sem rede.
+
+Usa o LLM falso (benchmarks.fake_llm_server) com latência simulada por chamada e a
+task de referência de tasks/build_api.py. No modo 'single' o coder faz pesquisa e
+código em sequência; no modo 'multi' o planner divide o pedido e as subtarefas de
+pesquisa e código rodam em paralelo (limitadas por DEVCREW_LLM_MAX_CONCURRENCY).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_multi_agent --llm-latency-ms 200 --requests 5
+    python -m benchmarks.bench_multi_agent --llm-concurrency 2 --concurrency 1,4
+"""
+import argparse
+import functools
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_pipeline import _configure_env, _run_level
+from benchmarks.common import max_rss_kb, write_results
+from benchmarks.datasets import SIZES, ensure_dataset
+from benchmarks.fake_llm_server import FakeLLMServer, Script, action_step, final_step
+
+_RESEARCH_ANSWER = "Use net/http e github.com/golang-jwt/jwt/v5; assine com HS256 e expire em 15 min."
+_CODE_ANSWER = "package main\n\nfunc main() { /* POST /login → JWT */ }"
+
+
+def build_scripts(request: str) -> List[Script]:
+    """
+    Roteiros do LLM falso. A ordem importa: as mensagens das subtarefas também contêm
+    o pedido original, então os marcadores das subtarefas vêm antes.
+    """
+    marker = request[:40]
+    plan = json.dumps([
+        {"kind": "research", "description": "[bench:multi-research] Pesquise bibliotecas JWT para Go"},
+        {"kind": "code", "description": "[bench:multi-code] Implemente o endpoint de login"},
+    ], ensure_ascii=False)
+    return [
+        Script("[bench:multi-research]", [
+            action_step("Recall Facts", {"query": "jwt"}, thought="Verifico o que já foi levantado"),
+            final_step(_RESEARCH_ANSWER),
+        ]),
+        Script("[bench:multi-code]", [
+            action_step("Get Current SQLite Database", {}, thought="Confiro o banco de usuários"),
+            final_step(_CODE_ANSWER),
+        ]),
+        Script("Divida o pedido", [final_step(plan)]),
+        # Agente único: os mesmos passos de pesquisa e código, um após o outro
+        Script(marker, [
+            action_step("Recall Facts", {"query": "jwt"}, thought="Verifico o que já foi levantado"),
+            action_step("Get Current SQLite Database", {}, thought="Confiro o banco de usuários"),
+            final_step(f"{_RESEARCH_ANSWER}\n\n{_CODE_ANSWER}"),
+        ]),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="1k", choices=list(SIZES))
+    parser.add_argument("--requests", type=int, default=5, help="pedidos por modo e nível")
+    parser.add_argument("--concurrency", default="1", help="pedidos simultâneos (lista separada por vírgula)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="atraso simulado por chamada ao LLM")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="chamadas simultâneas ao LLM")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    db = ensure_dataset(args.size, "narrow")
+    from tasks.build_api import build_api_task  # task de referência do repositório
+    request = build_api_task.description
+
+    with FakeLLMServer(build_scripts(request), latency_ms=args.llm_latency_ms) as server:
+        _configure_env(server, db, max(levels), prompt_cache=False)
+        os.environ["DEVCREW_LLM_MAX_CONCURRENCY"] = str(args.llm_concurrency)
+        os.environ["DEVCREW_MULTI_AGENT_WORKERS"] = str(max(levels) * 2)
+        from main import get_multi_agent_pipeline, run_devcrew_task  # noqa: E402
+
+        started = time.perf_counter()
+        get_multi_agent_pipeline()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        results: Dict[str, Any] = {}
+        for mode in ("single", "multi"):
+            task = functools.partial(run_devcrew_task, mode=mode)
+            task(request)  # aquecimento
+            results[mode] = {}
+            for level in levels:
+                stats = _run_level(task, request, args.requests, level, server)
+                results[mode][f"c{level}"] = stats
+                print(f"  {mode:<7} c={level:<3} p50={stats['p50_ms']:>10.3f} ms  "
+                      f"p95={stats['p95_ms']:>10.3f} ms  {stats['throughput_rps']:>8.2f} req/s  "
+                      f"llm/pedido={stats['llm_calls_per_request']}")
+
+    speedup = {
+        level: round(results["single"][level]["p50_ms"] / results["multi"][level]["p50_ms"], 2)
+        for level in results["single"] if results["multi"][level]["p50_ms"]
+    }
+    print(f"  speedup p50 (single/multi): {speedup}")
+    path = write_results("multi_agent", {
+        "settings": {
+            "size": args.size, "requests": args.requests, "concurrency": levels,
+            "llm_latency_ms": args.llm_latency_ms, "llm_concurrency": args.llm_concurrency,
+        },
+        "build_multi_agent_ms": round(build_ms, 1),
+        "max_rss_kb": max_rss_kb(),
+        "results": results,
+        "speedup_p50": speedup,
+    }, args.output)
+    print(json.dumps({"results_file": path}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark do encoder de saída das tools: formato antigo (json.dumps com indent=2)
+vs. formatos compactos (columnar, tsv, preview).
+
+Mede o tamanho da saída (bytes e ~tokens) e o tempo de codificação sobre um banco
+SQLite sintético em memória, sem orçamento de bytes (para comparar o custo integral).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_output_encoder --rows 2000 --repeat 5
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import time
+
+from tools.sqlite_output_encoder import BYTES_PER_TOKEN, format_query_result
+
+_SQL = "SELECT id, name, email, age, active, created_at FROM users;"
+_FORMATS = ("columnar", "tsv", "preview")
+
+
+def _make_db(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT, "
+        "age INTEGER, active INTEGER, created_at TEXT);"
+    )
+    conn.executemany(
+        "INSERT INTO users (name, email, age, active, created_at) VALUES (?, ?, ?, ?, ?);",
+        (
+            (f"Usuário {i}", f"user{i}@example.com", 18 + i % 60, i % 2, f"2024-01-{1 + i % 28:02d} 10:00:00")
+            for i in range(rows)
+        ),
+    )
+    return conn
+
+
+def _legacy(conn: sqlite3.Connection) -> str:
+    # Formatação original de execute_sqlite_query
+    cursor = conn.execute(_SQL)
+    columns = [desc[0] for desc in cursor.description]
+    results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return f"📊 Resultado da consulta:\n\n{json.dumps(results, indent=2, ensure_ascii=False)}"
+
+
+def _encoded(conn: sqlite3.Connection, fmt: str) -> str:
+    return format_query_result(conn.execute(_SQL), fmt, max_bytes=1 << 40)
+
+
+def _measure(fn, repeat: int):
+    samples = []
+    output = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    size = len(output.encode("utf-8"))
+    return {
+        "bytes": size,
+        "approx_tokens": size // BYTES_PER_TOKEN,
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "min_ms": round(min(samples), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    conn = _make_db(args.rows)
+    results = {"legacy_json_indent2": _measure(lambda: _legacy(conn), args.repeat)}
+    for fmt in _FORMATS:
+        results[fmt] = _measure(lambda fmt=fmt: _encoded(conn, fmt), args.repeat)
+
+    legacy_bytes = results["legacy_json_indent2"]["bytes"]
+    for name, data in results.items():
+        data["size_ratio"] = round(data["bytes"] / legacy_bytes, 3) if legacy_bytes else None
+
+    print(json.dumps({"benchmark": "output_encoder", "rows": args.rows, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark ponta a ponta de main.run_devcrew_task, sem rede.
+
+Sobe o LLM falso (benchmarks.fake_llm_server) com roteiros fixos de chamadas de
+tool, aponta o CrewAI para ele (OPENAI_API_BASE) e executa cenários que passam pelo
+roteador local (sem LLM) e pela Crew (com 0, 1 ou 2 chamadas de tool), em vários
+níveis de concorrência. Mede latência por pedido, vazão e chamadas ao LLM por pedido.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_pipeline --size 100k --requests 20 --concurrency 1,4
+    python -m benchmarks.bench_pipeline --llm-latency-ms 200 --output pipeline.json
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.common import max_rss_kb, write_results
+from benchmarks.datasets import SIZES, ensure_dataset
+from benchmarks.fake_llm_server import FakeLLMServer, Script, action_step, final_step
+from runtime.trace_report import percentile
+
+_AGGREGATE_SQL = "SELECT category, COUNT(*) AS n FROM items GROUP BY category;"
+_TOP_SQL = "SELECT id, name, value FROM items ORDER BY value DESC LIMIT 5;"
+
+
+def build_scripts(db: str) -> List[Script]:
+    """Roteiros do LLM falso; o marcador [bench:...] impede o atalho do roteador local."""
+    return [
+        Script("[bench:aggregate]", [
+            action_step("SQLite Query Executor", {"db_name": db, "sql": _AGGREGATE_SQL}),
+            final_step("Contagem por categoria calculada."),
+        ]),
+        Script("[bench:analyze-query]", [
+            action_step("SQLite Analyze Database", {"db_name": db}, thought="Preciso conhecer o esquema"),
+            action_step("SQLite Query Executor", {"db_name": db, "sql": _TOP_SQL}),
+            final_step("Os 5 itens de maior valor foram listados."),
+        ]),
+        Script("[bench:go]", [
+            final_step("package main\n\nfunc main() {}"),
+        ]),
+    ]
+
+
+def build_scenarios(db: str) -> List[Tuple[str, str]]:
+    return [
+        ("router_list_tables", f"list tables in {db}"),
+        ("router_count", f"count items in {db}"),
+        ("router_select", "SELECT category, COUNT(*) FROM items GROUP BY category"),
+        ("crew_one_tool", "[bench:aggregate] Quantos itens existem por categoria na tabela items?"),
+        ("crew_two_tools", "[bench:analyze-query] Analise o banco e liste os 5 itens de maior valor"),
+        ("crew_no_tool", "[bench:go] Escreva um programa Go mínimo"),
+    ]
+
+
+def _configure_env(server: FakeLLMServer, db: str, concurrency: int, prompt_cache: bool) -> None:
+    # Precisa acontecer antes de importar main (agentes, LLM e runtime leem o ambiente)
+    os.environ["OPENAI_API_KEY"] = "sk-fake-benchmark"
+    os.environ["OPENAI_API_BASE"] = server.base_url
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    os.environ["DEVCREW_DEFAULT_DB"] = db
+    os.environ["DEVCREW_MAX_CONCURRENCY"] = str(concurrency)
+    os.environ["DEVCREW_PROMPT_CACHE"] = "1" if prompt_cache else "0"
+    os.environ.setdefault("DEVCREW_TRACING", "0")
+
+
+def _run_level(task: Callable[[str], str], prompt: str, requests: int, concurrency: int,
+               server: FakeLLMServer) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    def one(_: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            result = task(prompt)
+            if isinstance(result, str) and result.startswith(("⚠️", "🚫")):
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    calls_before = server.calls
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "throughput_rps": round(requests / wall, 2) if wall else None,
+        "llm_calls_per_request": round((server.calls - calls_before) / requests, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="100k", choices=list(SIZES))
+    parser.add_argument("--requests", type=int, default=20, help="pedidos por cenário e nível")
+    parser.add_argument("--concurrency", default="1,4")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="atraso simulado por chamada ao LLM")
+    parser.add_argument("--prompt-cache", action="store_true", help="mantém o cache de prompts ligado")
+    parser.add_argument("--only", default=None, help="lista de cenários separados por vírgula")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    db = ensure_dataset(args.size, "narrow")
+
+    with FakeLLMServer(build_scripts(db), latency_ms=args.llm_latency_ms) as server:
+        _configure_env(server, db, max(levels), args.prompt_cache)
+        started = time.perf_counter()
+        from main import run_devcrew_task  # noqa: E402  (import após configurar o ambiente)
+        import_ms = (time.perf_counter() - started) * 1000
+
+        results: Dict[str, Any] = {}
+        for name, prompt in build_scenarios(db):
+            if only and name not in only:
+                continue
+            run_devcrew_task(prompt)  # aquecimento
+            results[name] = {}
+            for level in levels:
+                stats = _run_level(run_devcrew_task, prompt, args.requests, level, server)
+                results[name][f"c{level}"] = stats
+                print(f"  {name:<20} c={level:<3} p50={stats['p50_ms']:>10.3f} ms  "
+                      f"p95={stats['p95_ms']:>10.3f} ms  {stats['throughput_rps']:>8.2f} req/s  "
+                      f"llm/pedido={stats['llm_calls_per_request']}")
+
+    path = write_results("pipeline", {
+        "settings": {
+            "size": args.size, "requests": args.requests, "concurrency": levels,
+            "llm_latency_ms": args.llm_latency_ms, "prompt_cache": args.prompt_cache,
+        },
+        "import_main_ms": round(import_ms, 1),
+        "max_rss_kb": max_rss_kb(),
+        "results": results,
+    }, args.output)
+    print(json.dumps({"results_file": path}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Relatório de inicialização (cold start) do app, no estilo `python -X importtime`.
+
+Cada execução roda em um processo Python novo com `-X importtime` e mede as fases
+até o app estar pronto:
+
+- interpreter_ms: processo Python vazio (referência);
+- import_app_ms: `import app` sem a interface (main, roteador, caches; sem crewai);
+- build_ui_ms: importação do gradio e montagem de `app.demo`, feita na importação
+  de app (o que antecede abrir a porta);
+- time_to_listen_ms: import_app_ms + build_ui_ms;
+- warmup_ms: crewai, agentes, tools e Crews (`main.warmup`, em segundo plano no app);
+- time_to_ready_ms: tempo até o primeiro pedido da Crew ser atendido sem custo extra.
+
+Também agrega o custo de importação (self) por pacote raiz, a partir da saída do
+`-X importtime`. Os tempos são a mediana das execuções; compare com
+benchmarks.compare para evitar regressões ou use --budget-ms como gate.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_startup --runs 5 --top 15
+    python -m benchmarks.bench_startup --budget-ms 1500 --listen-budget-ms 400
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.common import write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Executado no processo filho: imprime as fases em JSON na última linha do stdout
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+warmup_ms = app.warmup()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_app_ms": (t1 - t0) * 1000 - app.UI_BUILD_MS,
+    "build_ui_ms": app.UI_BUILD_MS,
+    "warmup_ms": warmup_ms,
+    "total_ms": (t2 - t0) * 1000,
+}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DEVCREW_TRACING", "0")
+    # Construir agentes não chama o LLM, mas alguns provedores exigem uma chave
+    env.setdefault("OPENAI_API_KEY", "sk-fake-startup")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (ROOT, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Linhas do -X importtime como (módulo, self_us, cumulative_us, nível)."""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def by_root_package(entries: List[Tuple[str, int, int, int]]) -> Dict[str, float]:
+    """Soma o tempo próprio (ms) de importação por pacote raiz (ex.: 'crewai', 'gradio')."""
+    totals: Dict[str, float] = defaultdict(float)
+    for module, self_us, _, _ in entries:
+        totals[module.split(".")[0]] += self_us / 1000
+    return dict(totals)
+
+
+def run_once() -> Tuple[Dict[str, float], Dict[str, float]]:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True, env=_child_env())
+    interpreter_ms = (time.perf_counter() - started) * 1000
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=ROOT, env=_child_env(), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"processo de inicialização falhou:\n{proc.stderr[-2000:]}")
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases["interpreter_ms"] = interpreter_ms
+    phases["time_to_listen_ms"] = phases["import_app_ms"] + phases["build_ui_ms"]
+    phases["time_to_ready_ms"] = phases["total_ms"]
+    return phases, by_root_package(parse_importtime(proc.stderr))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="processos medidos (mediana)")
+    parser.add_argument("--top", type=int, default=15, help="pacotes mais caros exibidos")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="falha (código 1) se time_to_ready_ms passar deste valor")
+    parser.add_argument("--listen-budget-ms", type=float, default=None,
+                        help="falha (código 1) se time_to_listen_ms passar deste valor")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(max(args.runs, 1))]
+    phases = {
+        name: round(statistics.median(r[0][name] for r in runs), 1)
+        for name in ("interpreter_ms", "import_app_ms", "build_ui_ms", "time_to_listen_ms",
+                     "warmup_ms", "time_to_ready_ms")
+    }
+    packages = defaultdict(list)
+    for _, per_package in runs:
+        for name, ms in per_package.items():
+            packages[name].append(ms)
+    top = sorted(
+        ((name, round(statistics.median(values), 1)) for name, values in packages.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    for name, value in phases.items():
+        print(f"  {name:<20} {value:>10.1f} ms")
+    print("  importação (self) por pacote:")
+    for name, value in top:
+        print(f"    {name:<28} {value:>10.1f} ms")
+
+    path = write_results("startup", {
+        "settings": {"runs": args.runs},
+        "results": {"phases": phases},
+        "import_self_ms_by_package": dict(top),
+    }, args.output)
+    print(json.dumps({"results_file": path}))
+
+    failed = []
+    if args.budget_ms is not None and phases["time_to_ready_ms"] > args.budget_ms:
+        failed.append(f"time_to_ready_ms={phases['time_to_ready_ms']} > {args.budget_ms:g}")
+    if args.listen_budget_ms is not None and phases["time_to_listen_ms"] > args.listen_budget_ms:
+        failed.append(f"time_to_listen_ms={phases['time_to_listen_ms']} > {args.listen_budget_ms:g}")
+    if failed:
+        print("🚫 Orçamento de inicialização excedido: " + "; ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
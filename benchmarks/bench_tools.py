@@ -0,0 +1,138 @@
+"""
+Benchmark das tools SQLite sobre bancos sintéticos (benchmarks.datasets).
+
+Para cada banco (tamanho x formato) mede latência (média, p50, p95), vazão
+(operações/s e linhas/s quando o volume processado é conhecido) e pico de memória
+alocada (tracemalloc) de cada cenário. O cache de resultados das tools é esvaziado
+antes de cada execução, salvo com --warm-cache.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.bench_tools --sizes 1k,100k --shapes narrow,wide --repeat 5
+    python -m benchmarks.bench_tools --sizes 10m --shapes narrow --repeat 3 --output base.json
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Benchmarks medem as tools, não o tracing (pode ser religado com DEVCREW_TRACING=1)
+os.environ.setdefault("DEVCREW_TRACING", "0")
+
+from benchmarks.common import max_rss_kb, measure, write_results  # noqa: E402
+from benchmarks.datasets import SIZES, ensure_dataset, parse_shapes, parse_sizes  # noqa: E402
+from tools.sqlite_analyze_db_tool import analyze_sqlite_database  # noqa: E402
+from tools.sqlite_connection_pool import pool  # noqa: E402
+from tools.sqlite_execute_any_tool import execute_any_sql  # noqa: E402
+from tools.sqlite_generic_insert_tool import insert_into_table  # noqa: E402
+from tools.sqlite_query_tool import execute_sqlite_query  # noqa: E402
+from tools.sqlite_result_cache import result_cache  # noqa: E402
+
+INSERT_BATCH = 1000
+
+Scenario = Tuple[str, Callable[[], Any], Optional[int]]
+
+
+def _call(tool_obj: Any, **kwargs: Any) -> str:
+    run = tool_obj.run if hasattr(tool_obj, "run") else tool_obj
+    result = run(**kwargs)
+    if isinstance(result, str) and result.startswith(("⚠️", "🚫")):
+        raise RuntimeError(result.splitlines()[0])
+    return result
+
+
+def _scenarios(db: str, rows: int, shape: str, scratch_db: str) -> List[Scenario]:
+    """(nome, função, linhas processadas por execução ou None)."""
+    mid = max(rows // 2, 1)
+    group_col = "category" if shape == "narrow" else "c00 % 50"
+    value_col = "value" if shape == "narrow" else "c02"
+    aggregate = f"SELECT {group_col} AS grp, COUNT(*) AS n, AVG({value_col}) AS media FROM items GROUP BY grp;"
+    records = [
+        {"name": f"bench_{i}", "email": f"b{i}@example.com", "category": i % 50, "value": i / 10}
+        for i in range(INSERT_BATCH)
+    ]
+    return [
+        ("query_point_lookup",
+         lambda: _call(execute_sqlite_query, db_name=db, sql=f"SELECT * FROM items WHERE id = {mid};"), 1),
+        ("query_page_200",
+         lambda: _call(execute_sqlite_query, db_name=db, sql="SELECT * FROM items;", limit=200), 200),
+        ("query_keyset_page_200",
+         lambda: _call(execute_sqlite_query, db_name=db, sql="SELECT * FROM items;", limit=200,
+                       keyset_column="id"), 200),
+        ("query_aggregate",
+         lambda: _call(execute_sqlite_query, db_name=db, sql=aggregate), rows),
+        ("query_full_scan_budgeted",
+         lambda: _call(execute_sqlite_query, db_name=db, sql="SELECT * FROM items;"), None),
+        ("execute_any_select",
+         lambda: _call(execute_any_sql, db_name=db, sql=aggregate), rows),
+        ("analyze_fast",
+         lambda: _call(analyze_sqlite_database, db_name=db), None),
+        ("analyze_exact_counts",
+         lambda: _call(analyze_sqlite_database, db_name=db, exact_counts=True), rows),
+        ("insert_bulk_1000",
+         lambda: _call(insert_into_table, db_name=scratch_db, table_name="items", record=records), INSERT_BATCH),
+    ]
+
+
+def _make_scratch_db(directory: str) -> str:
+    # Inserções vão para um banco descartável com o formato 'narrow' (o dataset fica intacto)
+    path = os.path.join(directory, "scratch.db")
+    _call(execute_any_sql, db_name=path, sql=(
+        "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT, "
+        "category INTEGER NOT NULL, value REAL, created_at TEXT);"
+    ))
+    return path
+
+
+def run(sizes: List[str], shapes: List[str], repeat: int, warm_cache: bool,
+        only: Optional[List[str]] = None) -> Dict[str, Any]:
+    before_each = None if warm_cache else result_cache.cache.clear
+    results: Dict[str, Any] = {}
+    scratch_dir = tempfile.mkdtemp(prefix="devcrew-bench-")
+    try:
+        scratch_db = _make_scratch_db(scratch_dir)
+        for shape in shapes:
+            for size in sizes:
+                db = ensure_dataset(size, shape)
+                rows = SIZES[size]
+                dataset = f"{shape}_{size}"
+                results[dataset] = {"rows": rows, "file_bytes": os.path.getsize(db), "scenarios": {}}
+                for name, fn, processed in _scenarios(db, rows, shape, scratch_db):
+                    if only and name not in only:
+                        continue
+                    stats = measure(fn, repeat, warmup=1, before_each=before_each)
+                    if processed and stats["mean_ms"]:
+                        stats["rows_per_s"] = round(processed / (stats["mean_ms"] / 1000), 1)
+                    results[dataset]["scenarios"][name] = stats
+                    print(f"  {dataset:<12} {name:<26} p50={stats['p50_ms']:>10.3f} ms  "
+                          f"p95={stats['p95_ms']:>10.3f} ms  pico={stats['peak_alloc_bytes'] / 1024:>9.1f} KB")
+                pool.close_all()
+    finally:
+        pool.close_all()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k", help=f"tamanhos ({', '.join(SIZES)})")
+    parser.add_argument("--shapes", default="narrow,wide")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default=None, help="lista de cenários separados por vírgula")
+    parser.add_argument("--warm-cache", action="store_true", help="mantém o cache de resultados entre execuções")
+    parser.add_argument("--output", default=None, help="arquivo JSON de saída")
+    args = parser.parse_args()
+
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    results = run(parse_sizes(args.sizes), parse_shapes(args.shapes), args.repeat, args.warm_cache, only)
+    path = write_results("tools", {
+        "settings": {"repeat": args.repeat, "warm_cache": args.warm_cache},
+        "max_rss_kb": max_rss_kb(),
+        "results": results,
+    }, args.output)
+    print(json.dumps({"results_file": path}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Utilitários compartilhados pela suíte de benchmarks (medição, metadados e gravação
+dos resultados em JSON).
+"""
+import datetime
+import json
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+from runtime.trace_report import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1,
+            before_each: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Executa `fn` `repeat` vezes (após `warmup` execuções descartadas) e devolve as
+    estatísticas de latência. O pico de memória é medido em uma execução extra com
+    tracemalloc, para não distorcer os tempos.
+    """
+    for _ in range(warmup):
+        if before_each:
+            before_each()
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+
+    if before_each:
+        before_each()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.fmean(samples)
+    return {
+        "repeat": repeat,
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "max_ms": round(samples[-1], 3),
+        "ops_per_s": round(1000 / mean, 2) if mean else None,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Metadados do ambiente, gravados junto dos resultados para comparações justas."""
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+        "argv": sys.argv[1:],
+    }
+
+
+def max_rss_kb() -> int:
+    """Pico de memória residente do processo (KB no Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def write_results(name: str, payload: Dict[str, Any], output: Optional[str] = None) -> str:
+    """Grava os resultados em JSON (padrão: benchmarks/results/<name>-<timestamp>.json)."""
+    if output is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+    document = {"benchmark": name, "environment": environment(), **payload}
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(document, fh, indent=2, ensure_ascii=False)
+    return output
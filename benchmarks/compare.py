@@ -0,0 +1,94 @@
+"""
+Compara dois arquivos de resultados da suíte de benchmarks (mesmo benchmark).
+
+Cada métrica numérica é classificada pelo sufixo: latência/memória (_ms, _bytes,
+_kb) piora quando sobe; vazão (_per_s, _rps) piora quando desce. Variações acima
+de --threshold (%) são marcadas como regressão ou melhoria.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.compare base.json novo.json --threshold 10 --fail-on-regression
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+_LOWER_IS_BETTER = ("_ms", "_bytes", "_kb")
+_HIGHER_IS_BETTER = ("_per_s", "_rps")
+
+
+def _flatten(data: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+
+def _direction(metric: str) -> Optional[int]:
+    """+1: maior é melhor; -1: menor é melhor; None: métrica informativa."""
+    name = metric.rsplit(".", 1)[-1]
+    if name.endswith(_HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(_LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    base_metrics = dict(_flatten(base.get("results", {})))
+    new_metrics = dict(_flatten(new.get("results", {})))
+    rows = []
+    for metric in sorted(base_metrics.keys() & new_metrics.keys()):
+        direction = _direction(metric)
+        if direction is None:
+            continue
+        old, cur = base_metrics[metric], new_metrics[metric]
+        change = ((cur - old) / old * 100) if old else 0.0
+        status = "="
+        if abs(change) >= threshold:
+            status = "melhor" if change * direction > 0 else "REGRESSÃO"
+        rows.append({"metric": metric, "base": old, "new": cur, "change_pct": round(change, 1), "status": status})
+    return {
+        "rows": rows,
+        "regressions": sum(1 for r in rows if r["status"] == "REGRESSÃO"),
+        "improvements": sum(1 for r in rows if r["status"] == "melhor"),
+        "only_in_base": sorted(base_metrics.keys() - new_metrics.keys()),
+        "only_in_new": sorted(new_metrics.keys() - base_metrics.keys()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="variação mínima (%%) para marcar")
+    parser.add_argument("--all", action="store_true", help="mostra também as métricas sem variação relevante")
+    parser.add_argument("--fail-on-regression", action="store_true", help="sai com código 1 se houver regressão")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.new, encoding="utf-8") as fh:
+        new = json.load(fh)
+    if base.get("benchmark") != new.get("benchmark"):
+        print(f"⚠️ Benchmarks diferentes: {base.get('benchmark')} x {new.get('benchmark')}")
+
+    report = compare(base, new, args.threshold)
+    base_commit = base.get("environment", {}).get("git_commit")
+    new_commit = new.get("environment", {}).get("git_commit")
+    print(f"📊 {base.get('benchmark')}: {base_commit} → {new_commit} (limiar {args.threshold:g}%)")
+    width = max((len(r["metric"]) for r in report["rows"]), default=10)
+    for r in report["rows"]:
+        if r["status"] == "=" and not args.all:
+            continue
+        print(f"  {r['metric']:<{width}}  {r['base']:>12.3f}  {r['new']:>12.3f}  {r['change_pct']:>+7.1f}%  {r['status']}")
+    print(f"\n{report['regressions']} regressões, {report['improvements']} melhorias, "
+          f"{len(report['rows'])} métricas comparadas.")
+
+    if args.fail_on_regression and report["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
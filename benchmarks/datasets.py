@@ -0,0 +1,143 @@
+"""
+Geração de bancos SQLite sintéticos e determinísticos para os benchmarks.
+
+Formatos:
+    - narrow: tabela `items` com 6 colunas (id, name, email, category, value, created_at)
+    - wide:   tabela `items` com id + 40 colunas alternando INTEGER, TEXT e REAL
+
+Os dados são gerados inteiramente no SQLite (CTE recursiva), então mesmo 10M de
+linhas ficam prontas em segundos. Os arquivos ficam em benchmarks/data/ e são
+reaproveitados entre execuções enquanto os parâmetros não mudarem.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.datasets --sizes 1k,100k,10m --shapes narrow,wide
+"""
+import argparse
+import os
+import sqlite3
+from typing import Dict, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+SIZES: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+SHAPES = ("narrow", "wide")
+WIDE_COLUMNS = 40
+CATEGORIES = 50
+
+# Versão do gerador: muda quando o conteúdo gerado muda (força a recriação dos arquivos)
+_GENERATOR_VERSION = 1
+
+
+def parse_sizes(value: str) -> List[str]:
+    sizes = [s.strip().lower() for s in value.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise ValueError(f"tamanhos desconhecidos: {unknown} (use {', '.join(SIZES)})")
+    return sizes
+
+
+def parse_shapes(value: str) -> List[str]:
+    shapes = [s.strip().lower() for s in value.split(",") if s.strip()]
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown:
+        raise ValueError(f"formatos desconhecidos: {unknown} (use {', '.join(SHAPES)})")
+    return shapes
+
+
+def _wide_column_sql(index: int) -> str:
+    kind = index % 3
+    if kind == 0:
+        return f"(n * {index + 7}) % 100000"
+    if kind == 1:
+        return f"'v{index}_' || (n % {97 + index})"
+    return f"round(((n * {index + 3}) % 10000) / 7.0, 3)"
+
+
+def _wide_column_type(index: int) -> str:
+    return ("INTEGER", "TEXT", "REAL")[index % 3]
+
+
+def _create_sql(shape: str) -> str:
+    if shape == "narrow":
+        return (
+            "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT, "
+            "category INTEGER NOT NULL, value REAL, created_at TEXT);"
+        )
+    cols = ", ".join(f"c{i:02d} {_wide_column_type(i)}" for i in range(WIDE_COLUMNS))
+    return f"CREATE TABLE items (id INTEGER PRIMARY KEY, {cols});"
+
+
+def _insert_sql(shape: str, rows: int) -> str:
+    seq = f"WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < {rows}) "
+    if shape == "narrow":
+        return (
+            seq + "INSERT INTO items (id, name, email, category, value, created_at) "
+            "SELECT n, 'user_' || n, 'user' || n || '@example.com', n % " + str(CATEGORIES) + ", "
+            "round(((n * 7919) % 100000) / 100.0, 2), date('2024-01-01', '+' || (n % 365) || ' days') FROM seq;"
+        )
+    cols = ", ".join(f"c{i:02d}" for i in range(WIDE_COLUMNS))
+    exprs = ", ".join(_wide_column_sql(i) for i in range(WIDE_COLUMNS))
+    return seq + f"INSERT INTO items (id, {cols}) SELECT n, {exprs} FROM seq;"
+
+
+def dataset_path(size: str, shape: str) -> str:
+    return os.path.join(DATA_DIR, f"bench_{shape}_{size}.db")
+
+
+def ensure_dataset(size: str, shape: str) -> str:
+    """Cria (se necessário) e devolve o caminho do banco sintético `size`/`shape`."""
+    path = dataset_path(size, shape)
+    rows = SIZES[size]
+    marker = f"{_GENERATOR_VERSION}:{shape}:{rows}"
+
+    if os.path.exists(path):
+        try:
+            conn = sqlite3.connect(path)
+            try:
+                found = conn.execute("SELECT value FROM bench_meta WHERE key = 'marker';").fetchone()
+            finally:
+                conn.close()
+            if found and found[0] == marker:
+                return path
+        except sqlite3.Error:
+            pass
+        os.remove(path)
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Carga única e descartável: durabilidade desligada
+        conn.execute("PRAGMA journal_mode = OFF;")
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.execute("PRAGMA cache_size = -262144;")
+        conn.execute(_create_sql(shape))
+        conn.execute(_insert_sql(shape, rows))
+        if shape == "narrow":
+            conn.execute("CREATE INDEX idx_items_category ON items(category);")
+        conn.execute("CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT);")
+        conn.execute("INSERT INTO bench_meta VALUES ('marker', ?);", (marker,))
+        conn.commit()
+        conn.execute("ANALYZE;")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k")
+    parser.add_argument("--shapes", default="narrow,wide")
+    args = parser.parse_args()
+    for shape in parse_shapes(args.shapes):
+        for size in parse_sizes(args.sizes):
+            path = ensure_dataset(size, shape)
+            print(f"✅ {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
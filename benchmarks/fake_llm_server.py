@@ -0,0 +1,232 @@
+"""
+Servidor LLM falso, local e determinístico, compatível com a API de chat da OpenAI.
+
+Responde a POST /v1/chat/completions reproduzindo roteiros (scripts) de respostas
+no formato ReAct usado pelos agentes do CrewAI ("Action: ... / Action Input: ..." e,
+por fim, "Final Answer: ..."). O roteiro é escolhido pelo texto das mensagens do
+usuário e o passo atual é o número de respostas do assistente já presentes na
+conversa. Assim o pipeline completo roda sem rede e sempre com as mesmas chamadas
+de tool.
+
+Para exercitar novas tentativas, `fail_every=N` faz uma a cada N chamadas responder
+429 (limite de taxa) com o cabeçalho Retry-After.
+
+Uso isolado (a partir da raiz do repositório):
+    python -m benchmarks.fake_llm_server --port 8765 --latency-ms 50
+    python -m benchmarks.fake_llm_server --fail-every 5 --retry-after 0.2
+"""
+import argparse
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+BYTES_PER_TOKEN = 4
+DEFAULT_FINAL_ANSWER = "Thought: I now know the final answer\nFinal Answer: ok"
+
+
+@dataclass
+class Script:
+    """Roteiro de respostas: usado quando `match` aparece em alguma mensagem do usuário."""
+
+    match: str
+    steps: List[str]
+
+
+@dataclass
+class FakeLLMState:
+    scripts: List[Script] = field(default_factory=list)
+    latency_ms: float = 0.0
+    fail_every: int = 0
+    retry_after: float = 0.0
+    calls: int = 0
+    rate_limited: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def action_step(tool_name: str, tool_input: Dict[str, Any], thought: str = "Preciso consultar o banco") -> str:
+    """Resposta ReAct que pede a execução de uma tool."""
+    return f"Thought: {thought}\nAction: {tool_name}\nAction Input: {json.dumps(tool_input, ensure_ascii=False)}"
+
+
+def final_step(answer: str) -> str:
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(str(part.get("text", "")) if isinstance(part, dict) else str(part) for part in content)
+    return str(content or "")
+
+
+def choose_reply(state: FakeLLMState, messages: List[Dict[str, Any]]) -> str:
+    user_text = " ".join(_content_text(m.get("content")) for m in messages if m.get("role") == "user")
+    step = sum(1 for m in messages if m.get("role") == "assistant")
+    for script in state.scripts:
+        if script.match in user_text:
+            return script.steps[step] if step < len(script.steps) else script.steps[-1]
+    return DEFAULT_FINAL_ANSWER
+
+
+def _usage(messages: List[Dict[str, Any]], reply: str) -> Dict[str, int]:
+    prompt = sum(len(_content_text(m.get("content"))) for m in messages) // BYTES_PER_TOKEN
+    completion = len(reply) // BYTES_PER_TOKEN
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _make_handler(state: FakeLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args: Any) -> None:  # silencioso durante os benchmarks
+            pass
+
+        def _send_json(self, status: int, payload: Dict[str, Any],
+                       headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+            else:
+                self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            messages = request.get("messages") or []
+
+            with state.lock:
+                state.calls += 1
+                call_id = state.calls
+                throttled = bool(state.fail_every) and call_id % state.fail_every == 0
+                if throttled:
+                    state.rate_limited += 1
+                else:
+                    state.in_flight += 1
+                    state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            if throttled:
+                self._send_json(429, {"error": {"message": "rate limit exceeded (fake)", "type": "rate_limit"}},
+                                {"Retry-After": f"{state.retry_after:g}"})
+                return
+            try:
+                if state.latency_ms:
+                    time.sleep(state.latency_ms / 1000)
+                self._reply(call_id, request, messages)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _reply(self, call_id: int, request: Dict[str, Any], messages: List[Dict[str, Any]]) -> None:
+            reply = choose_reply(state, messages)
+            model = request.get("model", "fake-model")
+            usage = _usage(messages, reply)
+
+            if request.get("stream"):
+                self._stream(call_id, model, reply, usage)
+                return
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{call_id}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        def _stream(self, call_id: int, model: str, reply: str, usage: Dict[str, int]) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            base = {"id": f"chatcmpl-fake-{call_id}", "object": "chat.completion.chunk", "created": 0, "model": model}
+            chunks = [
+                {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": reply},
+                                      "finish_reason": None}]},
+                {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage},
+            ]
+            for chunk in chunks:
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+class FakeLLMServer:
+    """Servidor em thread própria; use como context manager ou com start()/stop()."""
+
+    def __init__(self, scripts: Optional[List[Script]] = None, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, fail_every: int = 0, retry_after: float = 0.0):
+        self.state = FakeLLMState(scripts=list(scripts or []), latency_ms=latency_ms,
+                                  fail_every=max(int(fail_every), 0), retry_after=retry_after)
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self.state))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def calls(self) -> int:
+        return self.state.calls
+
+    @property
+    def max_in_flight(self) -> int:
+        """Maior número de chamadas atendidas ao mesmo tempo (exclui as respostas 429)."""
+        return self.state.max_in_flight
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0, help="responde 429 a cada N chamadas")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After (s) das respostas 429")
+    args = parser.parse_args()
+    server = FakeLLMServer(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                           fail_every=args.fail_every, retry_after=args.retry_after).start()
+    print(f"🤖 LLM falso em {server.base_url} (Ctrl+C para encerrar)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
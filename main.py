@@ -1,35 +1,130 @@
-from crewai import Crew, Task
-from agents.coder import coder
+import os
+import threading
+import time
+from typing import Callable, Optional
+from runtime.crew_runtime import CrewRuntime
+from runtime.multi_agent import MULTI_AGENT_WORKERS, MultiAgentPipeline
+from runtime.intent_router import router
+from runtime.response_cache import prompt_cache
+from runtime.tracing import text_attrs, tracer
+from tools.sqlite_query_guard import query_guard
 
-def run_devcrew_task(user_input: str) -> str:
+# ✅ Runtime de longa duração: agentes, tools e Crews são construídos uma única vez,
+# sob demanda (primeiro pedido ou `warmup`), e não na importação do módulo
+_crew_runtime: Optional[CrewRuntime] = None
+_crew_runtime_lock = threading.Lock()
+
+# Modo de execução padrão: 'single' (apenas o coder) ou 'multi' (planner + researcher + coder)
+AGENT_MODE = os.getenv("DEVCREW_AGENT_MODE", "single").strip().lower()
+AGENT_MODES = ("single", "multi")
+
+_multi_agent_pipeline: Optional[MultiAgentPipeline] = None
+_multi_agent_lock = threading.Lock()
+
+
+def get_crew_runtime() -> CrewRuntime:
+    """Constrói (uma única vez, sob demanda) o agente coder, suas tools e as Crews aquecidas."""
+    global _crew_runtime
+    if _crew_runtime is None:
+        with _crew_runtime_lock:
+            if _crew_runtime is None:
+                # Import tardio: crewai, agentes e tools só carregam no primeiro uso
+                from agents.coder import coder
+
+                _crew_runtime = CrewRuntime(agent=coder)
+    return _crew_runtime
+
+
+def get_multi_agent_pipeline() -> MultiAgentPipeline:
+    """Constrói (uma única vez, sob demanda) as Crews do planner e do researcher."""
+    global _multi_agent_pipeline
+    if _multi_agent_pipeline is None:
+        with _multi_agent_lock:
+            if _multi_agent_pipeline is None:
+                from agents.planner import planner
+                from agents.researcher import researcher
+
+                # O coder reutiliza o runtime do modo single (mesmas Crews aquecidas)
+                _multi_agent_pipeline = MultiAgentPipeline(
+                    planner=CrewRuntime(agent=planner),
+                    runtimes={
+                        "research": CrewRuntime(agent=researcher, size=MULTI_AGENT_WORKERS),
+                        "code": get_crew_runtime(),
+                    },
+                )
+    return _multi_agent_pipeline
+
+
+def run_devcrew_task(user_input: str, step_callback: Optional[Callable] = None,
+                     mode: Optional[str] = None) -> str:
     """
     Executa o fluxo principal do DevCrew-AI.
     Permite gerar código em Golang e interagir com bancos SQLite.
+
+    Args:
+        user_input (str): instrução enviada pelo usuário.
+        step_callback (callable, optional): chamado a cada passo intermediário dos
+            agentes (ação/tool ou resposta final), permitindo transmitir o progresso à UI.
+        mode (str, optional): 'single' ou 'multi'; padrão DEVCREW_AGENT_MODE.
+    """
+    mode = (mode or AGENT_MODE).strip().lower()
+    if mode not in AGENT_MODES:
+        return f"⚠️ Modo de execução inválido: '{mode}'. Use 'single' ou 'multi'."
+
+    # Cada pedido gera um trace (request → cache, roteador, kickoff, passos, LLM, tools)
+    with tracer.span("run_devcrew_task", kind="request", **text_attrs("prompt", user_input)) as request_span:
+        # 1º nível do cache: prompts repetidos sobre o mesmo estado dos bancos
+        with tracer.span("prompt_cache.lookup"):
+            cached, cache_token = prompt_cache.lookup(user_input, variant=mode)
+        if cached is not None:
+            request_span.set(route="prompt_cache")
+            return cached
+
+        # Roteador local: pedidos simples de SQLite vão direto para a tool, sem LLM
+        with tracer.span("router.route"):
+            decision = router.route(user_input)
+        request_span.set(route=decision.route)
+        if decision.direct:
+            return decision.execute()
+
+        request_span.set(mode=mode)
+        if mode == "multi":
+            # Planner divide o pedido; pesquisa e código rodam em paralelo e são reunidos
+            result = get_multi_agent_pipeline().run(user_input, decision.expected_output,
+                                                    step_callback=step_callback)
+        else:
+            # Executa o pedido em uma Crew já aquecida (task-modelo interpolada com as entradas)
+            result = get_crew_runtime().run(user_input, decision.expected_output, step_callback=step_callback)
+
+        # Normaliza o retorno
+        if isinstance(result, str):
+            response = result
+        elif hasattr(result, "raw"):
+            response = str(result.raw)
+        elif hasattr(result, "output"):
+            response = str(result.output)
+        else:
+            response = str(result)
+
+        # Respostas de pedidos cancelados pela UI não vão para o cache
+        if not query_guard.is_cancelled():
+            prompt_cache.store(cache_token, response)
+        request_span.set(bytes=len(response.encode("utf-8")))
+        return response
+
+
+def warmup(mode: Optional[str] = None) -> float:
+    """
+    Constrói antecipadamente o que o primeiro pedido usaria (crewai, agentes, tools e
+    Crews). Chamado em segundo plano pela UI depois que o servidor já está ouvindo.
+    Retorna o tempo gasto, em milissegundos.
     """
-    # Detecta tipo de intenção (simples, mas eficaz)
-    lower_input = user_input.lower()
-    if any(x in lower_input for x in ["create table", "insert into", "select", "sqlite", "banco", "tabela", "usuário", "users"]):
-        expected = "Interação com o banco SQLite: criação, inserção ou listagem de dados."
-    elif any(x in lower_input for x in ["golang", "go code", "package main", "func main", "api", "endpoint", "struct"]):
-        expected = "Geração de código em Golang conforme solicitado."
-    else:
-        expected = "Ação relacionada a código ou banco de dados."
-
-    # Define a task dinâmica
-    task = Task(
-        description=user_input,
-        expected_output=expected,
-        agent=coder,
-    )
-
-    # Executa o Crew
-    crew = Crew(agents=[coder], tasks=[task], verbose=True)
-    result = crew.kickoff(inputs={"prompt": user_input})
-
-    # Normaliza o retorno
-    if hasattr(result, "raw"):
-        return str(result.raw)
-    elif hasattr(result, "output"):
-        return str(result.output)
-    else:
-        return str(result)
+    started = time.perf_counter()
+    with tracer.span("warmup", kind="startup", mode=mode or AGENT_MODE):
+        get_crew_runtime()
+        if (mode or AGENT_MODE) == "multi":
+            get_multi_agent_pipeline()
+        # Tools despachadas diretamente pelo roteador local
+        import tools.sqlite_analyze_db_tool  # noqa: F401
+        import tools.sqlite_query_tool  # noqa: F401
+    return (time.perf_counter() - started) * 1000
@@ -0,0 +1,141 @@
+# runtime/crew_runtime.py
+import os
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from runtime.llm_scheduler import LLMScheduler, llm_scheduler, schedule_llm
+from runtime.tracing import instrument_llm, tracer, usage_attrs
+
+# Quantidade de Crews mantidas prontas (uma por execução simultânea)
+DEFAULT_POOL_SIZE = int(os.getenv("DEVCREW_MAX_CONCURRENCY", "4"))
+
+# A descrição e o resultado esperado são interpolados a cada pedido via kickoff(inputs=...)
+_TASK_DESCRIPTION = "{prompt}"
+_TASK_EXPECTED_OUTPUT = "{expected}"
+
+if TYPE_CHECKING:  # crewai é pesado: importado só quando o primeiro runtime é construído
+    from crewai import Agent, Crew
+
+
+class _CrewSlot:
+    """Uma Crew pronta com seus próprios agentes (isolados das demais execuções)."""
+
+    __slots__ = ("crew", "agents")
+
+    def __init__(self, crew: "Crew", agents: List["Agent"]):
+        self.crew = crew
+        self.agents = agents
+
+
+class CrewRuntime:
+    """
+    Runtime de longa duração da Crew.
+
+    Agentes, tools e clientes de LLM são construídos uma única vez, na criação do
+    runtime, e mantidos "aquecidos" em um pool de Crews. Cada pedido pega uma Crew
+    livre, executa a task-modelo com as entradas do pedido e a devolve ao pool.
+    Como cada slot possui cópias próprias dos agentes, pedidos simultâneos não
+    compartilham estado (callbacks, histórico do executor ou saídas das tasks).
+    """
+
+    def __init__(self, agent: "Agent", size: int = DEFAULT_POOL_SIZE, verbose: bool = True,
+                 scheduler: Optional[LLMScheduler] = None):
+        self.size = max(int(size), 1)
+        self.verbose = verbose
+        self.scheduler = scheduler or llm_scheduler
+        self._template_agent = agent
+        self._slots: "queue.Queue[_CrewSlot]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._agents: List["Agent"] = []
+        for index in range(self.size):
+            slot = self._build_slot(index)
+            self._agents.extend(slot.agents)
+            self._slots.put(slot)
+
+    def _build_slot(self, index: int) -> _CrewSlot:
+        from crewai import Crew, Task
+
+        # O primeiro slot usa o próprio agente; os demais usam cópias independentes
+        agent = self._template_agent if index == 0 else self._template_agent.copy()
+        # Cada chamada ao modelo passa pelo agendador global (fila, limites de taxa,
+        # novas tentativas) e vira um span 'llm' (agentes copiados compartilham o LLM)
+        if getattr(agent, "llm", None) is not None and not isinstance(agent.llm, str):
+            schedule_llm(agent.llm, self.scheduler)
+            instrument_llm(agent.llm)
+        task = Task(
+            description=_TASK_DESCRIPTION,
+            expected_output=_TASK_EXPECTED_OUTPUT,
+            agent=agent,
+        )
+        crew = Crew(agents=[agent], tasks=[task], verbose=self.verbose)
+        return _CrewSlot(crew, [agent])
+
+    @staticmethod
+    def _traced_steps(step_callback: Optional[Callable]) -> Optional[Callable]:
+        """Registra um span 'agent_step' por passo (tempo desde o passo anterior)."""
+        if not tracer.enabled:
+            return step_callback
+        last = [time.perf_counter()]
+
+        def on_step(step: Any) -> None:
+            now = time.perf_counter()
+            tracer.record(
+                "agent.step", kind="agent_step", duration_ms=(now - last[0]) * 1000,
+                step=type(step).__name__, tool=getattr(step, "tool", None),
+            )
+            last[0] = now
+            if step_callback is not None:
+                step_callback(step)
+
+        return on_step
+
+    def run(self, user_input: str, expected_output: str,
+            step_callback: Optional[Callable] = None,
+            extra_inputs: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Executa um pedido em uma Crew aquecida, bloqueando até que haja um slot livre.
+
+        Args:
+            user_input (str): descrição da task (prompt do usuário).
+            expected_output (str): resultado esperado da task.
+            step_callback (callable, optional): callback de passos exclusivo deste pedido.
+            extra_inputs (dict, optional): entradas adicionais para interpolação.
+
+        Returns:
+            O resultado bruto de `crew.kickoff`.
+        """
+        slot = self._slots.get()
+        try:
+            # Callbacks são definidos por pedido e removidos ao final, para não vazar
+            # entre execuções que reutilizam o mesmo slot
+            callback = self._traced_steps(step_callback)
+            slot.crew.step_callback = callback
+            for agent in slot.agents:
+                agent.step_callback = callback
+
+            inputs = {"prompt": user_input, "expected": expected_output}
+            if extra_inputs:
+                inputs.update(extra_inputs)
+            with tracer.span("crew.kickoff") as span:
+                result = slot.crew.kickoff(inputs=inputs)
+                # Totais exatos de tokens do pedido (soma de todas as chamadas ao LLM)
+                usage = getattr(result, "token_usage", None) or getattr(slot.crew, "usage_metrics", None)
+                span.set(**usage_attrs(usage))
+            return result
+        finally:
+            slot.crew.step_callback = None
+            for agent in slot.agents:
+                agent.step_callback = None
+            self._slots.put(slot)
+
+    @property
+    def agents(self) -> List["Agent"]:
+        """Todos os agentes do pool (um por slot)."""
+        return list(self._agents)
+
+    @property
+    def available(self) -> int:
+        """Número de slots livres no momento."""
+        return self._slots.qsize()
@@ -0,0 +1,217 @@
+# runtime/intent_router.py
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("devcrew.router")
+
+# Linhas retornadas ao listar uma tabela diretamente (sem LLM)
+DIRECT_LIST_LIMIT = int(os.getenv("DEVCREW_ROUTER_LIST_LIMIT", "50"))
+
+_DB = r"(?:\s+(?:in|of|from|on|no|na|do|da|de|em)\s+(?:the\s+|o\s+)?(?:(?:database|db|banco)\s+)?(?P<{g}>[\w./-]+?\.db))?"
+
+# Autômato único: todas as rotas diretas em uma só regex com grupos nomeados.
+# A ordem das alternativas define a prioridade (ex.: "list tables" antes de "list <tabela>").
+_ROUTES = re.compile(
+    "|".join([
+        # listar tabelas
+        r"(?P<list_tables>(?:list(?:ar|e)?|show|mostr(?:ar|e)|quais(?:\s+são)?)\s+"
+        r"(?:all\s+|the\s+|todas\s+)?(?:as\s+)?(?:tables|tabelas)" + _DB.format(g="db_lt") + r")",
+        # esquema / análise do banco
+        r"(?P<schema>(?:show\s+|mostr(?:ar|e)\s+|analy[sz]e\s+|analis(?:ar|e)\s+)?(?:the\s+|o\s+)?"
+        r"(?:schema|esquema|estrutura)(?:\s+(?:of|do|da|de)\s+(?:the\s+|o\s+)?(?:(?:database|db|banco)\s+)?"
+        r"(?P<db_sc>[\w./-]+?\.db))?)",
+        # descrever uma tabela
+        r"(?P<describe>(?:describe|desc|descrev(?:a|er)|estrutura\s+da)\s+(?:the\s+|a\s+)?"
+        r"(?:table\s+|tabela\s+)?(?P<tbl_d>\w+)" + _DB.format(g="db_d") + r")",
+        # contar registros
+        r"(?P<count>(?:count|cont(?:ar|e))\s+(?:the\s+)?(?:rows\s+|records\s+|registros\s+|linhas\s+)?"
+        r"(?:in\s+|of\s+|from\s+|da\s+|de\s+|em\s+)?(?:table\s+|tabela\s+)?(?P<tbl_c>\w+)" + _DB.format(g="db_c") + r")",
+        # listar linhas de uma tabela
+        r"(?P<list_rows>(?:list(?:ar|e)?|show|mostr(?:ar|e))\s+(?:all\s+|the\s+|todos\s+|todas\s+)?"
+        r"(?:os\s+|as\s+)?(?P<tbl_l>\w+)" + _DB.format(g="db_l") + r")",
+        # SQL de leitura digitado diretamente
+        r"(?P<raw_select>select\s.+)",
+    ]),
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Classificação do resultado esperado para o caminho via Crew (uma única passada)
+_INTENT_KEYWORDS = re.compile(
+    r"(?P<sql>create table|insert into|select|sqlite|banco|tabela|usuário|users)"
+    r"|(?P<go>golang|go code|package main|func main|api|endpoint|struct)",
+    re.IGNORECASE,
+)
+_EXPECTED_OUTPUTS = {
+    "sql": "Interação com o banco SQLite: criação, inserção ou listagem de dados.",
+    "go": "Geração de código em Golang conforme solicitado.",
+    None: "Ação relacionada a código ou banco de dados.",
+}
+
+
+def classify_expected_output(user_input: str) -> str:
+    """Resultado esperado da task, com prioridade SQL > Go > genérico."""
+    found = {m.lastgroup for m in _INTENT_KEYWORDS.finditer(user_input)}
+    if "sql" in found:
+        return _EXPECTED_OUTPUTS["sql"]
+    if "go" in found:
+        return _EXPECTED_OUTPUTS["go"]
+    return _EXPECTED_OUTPUTS[None]
+
+
+@dataclass
+class RouteDecision:
+    """Decisão do roteador: execução direta de uma tool ou envio à Crew."""
+
+    route: str
+    expected_output: str
+    tool_name: Optional[str] = None
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    _call: Optional[Callable[..., str]] = None
+
+    @property
+    def direct(self) -> bool:
+        return self._call is not None
+
+    def execute(self) -> str:
+        return self._call(**self.tool_args)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _table_exists(db_name: str, table_name: str) -> bool:
+    # Import tardio: evita carregar as tools quando o roteador é usado isoladamente
+    from tools.sqlite_connection_pool import read_connection
+    from tools.sqlite_schema_cache import schema_cache
+
+    if not os.path.exists(db_name):
+        return False
+    with read_connection(db_name) as conn:
+        return schema_cache.table_exists(conn, db_name, table_name)
+
+
+def _compiles(db_name: str, sql: str) -> bool:
+    """Confere se o texto é SQL válido para o banco (compila com EXPLAIN, sem executar)."""
+    from tools.sqlite_connection_pool import read_connection
+
+    if not os.path.exists(db_name):
+        return False
+    try:
+        with read_connection(db_name) as conn:
+            conn.execute(f"EXPLAIN {sql}").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class IntentRouter:
+    """
+    Roteador local de intenções.
+
+    Pedidos simples e bem estruturados sobre SQLite ("list tables", "describe table
+    users", "show schema of devcrew.db", "SELECT ...") são despachados diretamente para
+    `analyze_sqlite_database` ou `execute_sqlite_query`, sem chamada ao LLM. Todo o
+    resto segue para a Crew. Cada decisão é registrada no logger 'devcrew.router' e
+    contabilizada em `stats()` para medir a taxa de acerto.
+    """
+
+    def __init__(self, default_db: Optional[str] = None):
+        # None: usa o banco ativo da sessão (memória), ou DEVCREW_DEFAULT_DB se não houver
+        self.default_db = default_db
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------ #
+    # Roteamento
+    # ------------------------------------------------------------------ #
+    def route(self, user_input: str) -> RouteDecision:
+        started = time.perf_counter()
+        decision = self._decide(user_input)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._counts[decision.route] = self._counts.get(decision.route, 0) + 1
+        logger.info(
+            "route=%s direct=%s tool=%s args=%s elapsed_ms=%.2f",
+            decision.route, decision.direct, decision.tool_name, decision.tool_args, elapsed_ms,
+        )
+        return decision
+
+    def _decide(self, user_input: str) -> RouteDecision:
+        expected = classify_expected_output(user_input)
+        text = user_input.strip().rstrip(" .!?;")
+        match = _ROUTES.fullmatch(text) if text else None
+        if match is None:
+            return RouteDecision("crew", expected)
+
+        from tools.sqlite_analyze_db_tool import analyze_sqlite_database
+        from tools.sqlite_memory_store import memory
+        from tools.sqlite_query_tool import execute_sqlite_query
+
+        groups = match.groupdict()
+        db_name = next(
+            (groups[g] for g in ("db_lt", "db_sc", "db_d", "db_c", "db_l") if groups.get(g)),
+            None,
+        ) or self.default_db or memory.active_db()
+        kind = match.lastgroup
+
+        if kind in ("list_tables", "schema"):
+            # A resposta vai direto ao usuário: relatório em markdown
+            return self._direct(kind, expected, analyze_sqlite_database, db_name=db_name, output_format="markdown")
+
+        if kind == "raw_select":
+            sql = text
+            # Texto livre que começa com "select" pode não ser SQL: só despacha se compilar
+            if not sqlite3.complete_statement(sql + ";") or not _compiles(db_name, sql):
+                return RouteDecision("crew", expected)
+            return self._direct(kind, expected, execute_sqlite_query, db_name=db_name, sql=sql)
+
+        table = groups.get("tbl_d") or groups.get("tbl_c") or groups.get("tbl_l")
+        # Só despacha se a tabela existir de fato; caso contrário, é um pedido para a Crew
+        if not table or not _table_exists(db_name, table):
+            return RouteDecision("crew", expected)
+
+        if kind == "describe":
+            sql = f"PRAGMA table_info({_quote(table)});"
+            return self._direct(kind, expected, execute_sqlite_query, db_name=db_name, sql=sql)
+        if kind == "count":
+            sql = f"SELECT COUNT(*) AS total FROM {_quote(table)};"
+            return self._direct(kind, expected, execute_sqlite_query, db_name=db_name, sql=sql)
+        sql = f"SELECT * FROM {_quote(table)};"
+        return self._direct(
+            kind, expected, execute_sqlite_query,
+            db_name=db_name, sql=sql, limit=DIRECT_LIST_LIMIT, output_format="compact",
+        )
+
+    @staticmethod
+    def _direct(route: str, expected: str, tool_obj: Any, **tool_args: Any) -> RouteDecision:
+        call = tool_obj.run if hasattr(tool_obj, "run") else tool_obj
+        name = getattr(tool_obj, "name", route)
+        return RouteDecision(route, expected, name, tool_args, call)
+
+    # ------------------------------------------------------------------ #
+    # Métricas
+    # ------------------------------------------------------------------ #
+    def stats(self) -> Dict[str, Any]:
+        """Contagem de decisões por rota e taxa de pedidos atendidos sem LLM."""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        direct = total - counts.get("crew", 0)
+        return {
+            "total": total,
+            "direct": direct,
+            "crew": counts.get("crew", 0),
+            "hit_rate": round(direct / total, 3) if total else 0.0,
+            "routes": counts,
+        }
+
+
+# ✅ Instância global usada por main.run_devcrew_task
+router = IntentRouter()
@@ -0,0 +1,382 @@
+# runtime/llm_scheduler.py
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional
+
+from runtime.tracing import BYTES_PER_TOKEN, annotate
+
+# Chamadas simultâneas ao LLM, somando todos os agentes e pedidos do processo
+LLM_MAX_CONCURRENCY = int(os.getenv("DEVCREW_LLM_MAX_CONCURRENCY", "4"))
+# Limites do provedor por minuto (0 = sem limite): requisições e tokens (prompt + resposta)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("DEVCREW_LLM_RPM", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("DEVCREW_LLM_TPM", "0"))
+# Novas tentativas por chamada em erros transitórios (429, 5xx, timeout, conexão)
+LLM_MAX_RETRIES = int(os.getenv("DEVCREW_LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("DEVCREW_LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("DEVCREW_LLM_BACKOFF_MAX", "20"))
+# Tempo máximo (s) de espera na fila antes de desistir da chamada
+LLM_QUEUE_TIMEOUT = float(os.getenv("DEVCREW_LLM_QUEUE_TIMEOUT", "300"))
+# Chamadas idênticas em andamento compartilham a mesma resposta
+LLM_DEDUPE = os.getenv("DEVCREW_LLM_DEDUPE", "1") != "0"
+# Tokens de resposta estimados quando a chamada não informa max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+WAIT_SAMPLES = 1000
+
+_RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = ("ratelimit", "timeout", "apiconnection", "connectionerror", "serviceunavailable",
+                    "internalserver", "overloaded")
+
+
+class LLMQueueTimeout(RuntimeError):
+    """A chamada não conseguiu vez no agendador dentro de LLM_QUEUE_TIMEOUT."""
+
+
+class FifoSlots:
+    """
+    Semáforo contador com fila FIFO: vagas liberadas são entregues diretamente ao
+    mais antigo na fila (threading.Semaphore não garante a ordem em que as threads
+    acordam, e uma chamada recém-chegada poderia passar à frente).
+    """
+
+    def __init__(self, slots: int):
+        self._lock = threading.Lock()
+        self._free = slots
+        self._waiters: Deque[threading.Event] = deque()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return True
+            event = threading.Event()
+            self._waiters.append(event)
+        if event.wait(timeout):
+            return True
+        with self._lock:
+            if event.is_set():  # a vaga chegou junto com o timeout
+                return True
+            self._waiters.remove(event)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+
+class TokenBucket:
+    """
+    Balde de fichas: `rate` fichas por segundo, acumulando até `capacity` (no mínimo 1,
+    para que limites abaixo de 1 ficha/s ainda cobrem uma ficha inteira por pedido).
+    `acquire(n)` espera até haver n fichas (pedidos maiores que o balde são limitados
+    à capacidade, para nunca esperarem para sempre). Thread-safe.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity if capacity is not None else rate), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> float:
+        """Consome `amount` fichas; retorna o tempo esperado (s). Lança LLMQueueTimeout."""
+        amount = min(max(float(amount), 1.0), self.capacity)
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return now - started
+                wait = (amount - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                raise LLMQueueTimeout("limite de taxa do LLM: tempo de espera esgotado")
+            time.sleep(min(wait, 1.0))
+
+    def refund(self, amount: float) -> None:
+        """Devolve fichas reservadas a mais (ex.: estimativa de tokens maior que o uso real)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + max(float(amount), 0.0))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Erros transitórios do provedor: limite de taxa, sobrecarga, timeout ou conexão."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS
+    name = type(error).__name__.lower()
+    return any(marker in name for marker in _RETRYABLE_NAMES) or isinstance(error, (TimeoutError, ConnectionError))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Valor do cabeçalho Retry-After (em segundos), quando o provedor informa."""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except AttributeError:
+            value = None
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _prompt_tokens(messages: Any) -> int:
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str((m.get("content") if isinstance(m, dict) else m) or "")) for m in messages or [])
+    return chars // BYTES_PER_TOKEN
+
+
+def _estimate_tokens(messages: Any, kwargs: Dict[str, Any]) -> int:
+    completion = kwargs.get("max_tokens") or kwargs.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+    return _prompt_tokens(messages) + int(completion)
+
+
+def _completion_tokens(result: Any) -> Optional[int]:
+    """Tokens reais da resposta: `usage` do provedor quando disponível, senão o tamanho do texto."""
+    usage = getattr(result, "usage", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if isinstance(completion, int):
+        return completion
+    if isinstance(result, str):
+        return len(result) // BYTES_PER_TOKEN
+    return None
+
+
+def _dedupe_key(model: Any, messages: Any, kwargs: Dict[str, Any]) -> Optional[str]:
+    # Callbacks e referências ao agente/task não mudam a resposta: ficam fora da chave
+    relevant = {k: v for k, v in kwargs.items() if k in ("tools", "response_model", "max_tokens", "stop")}
+    try:
+        payload = json.dumps([str(model), messages, relevant], sort_keys=True, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class LLMScheduler:
+    """
+    Agendador das chamadas ao LLM, compartilhado por todos os agentes do processo.
+
+    - Fila com limite de chamadas simultâneas (ordem de chegada);
+    - baldes de fichas para requisições e tokens por minuto (limites do provedor);
+    - novas tentativas com backoff exponencial e jitter ("full jitter") em erros
+      transitórios, respeitando Retry-After — a chamada é repetida, não a Crew inteira;
+    - chamadas idênticas em andamento (mesmo modelo e mensagens) são coalescidas:
+      só uma vai ao provedor e todas recebem a mesma resposta;
+    - métricas de fila (profundidade, espera) e de tentativas em `stats()`.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 max_retries: int = LLM_MAX_RETRIES, backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX, queue_timeout: float = LLM_QUEUE_TIMEOUT,
+                 dedupe: bool = LLM_DEDUPE):
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self.dedupe = dedupe
+        self._slots = FifoSlots(self.max_concurrency)
+        # Capacidade 1: no máximo uma requisição de "rajada", custo de uma ficha inteira cada
+        self._requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60)) \
+            if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute > 0 else None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._counters = {"calls": 0, "provider_calls": 0, "coalesced": 0, "retries": 0, "failures": 0,
+                          "queue_timeouts": 0}
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+
+    # ------------------------------------------------------------------ #
+    # Chamada
+    # ------------------------------------------------------------------ #
+    def submit(self, call: Callable[..., Any], messages: Any, *args: Any, model: Any = None,
+               **kwargs: Any) -> Any:
+        """Executa `call(messages, *args, **kwargs)` sob o agendador e devolve a resposta."""
+        self._count("calls")
+        key = _dedupe_key(model, messages, kwargs) if self.dedupe and not args else None
+        if key is not None:
+            with self._lock:
+                leader = self._in_flight.get(key)
+                if leader is None:
+                    future: Future = Future()
+                    self._in_flight[key] = future
+            if leader is not None:
+                self._count("coalesced")
+                annotate(llm_coalesced=True)
+                return leader.result()
+            try:
+                result = self._execute(call, messages, args, kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+        return self._execute(call, messages, args, kwargs)
+
+    def _execute(self, call: Callable[..., Any], messages: Any, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        estimated = _estimate_tokens(messages, kwargs)
+        waited = 0.0
+        attempt = 0
+        while True:
+            waited += self._acquire(estimated)
+            try:
+                self._count("provider_calls")
+                result = call(messages, *args, **kwargs)
+                annotate(llm_wait_ms=round(waited * 1000, 3), llm_attempts=attempt + 1)
+                self._reconcile(messages, estimated, result)
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._count("failures")
+                    annotate(llm_wait_ms=round(waited * 1000, 3), llm_attempts=attempt + 1)
+                    raise
+                delay = self._backoff(attempt, e)
+            finally:
+                self._release()
+            # Espera fora da vez: o slot fica livre para outras chamadas durante o backoff
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+            waited += delay
+
+    def _reconcile(self, messages: Any, estimated: int, result: Any) -> None:
+        """Devolve ao balde de tokens a parte da reserva (max_tokens estimado) não usada pela resposta."""
+        if self._tokens is None:
+            return
+        completion = _completion_tokens(result)
+        if completion is None:
+            return
+        unused = estimated - (_prompt_tokens(messages) + completion)
+        if unused > 0:
+            self._tokens.refund(unused)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        hinted = retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.backoff_max) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _acquire(self, tokens: int) -> float:
+        started = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        try:
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                self._count("queue_timeouts")
+                raise LLMQueueTimeout(
+                    f"fila do LLM: nenhuma vaga em {self.queue_timeout:g}s "
+                    f"({self.max_concurrency} chamadas simultâneas)"
+                )
+            try:
+                remaining = max(self.queue_timeout - (time.monotonic() - started), 0.0)
+                if self._requests is not None:
+                    self._requests.acquire(1, timeout=remaining)
+                if self._tokens is not None:
+                    self._tokens.acquire(tokens, timeout=remaining)
+            except BaseException:
+                self._slots.release()
+                raise
+        finally:
+            with self._lock:
+                self._queued -= 1
+        waited = time.monotonic() - started
+        with self._lock:
+            self._running += 1
+            self._waits.append(waited)
+        return waited
+
+    def _release(self) -> None:
+        with self._lock:
+            self._running -= 1
+        self._slots.release()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    # ------------------------------------------------------------------ #
+    # Métricas
+    # ------------------------------------------------------------------ #
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = dict(self._counters)
+            queued, running, max_queued = self._queued, self._running, self._max_queued
+
+        def pct(p: float) -> float:
+            return round(waits[min(int(len(waits) * p / 100), len(waits) - 1)] * 1000, 3) if waits else 0.0
+
+        return {
+            **counters,
+            "queue_depth": queued,
+            "max_queue_depth": max_queued,
+            "running": running,
+            "max_concurrency": self.max_concurrency,
+            "wait_ms_p50": pct(50),
+            "wait_ms_p95": pct(95),
+            "wait_ms_max": round(waits[-1] * 1000, 3) if waits else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._waits.clear()
+            self._counters = {k: 0 for k in self._counters}
+            self._max_queued = self._queued
+
+
+def schedule_llm(llm: Any, scheduler: Optional[LLMScheduler] = None) -> Any:
+    """
+    Envolve `llm.call` para que toda chamada ao modelo passe pelo agendador. Idempotente,
+    como `instrument_llm`: agentes copiados compartilham a mesma instância de LLM.
+    """
+    call = getattr(llm, "call", None)
+    if call is None or getattr(llm, "_devcrew_scheduled", False):
+        return llm
+    scheduler = scheduler or llm_scheduler
+    model = getattr(llm, "model", None)
+
+    @functools.wraps(call)
+    def scheduled_call(messages: Any, *args: Any, **kwargs: Any) -> Any:
+        return scheduler.submit(call, messages, *args, model=model, **kwargs)
+
+    try:
+        llm.call = scheduled_call
+        llm._devcrew_scheduled = True
+    except (AttributeError, TypeError, ValueError):
+        pass  # LLM imutável (ex.: modelo pydantic congelado): segue sem agendador
+    return llm
+
+
+# ✅ Instância global, compartilhada por coder, planner e researcher
+llm_scheduler = LLMScheduler()
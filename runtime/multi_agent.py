@@ -0,0 +1,168 @@
+# runtime/multi_agent.py
+import contextvars
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from runtime.crew_runtime import CrewRuntime
+from runtime.tracing import tracer
+
+# Subtarefas executadas em paralelo por pedido (pesquisa e código)
+MULTI_AGENT_WORKERS = int(os.getenv("DEVCREW_MULTI_AGENT_WORKERS", "4"))
+# Máximo de subtarefas aceitas do plano (o excedente é descartado)
+MAX_SUBTASKS = int(os.getenv("DEVCREW_MULTI_AGENT_MAX_SUBTASKS", "4"))
+
+SUBTASK_KINDS = ("research", "code")
+
+_PLAN_DESCRIPTION = (
+    "Divida o pedido abaixo em no máximo {max_subtasks} subtarefas independentes, que possam ser "
+    "executadas em paralelo e sem depender do resultado umas das outras. Use 'research' para "
+    "levantar informações, bibliotecas e boas práticas, e 'code' para gerar código, SQL ou "
+    "consultar bancos SQLite. Pedidos simples devem virar uma única subtarefa 'code'.\n\n"
+    "Pedido: {request}"
+)
+_PLAN_EXPECTED_OUTPUT = (
+    'Apenas um array JSON, sem texto adicional, no formato '
+    '[{"kind": "research" | "code", "description": "..."}].'
+)
+_SUBTASK_DESCRIPTION = (
+    "Subtarefa {index}/{total} ({kind}) do pedido: {request}\n\n"
+    "Execute somente esta subtarefa: {description}"
+)
+_RESEARCH_EXPECTED_OUTPUT = "Resumo objetivo das informações encontradas, com referências quando houver."
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+
+@dataclass
+class Subtask:
+    kind: str  # 'research' ou 'code'
+    description: str
+
+
+@dataclass
+class SubtaskResult:
+    subtask: Subtask
+    output: str
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+def _raw_output(result: Any) -> str:
+    if hasattr(result, "raw"):
+        return str(result.raw)
+    if hasattr(result, "output"):
+        return str(result.output)
+    return str(result)
+
+
+def parse_plan(text: str, request: str, max_subtasks: int = MAX_SUBTASKS) -> List[Subtask]:
+    """
+    Extrai as subtarefas da resposta do planner (array JSON, possivelmente cercado
+    de texto ou de um bloco ```json). Itens inválidos são ignorados; se nada for
+    aproveitável, o pedido inteiro vira uma única subtarefa 'code'.
+    """
+    match = _JSON_ARRAY_RE.search(text or "")
+    items: List[Any] = []
+    if match:
+        try:
+            parsed = json.loads(match.group(0))
+            items = parsed if isinstance(parsed, list) else []
+        except json.JSONDecodeError:
+            items = []
+
+    subtasks: List[Subtask] = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        kind = str(item.get("kind") or item.get("type") or "").strip().lower()
+        description = str(item.get("description") or "").strip()
+        if kind in SUBTASK_KINDS and description:
+            subtasks.append(Subtask(kind, description))
+    return subtasks[:max(1, max_subtasks)] or [Subtask("code", request)]
+
+
+class MultiAgentPipeline:
+    """
+    Modo multiagente: planner → (researcher ∥ coder) → junção.
+
+    1. O planner divide o pedido em subtarefas independentes (array JSON).
+    2. As subtarefas rodam em paralelo em um pool de threads, cada uma na Crew
+       aquecida do agente correspondente (researcher ou coder). O contexto do pedido
+       (trace, escopo de cancelamento e sessão de memória) é copiado para as threads.
+    3. Os resultados são reunidos na ordem do plano em uma única resposta.
+
+    As chamadas ao LLM de todos os agentes passam pelo agendador global
+    (`runtime.llm_scheduler`), que limita concorrência e taxa (DEVCREW_LLM_*).
+    """
+
+    def __init__(self, planner: CrewRuntime, runtimes: Dict[str, CrewRuntime],
+                 max_workers: int = MULTI_AGENT_WORKERS, max_subtasks: int = MAX_SUBTASKS):
+        missing = [kind for kind in SUBTASK_KINDS if kind not in runtimes]
+        if missing:
+            raise ValueError(f"runtimes sem agente para: {', '.join(missing)}")
+        self.planner = planner
+        self.runtimes = runtimes
+        self.max_subtasks = max(int(max_subtasks), 1)
+        self._executor = ThreadPoolExecutor(max_workers=max(int(max_workers), 1),
+                                            thread_name_prefix="devcrew-subtask")
+
+    def plan(self, user_input: str, step_callback: Optional[Callable] = None) -> List[Subtask]:
+        with tracer.span("multi_agent.plan") as span:
+            description = _PLAN_DESCRIPTION.format(max_subtasks=self.max_subtasks, request=user_input)
+            result = self.planner.run(description, _PLAN_EXPECTED_OUTPUT, step_callback=step_callback)
+            subtasks = parse_plan(_raw_output(result), user_input, self.max_subtasks)
+            span.set(subtasks=len(subtasks), kinds=",".join(s.kind for s in subtasks))
+        return subtasks
+
+    def _run_subtask(self, index: int, total: int, subtask: Subtask, user_input: str,
+                     expected_output: str, step_callback: Optional[Callable]) -> SubtaskResult:
+        started = time.perf_counter()
+        with tracer.span("multi_agent.subtask", index=index, subtask_kind=subtask.kind) as span:
+            description = _SUBTASK_DESCRIPTION.format(
+                index=index, total=total, kind=subtask.kind, request=user_input, description=subtask.description,
+            )
+            expected = _RESEARCH_EXPECTED_OUTPUT if subtask.kind == "research" else expected_output
+            try:
+                output = _raw_output(self.runtimes[subtask.kind].run(description, expected,
+                                                                     step_callback=step_callback))
+                error = None
+            except Exception as e:
+                # Uma subtarefa com falha não derruba as demais: o erro entra na junção
+                output, error = "", str(e)
+                span.set(status="error", error=error)
+        return SubtaskResult(subtask, output, (time.perf_counter() - started) * 1000, error)
+
+    def run(self, user_input: str, expected_output: str, step_callback: Optional[Callable] = None) -> str:
+        """Executa o pedido no modo multiagente e devolve a resposta consolidada."""
+        subtasks = self.plan(user_input, step_callback=step_callback)
+        total = len(subtasks)
+        futures = [
+            # Cada subtarefa roda em uma cópia do contexto atual (contextvars)
+            self._executor.submit(
+                contextvars.copy_context().run, self._run_subtask,
+                index, total, subtask, user_input, expected_output, step_callback,
+            )
+            for index, subtask in enumerate(subtasks, 1)
+        ]
+        results = [future.result() for future in futures]
+        return merge_results(results)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def merge_results(results: List[SubtaskResult]) -> str:
+    """Junta as saídas das subtarefas na ordem do plano."""
+    if len(results) == 1 and results[0].error is None:
+        return results[0].output
+    labels = {"research": "🔎 Pesquisa", "code": "🛠️ Código"}
+    sections = []
+    for index, result in enumerate(results, 1):
+        header = f"### {index}. {labels[result.subtask.kind]}: {result.subtask.description}"
+        body = f"⚠️ Subtarefa falhou: {result.error}" if result.error else result.output.strip()
+        sections.append(f"{header}\n\n{body}")
+    return "\n\n".join(sections)
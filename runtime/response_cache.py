@@ -0,0 +1,84 @@
+# runtime/response_cache.py
+import os
+import re
+from typing import Hashable, Optional, Tuple
+
+from tools.sqlite_connection_pool import resolve_db_path
+from tools.sqlite_memory_store import memory
+from tools.sqlite_result_cache import LRUTTLCache, result_cache
+
+# Configuração do cache de respostas completas (1º nível)
+PROMPT_CACHE_ENABLED = os.getenv("DEVCREW_PROMPT_CACHE", "1") != "0"
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("DEVCREW_PROMPT_CACHE_MAX_ENTRIES", "256"))
+PROMPT_CACHE_MAX_BYTES = int(os.getenv("DEVCREW_PROMPT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+PROMPT_CACHE_TTL = float(os.getenv("DEVCREW_PROMPT_CACHE_TTL", "600"))
+# Banco sempre incluído na impressão digital, mesmo antes de qualquer tool acessá-lo
+DEFAULT_DB = os.getenv("DEVCREW_DEFAULT_DB", "devcrew.db")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza o prompt para comparação: minúsculas, espaços colapsados, sem pontuação final."""
+    return _WHITESPACE.sub(" ", prompt.strip().lower()).rstrip(" .!?;")
+
+
+class PromptResponseCache:
+    """
+    Cache de respostas completas de `run_devcrew_task` (1º nível do cache).
+
+    A chave combina o prompt normalizado com a impressão digital
+    (schema_version, data_version) de cada banco conhecido. Qualquer escrita feita
+    pelas tools invalida o cache inteiro, pois não sabemos de antemão quais
+    bancos uma resposta consultou. Execuções que escreveram no banco nunca são
+    guardadas.
+    """
+
+    def __init__(self, max_entries: int = PROMPT_CACHE_MAX_ENTRIES,
+                 max_bytes: int = PROMPT_CACHE_MAX_BYTES, ttl: float = PROMPT_CACHE_TTL,
+                 enabled: bool = PROMPT_CACHE_ENABLED):
+        self.enabled = enabled
+        self.cache = LRUTTLCache(max_entries, max_bytes, ttl)
+        result_cache.add_write_listener(self._on_write)
+
+    def _key(self, prompt: str, variant: str = "") -> Hashable:
+        # O banco ativo da sessão muda o significado do prompt ("liste as tabelas")
+        active_db = memory.active_db()
+        databases = set(result_cache.known_databases()) | {resolve_db_path(DEFAULT_DB), resolve_db_path(active_db)}
+        fingerprints = tuple((path, result_cache.fingerprint(path)) for path in sorted(databases))
+        return normalize_prompt(prompt), variant, active_db, fingerprints
+
+    def lookup(self, prompt: str, variant: str = "") -> Tuple[Optional[str], Optional[Tuple[Hashable, int]]]:
+        """
+        Procura a resposta em cache.
+
+        Args:
+            prompt (str): pedido do usuário.
+            variant (str): separa respostas do mesmo prompt geradas de formas diferentes
+                (ex.: modo de execução 'single' ou 'multi').
+
+        Returns:
+            (resposta ou None, token a ser passado para `store` após a execução)
+        """
+        if not self.enabled:
+            return None, None
+        key = self._key(prompt, variant)
+        token = (key, result_cache.write_counter)
+        return self.cache.get(key), token
+
+    def store(self, token: Optional[Tuple[Hashable, int]], response: str) -> bool:
+        """Guarda a resposta, exceto se houve escrita em algum banco durante a execução."""
+        if not self.enabled or token is None or not response:
+            return False
+        key, write_counter = token
+        if result_cache.write_counter != write_counter:
+            return False
+        self.cache.put(key, response)
+        return True
+
+    def _on_write(self, path: str) -> None:
+        self.cache.clear()
+
+
+# ✅ Instância global usada por main.run_devcrew_task
+prompt_cache = PromptResponseCache()
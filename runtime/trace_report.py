@@ -0,0 +1,136 @@
+"""
+Relatório de latência a partir dos spans gravados por runtime.tracing.
+
+Mostra p50/p95/p99 por tool e por estágio (request, roteador, cache, kickoff,
+passos do agente, chamadas ao LLM, execução SQL, codificação da saída) e, com
+--slowest, quebra os pedidos mais lentos por tipo de span.
+
+Uso (a partir da raiz do repositório):
+    python -m runtime.trace_report
+    python -m runtime.trace_report --path traces/spans.db --since 60 --slowest 5
+"""
+import argparse
+import json
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Sequence
+
+from runtime.tracing import TRACE_PATH, load_spans
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(spans: Iterable[Dict[str, Any]], key) -> List[Dict[str, Any]]:
+    """Agrupa os spans por `key(span)` e calcula as estatísticas de duração."""
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        groups[key(span)].append(span)
+
+    rows = []
+    for name, items in groups.items():
+        durations = sorted(float(s.get("duration_ms") or 0.0) for s in items)
+        rows.append({
+            "name": name,
+            "count": len(items),
+            "errors": sum(1 for s in items if s.get("status") == "error"),
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "p99_ms": round(percentile(durations, 99), 2),
+            "max_ms": round(durations[-1], 2),
+            "total_ms": round(sum(durations), 2),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+
+def slowest_requests(spans: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Pedidos mais lentos com o tempo somado por tipo de span (llm, tool, stage...)."""
+    by_trace: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        by_trace[span["trace_id"]].append(span)
+
+    requests = []
+    for trace_id, items in by_trace.items():
+        roots = [s for s in items if s.get("kind") == "request"]
+        if not roots:
+            continue
+        root = roots[0]
+        breakdown: Dict[str, float] = defaultdict(float)
+        for span in items:
+            if span is not root and span.get("kind") in ("llm", "tool"):
+                breakdown[span["kind"]] += float(span.get("duration_ms") or 0.0)
+            elif span.get("name") in ("encode", "sql.execute"):
+                breakdown[span["name"]] += float(span.get("duration_ms") or 0.0)
+        requests.append({
+            "trace_id": trace_id,
+            "duration_ms": round(float(root.get("duration_ms") or 0.0), 2),
+            "route": root.get("attrs", {}).get("route"),
+            # Texto do prompt só existe com DEVCREW_TRACE_RAW_TEXT=1; senão, hash e tamanho
+            "prompt": root.get("attrs", {}).get("prompt") or (
+                f"#{root['attrs']['prompt_hash']} ({root['attrs'].get('prompt_chars')} caracteres)"
+                if root.get("attrs", {}).get("prompt_hash") else None),
+            "breakdown_ms": {k: round(v, 2) for k, v in sorted(breakdown.items())},
+        })
+    requests.sort(key=lambda r: r["duration_ms"], reverse=True)
+    return requests[:limit]
+
+
+def _print_table(title: str, rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{title}")
+    if not rows:
+        print("  (sem dados)")
+        return
+    width = max(len(r["name"]) for r in rows)
+    header = f"  {'nome':<{width}}  {'n':>6}  {'erros':>5}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'max':>9}"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for r in rows:
+        print(
+            f"  {r['name']:<{width}}  {r['count']:>6}  {r['errors']:>5}  "
+            f"{r['p50_ms']:>9.2f}  {r['p95_ms']:>9.2f}  {r['p99_ms']:>9.2f}  {r['max_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=TRACE_PATH, help="arquivo de spans (.jsonl ou .db)")
+    parser.add_argument("--since", type=float, default=None, help="considera apenas os últimos N minutos")
+    parser.add_argument("--slowest", type=int, default=0, help="lista os N pedidos mais lentos")
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.since is not None:
+        cutoff = time.time() - args.since * 60
+        spans = [s for s in spans if float(s.get("start") or 0) >= cutoff]
+
+    tools = summarize((s for s in spans if s.get("kind") == "tool"), key=lambda s: s["name"])
+    stages = summarize((s for s in spans if s.get("kind") != "tool"), key=lambda s: f"{s['kind']}:{s['name']}")
+    slowest = slowest_requests(spans, args.slowest) if args.slowest else []
+
+    if args.json:
+        print(json.dumps({"spans": len(spans), "tools": tools, "stages": stages, "slowest": slowest}, indent=2,
+                         ensure_ascii=False))
+        return
+
+    print(f"📈 {len(spans)} spans em {args.path} (durações em ms)")
+    _print_table("Por tool:", tools)
+    _print_table("Por estágio:", stages)
+    if slowest:
+        print("\nPedidos mais lentos:")
+        for r in slowest:
+            parts = ", ".join(f"{k}={v:.1f}" for k, v in r["breakdown_ms"].items()) or "-"
+            print(f"  {r['duration_ms']:>9.2f} ms  [{r['route']}] {r['trace_id']}  {parts}")
+            if r["prompt"]:
+                print(f"             {r['prompt']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+# runtime/tracing.py
+import atexit
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Tracing ligado por padrão; DEVCREW_TRACING=0 desliga (spans viram no-op)
+TRACING_ENABLED = os.getenv("DEVCREW_TRACING", "1") != "0"
+# Destino dos spans: arquivo .jsonl (uma linha por span) ou banco SQLite (.db/.sqlite)
+TRACE_PATH = os.getenv("DEVCREW_TRACE_PATH", os.path.join("traces", "spans.jsonl"))
+# Tamanho máximo dos atributos textuais gravados em cada span
+MAX_ATTR_CHARS = 300
+# Prompts e SQL são gravados como tamanho + hash; DEVCREW_TRACE_RAW_TEXT=1 grava o texto (resumido)
+TRACE_RAW_TEXT = os.getenv("DEVCREW_TRACE_RAW_TEXT", "0") == "1"
+# Rotação do arquivo JSONL: tamanho máximo (bytes) e quantos arquivos antigos (.1, .2, ...) manter
+TRACE_MAX_BYTES = int(os.getenv("DEVCREW_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("DEVCREW_TRACE_BACKUPS", "3"))
+BYTES_PER_TOKEN = 4
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("devcrew_span", default=None)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_ATTR_CHARS:
+        return value[: MAX_ATTR_CHARS - 3] + "..."
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return _clip(str(value))
+
+
+def text_attrs(prefix: str, text: Optional[str]) -> Dict[str, Any]:
+    """
+    Atributos de um texto do usuário (prompt, SQL) para o span: tamanho e hash, que
+    permitem agrupar repetições sem gravar dados pessoais ou valores literais.
+    """
+    if text is None:
+        return {}
+    attrs: Dict[str, Any] = {
+        f"{prefix}_chars": len(text),
+        f"{prefix}_hash": hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()[:12],
+    }
+    if TRACE_RAW_TEXT:
+        attrs[prefix] = text
+    return attrs
+
+
+class Span:
+    """Um trecho cronometrado de um pedido (request, estágio, passo do agente, LLM ou tool)."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "_t0",
+                 "duration_ms", "status", "attrs")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attrs: Any):
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self.attrs: Dict[str, Any] = {k: _clip(v) for k, v in attrs.items()}
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update({k: _clip(v) for k, v in attrs.items()})
+
+    def finish(self) -> None:
+        if self.duration_ms is None:
+            self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration_ms or 0.0, 3),
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    """Span usado com o tracing desligado: aceita as mesmas chamadas e não grava nada."""
+
+    trace_id = span_id = parent_id = None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# ---------------------------------------------------------------------- #
+# Armazenamento
+# ---------------------------------------------------------------------- #
+_SPAN_COLUMNS = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "duration_ms", "status", "attrs")
+
+
+def _is_sqlite_path(path: str) -> bool:
+    return path.endswith((".db", ".sqlite", ".sqlite3"))
+
+
+class TraceStore:
+    """
+    Grava os spans em segundo plano (thread própria), sem bloquear o pedido.
+
+    Formato JSONL (padrão) ou SQLite, escolhido pela extensão de `path`. O JSONL é
+    rotacionado ao passar de `max_bytes` (spans.jsonl.1, .2, ... até `backups`).
+    """
+
+    def __init__(self, path: str = TRACE_PATH, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def write(self, span: Dict[str, Any]) -> None:
+        if self._failed:
+            return  # destino indisponível: descarta em vez de acumular na memória
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="devcrew-trace-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(span)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Aguarda (até `timeout` segundos) a gravação dos spans enfileirados."""
+        deadline = time.monotonic() + timeout
+        while (self._queue.unfinished_tasks and self._thread is not None
+               and self._thread.is_alive() and time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if _is_sqlite_path(self.path):
+                self._run_sqlite()
+            else:
+                self._run_jsonl()
+        except (OSError, sqlite3.Error):
+            # O tracing nunca deve derrubar a aplicação: desliga a gravação
+            self._failed = True
+
+    def _drain(self) -> Iterator[List[Dict[str, Any]]]:
+        # Agrupa os spans disponíveis em lotes para reduzir as escritas em disco
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [s for s in batch if s is not None]
+            try:
+                if spans:
+                    yield spans
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if None in batch:
+                return
+
+    def _rotate(self) -> None:
+        """spans.jsonl → .1 → .2 ...; o mais antigo além de `backups` é descartado."""
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _run_jsonl(self) -> None:
+        fh = open(self.path, "a", encoding="utf-8")
+        try:
+            for spans in self._drain():
+                for span in spans:
+                    fh.write(json.dumps(span, ensure_ascii=False, default=str))
+                    fh.write("\n")
+                fh.flush()
+                if self.max_bytes > 0 and fh.tell() >= self.max_bytes:
+                    fh.close()
+                    self._rotate()
+                    fh = open(self.path, "a", encoding="utf-8")
+        finally:
+            fh.close()
+
+    def _run_sqlite(self) -> None:
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS spans (trace_id TEXT, span_id TEXT PRIMARY KEY, parent_id TEXT, "
+                "name TEXT, kind TEXT, start REAL, duration_ms REAL, status TEXT, attrs TEXT);"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_spans_trace ON spans(trace_id);")
+            conn.commit()
+            placeholders = ", ".join("?" for _ in _SPAN_COLUMNS)
+            for spans in self._drain():
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO spans ({', '.join(_SPAN_COLUMNS)}) VALUES ({placeholders});",
+                    [
+                        tuple(json.dumps(s[c], ensure_ascii=False, default=str) if c == "attrs" else s[c]
+                              for c in _SPAN_COLUMNS)
+                        for s in spans
+                    ],
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+
+def load_spans(path: str = TRACE_PATH) -> List[Dict[str, Any]]:
+    """Lê todos os spans gravados em `path` (JSONL, incluindo os arquivos rotacionados, ou SQLite)."""
+    if _is_sqlite_path(path):
+        if not os.path.exists(path):
+            return []
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(f"SELECT {', '.join(_SPAN_COLUMNS)} FROM spans ORDER BY start;").fetchall()
+        finally:
+            conn.close()
+        spans = [dict(zip(_SPAN_COLUMNS, row)) for row in rows]
+        for span in spans:
+            span["attrs"] = json.loads(span["attrs"] or "{}")
+        return spans
+    spans = []
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        return []
+    rotated = sorted((name for name in os.listdir(directory)
+                      if name.startswith(os.path.basename(path) + ".")
+                      and name.rsplit(".", 1)[1].isdigit()),
+                     key=lambda name: int(name.rsplit(".", 1)[1]), reverse=True)
+    files = [os.path.join(os.path.dirname(path), name) for name in rotated] + [path]
+    for file_path in files:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    try:
+                        spans.append(json.loads(line))
+                    except ValueError:
+                        continue  # linha truncada (ex.: processo encerrado durante a escrita)
+    return spans
+
+
+# ---------------------------------------------------------------------- #
+# Tracer
+# ---------------------------------------------------------------------- #
+class Tracer:
+    """
+    Registra spans encadeados por pedido.
+
+    O span ativo é mantido em um ContextVar: spans abertos dentro de outro (tool
+    chamada pelo agente durante `crew.kickoff`, por exemplo) herdam o trace_id e
+    apontam para o span pai.
+    """
+
+    def __init__(self, store: Optional[TraceStore] = None, enabled: bool = TRACING_ENABLED):
+        self.enabled = enabled
+        self.store = store or TraceStore()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "stage", **attrs: Any) -> Iterator[Any]:
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+        span = Span(name, kind, _current_span.get(), **attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            self.store.write(span.to_dict())
+
+    def record(self, name: str, kind: str, duration_ms: float, status: str = "ok", **attrs: Any) -> None:
+        """Registra um span já medido (ex.: passo do agente) como filho do span ativo."""
+        if not self.enabled:
+            return
+        span = Span(name, kind, _current_span.get(), **attrs)
+        span.start -= duration_ms / 1000
+        span.duration_ms = duration_ms
+        span.status = status
+        self.store.write(span.to_dict())
+
+    def flush(self) -> None:
+        self.store.flush()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def annotate(**attrs: Any) -> None:
+    """Adiciona atributos ao span ativo (ex.: linhas lidas, acerto de cache)."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attrs)
+
+
+def _is_error_message(result: Any) -> bool:
+    return isinstance(result, str) and result.startswith(("⚠️", "🚫"))
+
+
+# Argumentos das tools copiados para o span; os de SQL entram como tamanho + hash (text_attrs)
+_TOOL_ATTRS = ("db_name", "table_name")
+_TOOL_TEXT_ATTRS = ("sql", "ddl_sql", "schema_sql")
+
+
+def traced_tool(name: str) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """
+    Decorator para funções de tool: abre um span 'tool' por chamada com o banco,
+    o tamanho e o hash do SQL, o tamanho da saída em bytes e, quando informado pelas camadas
+    internas, as linhas lidas. Deve ficar abaixo de @tool para preservar a assinatura.
+    """
+
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> str:
+            attrs = {k: kwargs[k] for k in _TOOL_ATTRS if kwargs.get(k) is not None}
+            for key in _TOOL_TEXT_ATTRS:
+                if isinstance(kwargs.get(key), str):
+                    attrs.update(text_attrs(key, kwargs[key]))
+            if args and "db_name" not in attrs and isinstance(args[0], str):
+                attrs["db_name"] = args[0]
+            with tracer.span(name, kind="tool", **attrs) as span:
+                result = func(*args, **kwargs)
+                if isinstance(result, str):
+                    span.set(bytes=len(result.encode("utf-8")))
+                if _is_error_message(result):
+                    span.status = "error"
+                    span.set(error=result.splitlines()[0] if result else "")
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def _message_chars(messages: Any) -> int:
+    if isinstance(messages, str):
+        return len(messages)
+    total = 0
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else message
+        total += len(str(content or ""))
+    return total
+
+
+def instrument_llm(llm: Any) -> Any:
+    """
+    Envolve `llm.call` para registrar um span 'llm' por chamada ao modelo.
+
+    As contagens de tokens por chamada são estimadas pelo tamanho das mensagens
+    (~4 bytes/token, `tokens_estimated=True`); os totais exatos do pedido vêm de
+    `crew.usage_metrics`, gravados no span do kickoff. Idempotente: agentes copiados
+    compartilham a mesma instância de LLM.
+    """
+    call = getattr(llm, "call", None)
+    if call is None or getattr(llm, "_devcrew_traced", False):
+        return llm
+    model = getattr(llm, "model", None)
+
+    @functools.wraps(call)
+    def traced_call(messages: Any, *args: Any, **kwargs: Any) -> Any:
+        with tracer.span("llm.call", kind="llm", model=model) as span:
+            result = call(messages, *args, **kwargs)
+            prompt_chars = _message_chars(messages)
+            completion_chars = len(str(result or ""))
+            span.set(
+                messages=len(messages) if isinstance(messages, list) else 1,
+                prompt_tokens=prompt_chars // BYTES_PER_TOKEN,
+                completion_tokens=completion_chars // BYTES_PER_TOKEN,
+                tokens_estimated=True,
+            )
+            return result
+
+    try:
+        llm.call = traced_call
+        llm._devcrew_traced = True
+    except (AttributeError, TypeError, ValueError):
+        pass  # LLM imutável (ex.: modelo pydantic congelado): segue sem spans por chamada
+    return llm
+
+
+def usage_attrs(usage: Any) -> Dict[str, Any]:
+    """Converte `crew.usage_metrics` (objeto ou dict) em atributos de span."""
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else getattr(usage, "__dict__", {})
+    keys = ("total_tokens", "prompt_tokens", "completion_tokens", "cached_prompt_tokens", "successful_requests")
+    return {k: usage[k] for k in keys if isinstance(usage.get(k), (int, float))}
+
+
+# ✅ Instância global
+tracer = Tracer()
+atexit.register(tracer.store.close)
@@ -1,61 +1,279 @@
+import os
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 from crewai.tools import tool
+from runtime.tracing import traced_tool
+from tools.sqlite_connection_pool import read_snapshot, resolve_db_path, write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_output_encoder import truncate_text
+from tools.sqlite_query_guard import estimate_rows
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
 
-@tool("SQLite Analyze Database")
-def analyze_sqlite_database(db_name: str) -> str:
-    """
-    Analisa todas as tabelas existentes em um banco SQLite, listando:
-    - Nome da tabela
-    - Número de colunas
-    - Nomes e tipos das colunas
-    - Número de registros em cada tabela
+# Timeout padrão (segundos) de cada COUNT(*) no modo exato
+DEFAULT_TABLE_TIMEOUT = 10.0
+# Número padrão de conexões somente leitura usadas em paralelo no modo exato
+DEFAULT_MAX_WORKERS = 4
+# Formatos do relatório: 'compact' (uma linha por tabela, para o LLM) ou 'markdown'
+REPORT_FORMATS = ("compact", "markdown")
 
-    Args:
-        db_name (str): Nome do arquivo do banco de dados (ex: 'devcrew.db')
 
-    Returns:
-        str: Relatório detalhado da estrutura do banco.
-    """
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "N/A"
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{size} B"
+
+
+def _stat1_estimates(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Estimativa de linhas por tabela a partir de sqlite_stat1 (primeiro número de 'stat')."""
+    try:
+        rows = conn.execute("SELECT tbl, stat FROM sqlite_stat1;").fetchall()
+    except sqlite3.OperationalError:
+        return {}  # ANALYZE nunca foi executado neste banco
+    estimates: Dict[str, int] = {}
+    for tbl, stat in rows:
+        try:
+            estimate = int(str(stat).split()[0])
+        except (ValueError, IndexError):
+            continue
+        estimates[tbl.lower()] = max(estimates.get(tbl.lower(), 0), estimate)
+    return estimates
+
+
+def _dbstat_pages(conn: sqlite3.Connection) -> Dict[str, Tuple[int, int]]:
+    """(páginas, bytes) por tabela/índice via dbstat, quando a extensão estiver disponível."""
+    try:
+        rows = conn.execute(
+            "SELECT name, pageno, pgsize FROM dbstat WHERE aggregate=TRUE;"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {name.lower(): (pages, size) for name, pages, size in rows}
+
+
+def _exact_count(db_path: str, table_name: str, timeout: float) -> Tuple[str, Optional[int], Optional[str]]:
+    """COUNT(*) em uma conexão somente leitura dedicada, abortado ao estourar o timeout."""
+    deadline = time.monotonic() + timeout
+    conn = sqlite3.connect(f"file:{quote(db_path)}?mode=ro", uri=True, check_same_thread=False)
     try:
-        if not db_name.endswith(".db"):
-            db_name = f"{db_name}.db"
+        # Retornar valor verdadeiro no progress handler interrompe a consulta
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        (count,) = conn.execute(f"SELECT COUNT(*) FROM {_quote(table_name)};").fetchone()
+        return table_name, count, None
+    except sqlite3.OperationalError as e:
+        if "interrupt" in str(e).lower():
+            return table_name, None, f"timeout após {timeout:g}s"
+        return table_name, None, str(e)
+    finally:
+        conn.close()
+
+
+def _exact_counts(db_path: str, tables: List[str], timeout: float, max_workers: int) -> Dict[str, Tuple[Optional[int], Optional[str]]]:
+    workers = max(1, min(int(max_workers or 1), len(tables)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqlite-count") as executor:
+        results = executor.map(lambda t: _exact_count(db_path, t, timeout), tables)
+        return {name: (count, error) for name, count, error in results}
+
+
+def _compact_report(db_name: str, file_size: Optional[int], wal_size: int, page_count: int, page_size: int,
+                    exact_counts: bool, structure, row_counts: Dict[str, str], pages) -> List[str]:
+    """Relatório compacto: cabeçalho + uma linha por tabela, sem markdown nem emojis."""
+    mode = "exato" if exact_counts else "estimado"
+    lines = [
+        f"db={db_name} arquivo={_format_bytes(file_size)} wal={_format_bytes(wal_size)} "
+        f"paginas={page_count}x{page_size}B registros={mode}"
+    ]
+    for table_name, columns, indexes in structure:
+        cols = ", ".join(
+            f"{name} {ctype or 'TEXT'}{' PK' if pk else ''}" for _, name, ctype, _, _, pk in columns
+        )
+        line = f"{table_name} | registros={row_counts[table_name]}"
+        table_pages = pages.get(table_name.lower())
+        if table_pages:
+            line += f" paginas={table_pages[0]}"
+        line += f" | {cols}"
+        if indexes:
+            idx = ", ".join(
+                f"{name}({','.join(cols_)}){' UNIQUE' if unique else ''}" for name, unique, cols_ in indexes
+            )
+            line += f" | idx: {idx}"
+        lines.append(line)
+    return lines
+
 
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
+def _build_report(db_name: str, exact_counts: bool, table_timeout: float, max_workers: int,
+                  output_format: str = "compact", max_bytes: Optional[int] = None) -> str:
+    """Monta o relatório de análise do banco (sem cache)."""
+    db_path = resolve_db_path(db_name)
 
-        # Obtém todas as tabelas
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+    # Todas as leituras do relatório sobre o mesmo snapshot, sem bloquear escritores
+    with read_snapshot(db_name) as conn:
+        # Obtém todas as tabelas (metadados em cache), ignorando as de estatística internas
+        tables = [
+            t for t in schema_cache.list_tables(conn, db_name)
+            if not t.lower().startswith("sqlite_stat")
+        ]
 
         if not tables:
-            conn.close()
             return f"⚠️ Nenhuma tabela encontrada no banco '{db_name}'."
 
-        report = [f"🧩 Análise do banco: **{db_name}**\n"]
+        (page_size,) = conn.execute("PRAGMA page_size;").fetchone()
+        (page_count,) = conn.execute("PRAGMA page_count;").fetchone()
+        estimates = _stat1_estimates(conn)
+        has_stats = bool(estimates)
+        if not exact_counts:
+            # Tabelas sem sqlite_stat1: max(rowid), O(log n) pela B-tree
+            for table_name in tables:
+                if table_name.lower() not in estimates:
+                    estimate = estimate_rows(conn, table_name)
+                    if estimate is not None:
+                        estimates[table_name.lower()] = estimate
+        pages = _dbstat_pages(conn)
 
-        for (table_name,) in tables:
-            # Estrutura da tabela
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
+        structure = [
+            (
+                table_name,
+                schema_cache.table_columns(conn, db_name, table_name),
+                schema_cache.table_indexes(conn, db_name, table_name),
+            )
+            for table_name in tables
+        ]
 
-            # Contagem de registros
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-            (row_count,) = cursor.fetchone()
+    counts: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+    if exact_counts:
+        counts = _exact_counts(db_path, tables, float(table_timeout), max_workers)
 
-            report.append(f"### 🗂️ Tabela: `{table_name}`")
-            report.append(f"- Registros: **{row_count}**")
-            report.append(f"- Colunas ({len(columns)}):")
+    file_size = os.path.getsize(db_path) if os.path.exists(db_path) else None
+    wal_path = f"{db_path}-wal"
+    wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
 
-            for col in columns:
-                cid, name, ctype, notnull, dflt_value, pk = col
-                pk_flag = " (PK)" if pk else ""
-                report.append(f"  • `{name}` — {ctype or 'TEXT'}{pk_flag}")
+    if output_format == "compact":
+        row_counts: Dict[str, str] = {}
+        for table_name, _, _ in structure:
+            if exact_counts:
+                count, error = counts.get(table_name, (None, "não contada"))
+                row_counts[table_name] = str(count) if error is None else f"? ({error})"
+            else:
+                estimate = estimates.get(table_name.lower())
+                row_counts[table_name] = f"~{estimate}" if estimate is not None else "?"
+        lines = _compact_report(db_name, file_size, wal_size, page_count, page_size,
+                                exact_counts, structure, row_counts, pages)
+        if not exact_counts and not has_stats:
+            lines.append("(estimativas por max(rowid): use run_analyze=True para estimativas do ANALYZE)")
+        return truncate_text("\n".join(lines), max_bytes)
 
-            report.append("")  # linha em branco
+    report = [f"🧩 Análise do banco: **{db_name}**\n"]
+    report.append(
+        f"- Arquivo: {_format_bytes(file_size)} (WAL: {_format_bytes(wal_size)}) — "
+        f"{page_count} páginas de {page_size} B"
+    )
+    report.append(f"- Modo: {'contagem exata' if exact_counts else 'rápido (estimativas de sqlite_stat1 ou max(rowid))'}")
+    if not exact_counts and not has_stats:
+        report.append("- ℹ️ Sem sqlite_stat1: estimativas por max(rowid); use run_analyze=True para as do ANALYZE.")
+    report.append("")
 
-        conn.close()
+    for table_name, columns, indexes in structure:
+        if exact_counts:
+            count, error = counts.get(table_name, (None, "não contada"))
+            rows_text = f"**{count}**" if error is None else f"⏱️ indisponível ({error})"
+        else:
+            estimate = estimates.get(table_name.lower())
+            rows_text = f"~**{estimate}** (estimativa)" if estimate is not None else "N/A"
+
+        report.append(f"### 🗂️ Tabela: `{table_name}`")
+        report.append(f"- Registros: {rows_text}")
+
+        table_pages = pages.get(table_name.lower())
+        if table_pages:
+            report.append(f"- Páginas: {table_pages[0]} ({_format_bytes(table_pages[1])})")
+
+        report.append(f"- Colunas ({len(columns)}):")
+        for col in columns:
+            cid, name, ctype, notnull, dflt_value, pk = col
+            pk_flag = " (PK)" if pk else ""
+            report.append(f"  • `{name}` — {ctype or 'TEXT'}{pk_flag}")
+
+        if indexes:
+            report.append(f"- Índices ({len(indexes)}):")
+            for index_name, unique, index_cols in indexes:
+                unique_flag = " (UNIQUE)" if unique else ""
+                index_pages = pages.get(index_name.lower())
+                pages_text = f" — {index_pages[0]} páginas" if index_pages else ""
+                report.append(f"  • `{index_name}` ({', '.join(index_cols)}){unique_flag}{pages_text}")
+
+        report.append("")  # linha em branco
+
+    return truncate_text("\n".join(report), max_bytes)
+
+
+@tool("SQLite Analyze Database")
+@traced_tool("SQLite Analyze Database")
+def analyze_sqlite_database(
+    db_name: Optional[str] = None,
+    exact_counts: bool = False,
+    run_analyze: bool = False,
+    table_timeout: float = DEFAULT_TABLE_TIMEOUT,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    output_format: str = "compact",
+    max_bytes: Optional[int] = None,
+) -> str:
+    """
+    Analisa todas as tabelas existentes em um banco SQLite, listando:
+    - Nome da tabela
+    - Número de colunas
+    - Nomes e tipos das colunas
+    - Número (estimado ou exato) de registros em cada tabela
+    - Índices, páginas ocupadas e tamanho do arquivo
+
+    Por padrão usa o modo rápido: as contagens são estimativas lidas de sqlite_stat1,
+    sem varrer as tabelas.
+
+    Args:
+        db_name (str, optional): Nome do arquivo do banco de dados (ex: 'devcrew.db').
+            Se omitido, usa o banco ativo da sessão.
+        exact_counts (bool): se True, executa COUNT(*) exato em paralelo, em conexões
+            somente leitura separadas, com timeout por tabela.
+        run_analyze (bool): se True, executa ANALYZE antes para gerar/atualizar as estatísticas.
+        table_timeout (float): tempo máximo (segundos) do COUNT(*) de cada tabela no modo exato.
+        max_workers (int): número de tabelas contadas em paralelo no modo exato.
+        output_format (str): 'compact' (padrão; uma linha por tabela) ou 'markdown'
+            (relatório detalhado, mais legível para humanos).
+        max_bytes (int, optional): orçamento de bytes do relatório; o excedente é omitido.
+
+    Returns:
+        str: Relatório detalhado da estrutura do banco.
+    """
+    try:
+        db_name = resolve_db_name(db_name)
+
+        if run_analyze:
+            with write_connection(db_name) as conn:
+                conn.execute("ANALYZE;")
+                conn.commit()
+            result_cache.notify_write(db_name)
+
+        # O relatório só é refeito quando o banco muda (impressão digital schema/data_version)
+        if output_format not in REPORT_FORMATS:
+            output_format = "compact"
 
-        return "\n".join(report)
+        call_key = ("analyze", bool(exact_counts), float(table_timeout), int(max_workers), output_format, max_bytes)
+        return result_cache.get_or_compute(
+            db_name,
+            call_key,
+            lambda: _build_report(db_name, exact_counts, table_timeout, max_workers, output_format, max_bytes),
+        )
 
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
@@ -0,0 +1,285 @@
+# tools/sqlite_bulk_loader.py
+import csv
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence
+
+from runtime.tracing import annotate, tracer
+from tools.sqlite_query_guard import query_guard
+from tools.sqlite_statement_engine import first_keyword
+
+# Tamanho de página dos bancos construídos em carga em massa (potência de 2, 512-65536)
+BULK_PAGE_SIZE = int(os.getenv("DEVCREW_BULK_PAGE_SIZE", "8192"))
+# Cache de páginas (KiB) durante a construção: ordena os índices em memória
+BULK_CACHE_KB = int(os.getenv("DEVCREW_BULK_CACHE_KB", str(256 * 1024)))
+# Linhas por executemany ao carregar CSV/NDJSON
+BULK_BATCH_SIZE = int(os.getenv("DEVCREW_BULK_BATCH_SIZE", "10000"))
+# Tempo máximo (s) de uma construção; cargas grandes são longas por natureza
+BULK_TIMEOUT = float(os.getenv("DEVCREW_BULK_TIMEOUT", "1800"))
+
+SEED_FORMATS = ("sql", "csv", "ndjson")
+_EXTENSIONS = {".sql": "sql", ".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+# PRAGMAs da construção: o arquivo é temporário até o final, então journal e fsync
+# não protegem nada — uma falha descarta o arquivo inteiro
+_BUILD_PRAGMAS = (
+    ("journal_mode", "OFF"),
+    ("synchronous", "OFF"),
+    ("locking_mode", "EXCLUSIVE"),
+    ("temp_store", "MEMORY"),
+)
+# Instruções de um dump SQL aceitas na carga (o restante é recusado)
+_DUMP_SKIPPED = ("begin", "commit", "end", "pragma", "analyze", "vacuum")
+_DUMP_ALLOWED = ("create", "insert", "replace")
+_SQLITE_SEQUENCE_RE = re.compile(r"^\s*delete\s+from\s+[\"']?sqlite_sequence[\"']?\s*;?\s*$", re.IGNORECASE)
+_CREATE_INDEX_RE = re.compile(r"^\s*create\s+(?:unique\s+)?index\b", re.IGNORECASE)
+
+
+class BulkLoadError(Exception):
+    """Erro de validação da carga em massa; str(e) é a mensagem devolvida pela tool."""
+
+
+@dataclass
+class BulkLoadResult:
+    tables: int = 0
+    indexes: int = 0
+    rows: int = 0
+    seeds: List[str] = field(default_factory=list)
+    page_size: int = BULK_PAGE_SIZE
+    vacuumed: bool = False
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    size_bytes: int = 0
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def is_create_index(sql: str) -> bool:
+    return bool(_CREATE_INDEX_RE.match(re.sub(r"--[^\n]*|/\*.*?\*/", "", sql, flags=re.DOTALL)))
+
+
+def seed_format(path: str) -> str:
+    """Formato do arquivo de carga pela extensão (.sql, .csv, .ndjson/.jsonl, com ou sem .gz)."""
+    base = path[:-3] if path.lower().endswith(".gz") else path
+    fmt = _EXTENSIONS.get(os.path.splitext(base)[1].lower())
+    if fmt is None:
+        raise BulkLoadError(
+            f"⚠️ Formato de carga não reconhecido: '{os.path.basename(path)}'. "
+            "Use .sql (dump), .csv ou .ndjson/.jsonl (opcionalmente .gz)."
+        )
+    return fmt
+
+
+def seed_table_name(path: str) -> str:
+    """Tabela padrão de um arquivo CSV/NDJSON: o nome do arquivo sem extensões."""
+    return os.path.basename(path).split(".")[0]
+
+
+def _open_text(path: str) -> IO[str]:
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_sql_statements(fh: IO[str]) -> Iterator[str]:
+    """Lê um script SQL instrução a instrução, sem carregar o arquivo inteiro na memória."""
+    buffer: List[str] = []
+    for line in fh:
+        buffer.append(line)
+        if ";" in line and sqlite3.complete_statement("".join(buffer)):
+            statement = "".join(buffer).strip()
+            buffer = []
+            if statement:
+                yield statement
+    tail = "".join(buffer).strip()
+    if tail and re.sub(r"--[^\n]*|/\*.*?\*/", "", tail, flags=re.DOTALL).strip():
+        yield tail
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)});").fetchall()]
+    if not columns:
+        raise BulkLoadError(f"⚠️ A tabela '{table}' não existe no esquema; crie-a em 'schema_sql'.")
+    return columns
+
+
+def _insert_batches(conn: sqlite3.Connection, table: str, columns: Sequence[str],
+                    rows: Iterator[Sequence[Any]]) -> int:
+    sql = (f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)});")
+    total = 0
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BULK_BATCH_SIZE:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def _load_csv(conn: sqlite3.Connection, path: str, table: str) -> int:
+    existing = {c.lower(): c for c in _table_columns(conn, table)}
+    with _open_text(path) as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if not header:
+            return 0
+        unknown = [h for h in header if h.strip().lower() not in existing]
+        if unknown:
+            raise BulkLoadError(f"⚠️ Colunas do CSV inexistentes em '{table}': {', '.join(unknown)}.")
+        columns = [existing[h.strip().lower()] for h in header]
+        # Campo vazio vira NULL (mesma convenção da exportação CSV); a afinidade de tipo
+        # da coluna converte o texto para INTEGER/REAL
+        return _insert_batches(conn, table, columns,
+                               ([v if v != "" else None for v in row] for row in reader if row))
+
+
+def _load_ndjson(conn: sqlite3.Connection, path: str, table: str) -> int:
+    existing = {c.lower(): c for c in _table_columns(conn, table)}
+
+    def objects() -> Iterator[Dict[str, Any]]:
+        with _open_text(path) as fh:
+            for number, line in enumerate(fh, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    value = json.loads(line)
+                except ValueError as e:
+                    raise BulkLoadError(f"⚠️ Linha {number} de '{os.path.basename(path)}' não é JSON válido: {e}")
+                if not isinstance(value, dict):
+                    raise BulkLoadError(f"⚠️ Linha {number} de '{os.path.basename(path)}' não é um objeto JSON.")
+                yield {k.lower(): v for k, v in value.items()}
+
+    stream = objects()
+    first = next(stream, None)
+    if first is None:
+        return 0
+    unknown = [k for k in first if k not in existing]
+    if unknown:
+        raise BulkLoadError(f"⚠️ Campos do NDJSON inexistentes em '{table}': {', '.join(unknown)}.")
+    keys = list(first)
+
+    def rows() -> Iterator[List[Any]]:
+        yield [_json_value(first.get(k)) for k in keys]
+        for obj in stream:
+            yield [_json_value(obj.get(k)) for k in keys]
+
+    return _insert_batches(conn, table, [existing[k] for k in keys], rows())
+
+
+def _json_value(value: Any) -> Any:
+    # Objetos e listas aninhados são guardados como texto JSON
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _load_sql(conn: sqlite3.Connection, path: str, deferred_indexes: List[str]) -> int:
+    """Executa um dump SQL (CREATE/INSERT); índices do dump ficam para depois da carga."""
+    rows = 0
+    with _open_text(path) as fh:
+        for statement in iter_sql_statements(fh):
+            keyword = first_keyword(statement)
+            if keyword in _DUMP_SKIPPED:
+                continue  # transação, PRAGMAs e estatísticas são controlados pela carga
+            if is_create_index(statement):
+                deferred_indexes.append(statement)
+                continue
+            if keyword not in _DUMP_ALLOWED and not _SQLITE_SEQUENCE_RE.match(statement):
+                raise BulkLoadError(
+                    f"🚫 Instrução não permitida no arquivo de carga '{os.path.basename(path)}': "
+                    f"{statement[:80]}. Use apenas CREATE e INSERT."
+                )
+            before = conn.total_changes
+            conn.execute(statement)
+            rows += conn.total_changes - before if keyword in ("insert", "replace") else 0
+    return rows
+
+
+def build_database(path: str, schema_statements: List[str], seeds: List[str],
+                   seed_table: Optional[str] = None, page_size: Optional[int] = None,
+                   vacuum: bool = False) -> BulkLoadResult:
+    """
+    Constrói um banco novo em `path` no modo de carga em massa:
+
+    1. PRAGMAs de construção (page_size, journal_mode=OFF, synchronous=OFF, cache grande);
+    2. tabelas, views e triggers do esquema;
+    3. carga dos arquivos (dump SQL, CSV ou NDJSON) em uma única transação;
+    4. índices (do esquema e dos dumps) criados só depois dos dados — cada índice é
+       ordenado uma vez, em vez de atualizado a cada linha inserida;
+    5. ANALYZE e, opcionalmente, VACUUM.
+
+    `path` deve ser um arquivo temporário: em caso de erro ele fica incompleto e cabe
+    ao chamador descartá-lo. Lança BulkLoadError (validação) ou sqlite3.Error.
+    """
+    result = BulkLoadResult(page_size=int(page_size or BULK_PAGE_SIZE), vacuumed=bool(vacuum))
+    if result.page_size < 512 or result.page_size > 65536 or result.page_size & (result.page_size - 1):
+        raise BulkLoadError(f"⚠️ page_size inválido: {result.page_size}. Use uma potência de 2 entre 512 e 65536.")
+
+    tables = [s for s in schema_statements if not is_create_index(s)]
+    indexes = [s for s in schema_statements if is_create_index(s)]
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        # page_size só vale se definido antes da primeira tabela
+        conn.execute(f"PRAGMA page_size={result.page_size};")
+        for name, value in _BUILD_PRAGMAS:
+            conn.execute(f"PRAGMA {name}={value};")
+        conn.execute(f"PRAGMA cache_size=-{BULK_CACHE_KB};")
+
+        with query_guard.budget(conn, timeout=BULK_TIMEOUT):
+            started = time.perf_counter()
+            conn.execute("BEGIN;")
+            with tracer.span("bulk.schema", statements=len(tables)):
+                for statement in tables:
+                    conn.execute(statement)
+            result.timings_ms["schema_ms"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            with tracer.span("bulk.load", files=len(seeds)):
+                for seed in seeds:
+                    fmt = seed_format(seed)
+                    if fmt == "sql":
+                        result.rows += _load_sql(conn, seed, indexes)
+                    elif fmt == "csv":
+                        result.rows += _load_csv(conn, seed, seed_table or seed_table_name(seed))
+                    else:
+                        result.rows += _load_ndjson(conn, seed, seed_table or seed_table_name(seed))
+                    result.seeds.append(os.path.basename(seed))
+            result.timings_ms["load_ms"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            with tracer.span("bulk.indexes", indexes=len(indexes)):
+                for statement in indexes:
+                    conn.execute(statement)
+            conn.execute("COMMIT;")
+            result.timings_ms["indexes_ms"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            with tracer.span("bulk.analyze"):
+                conn.execute("ANALYZE;")
+            if vacuum:
+                with tracer.span("bulk.vacuum"):
+                    conn.execute("VACUUM;")
+            result.timings_ms["analyze_ms"] = (time.perf_counter() - started) * 1000
+
+        result.tables = conn.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';"
+        ).fetchone()[0]
+        result.indexes = len(indexes)
+        # De volta ao modo padrão: o pool ativa o WAL ao abrir o banco pronto
+        conn.execute("PRAGMA journal_mode=DELETE;")
+    finally:
+        conn.close()
+    result.size_bytes = os.path.getsize(path)
+    annotate(rows=result.rows, file_bytes=result.size_bytes)
+    return result
@@ -0,0 +1,455 @@
+# tools/sqlite_connection_pool.py
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+# Tempo (em segundos) que uma conexão pode ficar ociosa antes de ser fechada
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("DEVCREW_SQLITE_IDLE_TIMEOUT", "300"))
+# Espera (ms) por locks de outros processos antes de falhar com "database is locked"
+BUSY_TIMEOUT_MS = int(os.getenv("DEVCREW_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Espera máxima (s) pela vez na fila de escrita do banco
+WRITE_QUEUE_TIMEOUT = float(os.getenv("DEVCREW_SQLITE_WRITE_TIMEOUT", "30"))
+# Checkpoint automático do WAL a cada N páginas (feito pelo próprio commit)
+WAL_AUTOCHECKPOINT_PAGES = int(os.getenv("DEVCREW_SQLITE_WAL_AUTOCHECKPOINT", "1000"))
+# Tamanho a partir do qual o WAL é truncado (checkpoint TRUNCATE quando o banco está ocioso)
+WAL_TRUNCATE_BYTES = int(os.getenv("DEVCREW_SQLITE_WAL_TRUNCATE_BYTES", str(64 * 1024 * 1024)))
+# Intervalo (s) entre verificações de checkpoint pela thread de manutenção
+CHECKPOINT_INTERVAL = float(os.getenv("DEVCREW_SQLITE_CHECKPOINT_INTERVAL", "30"))
+# Maior banco copiado em memória para leituras consistentes quando o arquivo não está em WAL
+SNAPSHOT_MAX_BYTES = int(os.getenv("DEVCREW_SQLITE_SNAPSHOT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# PRAGMAs aplicados uma única vez por conexão, logo após a abertura
+_CONNECTION_PRAGMAS = (
+    ("cache_size", -64000),      # ~64 MB de page cache por conexão
+    ("mmap_size", 268435456),    # 256 MB de leitura via mmap
+    ("synchronous", "NORMAL"),   # seguro em WAL e bem mais rápido que FULL
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", BUSY_TIMEOUT_MS),
+    ("wal_autocheckpoint", WAL_AUTOCHECKPOINT_PAGES),
+    ("journal_size_limit", WAL_TRUNCATE_BYTES),
+)
+
+
+def resolve_db_path(db_name: str) -> str:
+    """
+    Normaliza o nome do banco para o caminho absoluto usado como chave do pool.
+    Bancos em memória (':memory:') são mantidos como estão.
+    """
+    if db_name == ":memory:" or db_name.startswith("file:"):
+        return db_name
+    return os.path.abspath(os.path.expanduser(db_name))
+
+
+def _is_file_db(path: str) -> bool:
+    return path != ":memory:" and not path.startswith("file:")
+
+
+class _PoolEntry:
+    __slots__ = ("conn", "path", "readonly", "refcount", "last_used")
+
+    def __init__(self, conn: sqlite3.Connection, path: str, readonly: bool = False):
+        self.conn = conn
+        self.path = path
+        self.readonly = readonly
+        self.refcount = 0
+        self.last_used = time.monotonic()
+
+
+class _WriteQueue:
+    """
+    Fila FIFO de escritores de um banco: uma escrita por vez, na ordem de chegada.
+
+    Escritores do processo nunca disputam o lock do SQLite entre si (sem
+    "database is locked"); o busy_timeout cobre apenas outros processos.
+    Reentrante na mesma thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[int, threading.Event]] = deque()
+        self._owner: Optional[int] = None
+        self._depth = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        me = threading.get_ident()
+        with self._lock:
+            if self._owner == me:
+                self._depth += 1
+                return True
+            if self._owner is None and not self._waiters:
+                self._owner, self._depth = me, 1
+                return True
+            waiter = (me, threading.Event())
+            self._waiters.append(waiter)
+        if waiter[1].wait(timeout):
+            return True
+        with self._lock:
+            if self._owner == me:  # a vez chegou junto com o timeout
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            if self._waiters:
+                # Entrega a vez diretamente ao próximo da fila (sem corrida pelo lock)
+                owner, event = self._waiters.popleft()
+                self._owner, self._depth = owner, 1
+                event.set()
+            else:
+                self._owner = None
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+
+class SQLiteConnectionPool:
+    """
+    Pool de conexões SQLite compartilhado por todas as Tools do processo.
+
+    - Uma conexão reutilizável por (caminho do banco, thread, leitura/escrita).
+    - WAL e PRAGMAs de desempenho configurados apenas na abertura.
+    - Separação leitura/escrita: leituras usam conexões somente leitura
+      (`mode=ro`) que, em WAL, leem um snapshot e nunca bloqueiam escritores;
+      escritas passam por uma fila FIFO por banco (`write_connection`).
+    - Checkpoint automático: `wal_autocheckpoint` nos commits e, quando o WAL passa
+      de WAL_TRUNCATE_BYTES, um checkpoint TRUNCATE com o banco ocioso.
+    - Conexões ociosas por mais de `idle_timeout` segundos são fechadas
+      por uma thread de limpeza em segundo plano.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int, bool], _PoolEntry] = {}
+        self._by_conn: Dict[int, _PoolEntry] = {}
+        self._journal_modes: Dict[str, str] = {}
+        self._write_queues: Dict[str, _WriteQueue] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    # Abertura e configuração
+    # ------------------------------------------------------------------ #
+    def _open(self, path: str, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(
+                f"file:{quote(path)}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            for name, value in _CONNECTION_PRAGMAS:
+                conn.execute(f"PRAGMA {name}={value};")
+            conn.execute("PRAGMA query_only=ON;")
+            return conn
+
+        conn = sqlite3.connect(
+            path,
+            check_same_thread=False,  # a thread de limpeza precisa poder fechar a conexão
+            uri=path.startswith("file:"),
+            cached_statements=256,
+        )
+        if path != ":memory:" and self._journal_mode_of(path) is None:
+            # journal_mode=WAL é persistente no arquivo: basta configurar uma vez.
+            # Pode não ser aplicado (ex.: banco bloqueado por outro processo em modo rollback)
+            (mode,) = conn.execute("PRAGMA journal_mode=WAL;").fetchone()
+            with self._lock:
+                self._journal_modes[path] = str(mode).lower()
+        for name, value in _CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {name}={value};")
+        return conn
+
+    def _journal_mode_of(self, path: str) -> Optional[str]:
+        with self._lock:
+            return self._journal_modes.get(path)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is not None or self.idle_timeout <= 0:
+            return
+        self._reaper = threading.Thread(
+            target=self._reap_loop, name="sqlite-pool-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        interval = max(min(self.idle_timeout / 2, CHECKPOINT_INTERVAL), 1.0)
+        while not self._stop.wait(interval):
+            self.checkpoint_idle()
+            self.reap_idle()
+
+    # ------------------------------------------------------------------ #
+    # API pública
+    # ------------------------------------------------------------------ #
+    def acquire(self, db_name: str, readonly: bool = False) -> sqlite3.Connection:
+        """
+        Obtém a conexão da thread atual para o banco informado (abrindo se preciso).
+        Com readonly=True devolve a conexão somente leitura; se o arquivo ainda não
+        existe (ou é um banco em memória), usa a conexão de leitura e escrita.
+        """
+        path = resolve_db_path(db_name)
+        if readonly and not (_is_file_db(path) and os.path.exists(path)):
+            readonly = False
+        if readonly and self._journal_mode_of(path) is None:
+            # Garante o WAL (configurado pela conexão de escrita) antes do primeiro leitor
+            with self.connection(path):
+                pass
+        key = (path, threading.get_ident(), readonly)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refcount += 1
+                entry.last_used = time.monotonic()
+                return entry.conn
+
+        # Abre fora do lock global: connect e PRAGMAs (journal_mode=WAL pode esperar pelo
+        # busy_timeout) não bloqueiam as demais threads e bancos. A chave inclui a thread,
+        # então só esta thread registra a entrada
+        conn = self._open(path, readonly)
+        with self._lock:
+            entry = _PoolEntry(conn, path, readonly)
+            self._entries[key] = entry
+            self._by_conn[id(conn)] = entry
+            self._ensure_reaper()
+            entry.refcount += 1
+            entry.last_used = time.monotonic()
+            return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devolve a conexão ao pool, desfazendo qualquer transação deixada aberta."""
+        with self._lock:
+            entry = self._by_conn.get(id(conn))
+            if entry is None or entry.conn is not conn:
+                return
+            entry.refcount = max(entry.refcount - 1, 0)
+            entry.last_used = time.monotonic()
+            if entry.refcount == 0 and conn.in_transaction:
+                conn.rollback()
+
+    def reap_idle(self) -> int:
+        """Fecha conexões sem uso há mais de `idle_timeout` segundos. Retorna quantas foram fechadas."""
+        now = time.monotonic()
+        closed = 0
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.refcount == 0 and now - entry.last_used >= self.idle_timeout:
+                    entry.conn.close()
+                    del self._entries[key]
+                    self._by_conn.pop(id(entry.conn), None)
+                    closed += 1
+        return closed
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões do pool (usado no encerramento do processo)."""
+        self._stop.set()
+        with self._lock:
+            for entry in self._entries.values():
+                try:
+                    entry.conn.close()
+                except sqlite3.Error:
+                    pass
+            self._entries.clear()
+            self._by_conn.clear()
+
+    @contextmanager
+    def connection(self, db_name: str, readonly: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire(db_name, readonly=readonly)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def journal_mode(self, db_name: str) -> Optional[str]:
+        """Modo de journal aplicado ao banco pelo pool (None se ainda não foi aberto)."""
+        return self._journal_mode_of(resolve_db_path(db_name))
+
+    def _write_queue(self, path: str) -> _WriteQueue:
+        with self._lock:
+            queue = self._write_queues.get(path)
+            if queue is None:
+                queue = self._write_queues[path] = _WriteQueue()
+            return queue
+
+    @contextmanager
+    def write_connection(self, db_name: str, timeout: float = WRITE_QUEUE_TIMEOUT) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão de escrita obtida na vez do chamador na fila de escrita do banco.
+        A transação deve ser concluída (commit/rollback) dentro do bloco.
+        """
+        path = resolve_db_path(db_name)
+        queue = self._write_queue(path)
+        if not queue.acquire(timeout):
+            raise sqlite3.OperationalError(
+                f"database is locked: a fila de escrita de '{os.path.basename(path)}' "
+                f"não liberou a vez em {timeout:g}s"
+            )
+        try:
+            with self.connection(path) as conn:
+                yield conn
+        finally:
+            queue.release()
+
+    @contextmanager
+    def read_snapshot(self, db_name: str) -> Iterator[sqlite3.Connection]:
+        """
+        Conexão de leitura com uma visão consistente do banco durante todo o bloco.
+
+        Em WAL, abre uma transação de leitura na conexão somente leitura (snapshot,
+        sem bloquear escritores). Sem WAL, uma leitura longa bloquearia os escritores:
+        o banco é copiado para a memória com a API de backup (até SNAPSHOT_MAX_BYTES)
+        e a leitura acontece sobre a cópia.
+        """
+        path = resolve_db_path(db_name)
+        with self.connection(path, readonly=True) as conn:
+            mode = self._journal_mode_of(path)
+            if mode == "wal" or not _is_file_db(path) or os.path.getsize(path) > SNAPSHOT_MAX_BYTES:
+                conn.execute("BEGIN;")
+                try:
+                    # A primeira leitura fixa o snapshot da transação
+                    conn.execute("SELECT count(*) FROM sqlite_master;").fetchone()
+                    yield conn
+                finally:
+                    if conn.in_transaction:
+                        conn.rollback()
+                return
+            snapshot = sqlite3.connect(":memory:", check_same_thread=False)
+            try:
+                conn.backup(snapshot)
+                yield snapshot
+            finally:
+                snapshot.close()
+
+    def replace_database(self, db_name: str, source_path: str, timeout: float = WRITE_QUEUE_TIMEOUT,
+                         overwrite: bool = False) -> None:
+        """
+        Coloca `source_path` (ex.: banco construído em carga em massa) no lugar do arquivo
+        do banco, na vez da fila de escrita. As conexões do pool para o caminho são
+        fechadas e o WAL/SHM que sobrar é removido, para que a próxima abertura leia o
+        arquivo novo. Falha se alguma conexão do banco estiver emprestada e, sem
+        overwrite=True, se já existir um banco com dados no caminho (FileExistsError).
+        """
+        path = resolve_db_path(db_name)
+        queue = self._write_queue(path)
+        if not queue.acquire(timeout):
+            raise sqlite3.OperationalError(
+                f"database is locked: a fila de escrita de '{os.path.basename(path)}' "
+                f"não liberou a vez em {timeout:g}s"
+            )
+        try:
+            if not overwrite and os.path.exists(path) and os.path.getsize(path) > 0:
+                raise FileExistsError(f"o banco '{os.path.basename(path)}' já existe e não será substituído")
+            with self._lock:
+                if any(e.path == path and e.refcount > 0 for e in self._entries.values()):
+                    raise sqlite3.OperationalError(
+                        f"database is locked: '{os.path.basename(path)}' está em uso e não pode ser substituído"
+                    )
+                for key, entry in list(self._entries.items()):
+                    if entry.path == path:
+                        try:
+                            entry.conn.close()
+                        except sqlite3.Error:
+                            pass
+                        del self._entries[key]
+                        self._by_conn.pop(id(entry.conn), None)
+                self._journal_modes.pop(path, None)
+            os.replace(source_path, path)
+            for suffix in ("-wal", "-shm", "-journal"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        finally:
+            queue.release()
+
+    def checkpoint(self, db_name: str, mode: str = "PASSIVE") -> Optional[Tuple[int, int, int]]:
+        """
+        Executa `PRAGMA wal_checkpoint(mode)` na vez da fila de escrita.
+        Retorna (busy, páginas no WAL, páginas copiadas) ou None se o banco não usa WAL.
+        """
+        path = resolve_db_path(db_name)
+        if self._journal_mode_of(path) != "wal":
+            return None
+        with self.write_connection(path) as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode.upper()});").fetchone()
+        return tuple(row) if row else None
+
+    def checkpoint_idle(self) -> int:
+        """
+        Trunca o WAL dos bancos acima de WAL_TRUNCATE_BYTES que não estão em uso
+        (nenhuma conexão emprestada nem escrita na fila). Retorna quantos foram truncados.
+        """
+        with self._lock:
+            busy = {e.path for e in self._entries.values() if e.refcount > 0}
+            candidates = [p for p, m in self._journal_modes.items() if m == "wal" and p not in busy]
+        truncated = 0
+        for path in candidates:
+            try:
+                if os.path.getsize(f"{path}-wal") <= WAL_TRUNCATE_BYTES:
+                    continue
+            except OSError:
+                continue
+            queue = self._write_queue(path)
+            if not queue.acquire(timeout=0):
+                continue
+            try:
+                with self.connection(path) as conn:
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+                truncated += 1
+            except sqlite3.Error:
+                pass  # leitores de outros processos: tenta de novo no próximo ciclo
+            finally:
+                queue.release()
+        return truncated
+
+
+# ✅ Instância global compartilhada por todas as Tools
+pool = SQLiteConnectionPool()
+atexit.register(pool.close_all)
+
+
+def pooled_connection(db_name: str):
+    """
+    Atalho para `pool.connection(db_name)`.
+
+    Uso:
+        with pooled_connection("devcrew.db") as conn:
+            conn.execute("SELECT 1;")
+    """
+    return pool.connection(db_name)
+
+
+def read_connection(db_name: str):
+    """
+    Conexão somente leitura (`mode=ro`) do pool. Em WAL, leituras longas (análises,
+    SELECTs grandes) não bloqueiam escritas de outras sessões.
+
+    Uso:
+        with read_connection("devcrew.db") as conn:
+            conn.execute("SELECT * FROM users;").fetchall()
+    """
+    return pool.connection(db_name, readonly=True)
+
+
+def write_connection(db_name: str, timeout: float = WRITE_QUEUE_TIMEOUT):
+    """Atalho para `pool.write_connection`: escrita serializada pela fila do banco."""
+    return pool.write_connection(db_name, timeout)
+
+
+def replace_database(db_name: str, source_path: str, timeout: float = WRITE_QUEUE_TIMEOUT,
+                     overwrite: bool = False) -> None:
+    """Atalho para `pool.replace_database`: coloca um arquivo já pronto no lugar do banco."""
+    pool.replace_database(db_name, source_path, timeout, overwrite)
+
+
+def read_snapshot(db_name: str):
+    """Atalho para `pool.read_snapshot`: várias leituras sobre um mesmo estado do banco."""
+    return pool.read_snapshot(db_name)
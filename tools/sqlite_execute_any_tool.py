@@ -1,16 +1,57 @@
-import sqlite3
 import json
+import sqlite3
+import time
+from typing import Any, Optional, Union
 from crewai.tools import tool
+from runtime.tracing import traced_tool, tracer
+from tools.sqlite_connection_pool import read_connection, write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_output_encoder import format_query_result
+from tools.sqlite_query_guard import QueryGuardError, QueryInterrupted, assess_query, query_guard
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
+from tools.sqlite_result_stream import PageTokenError, render_page, wants_streaming
+from tools.sqlite_statement_engine import (
+    StatementError,
+    format_script_result,
+    format_statement_error,
+    is_read_only,
+    split_statements,
+    statement_engine,
+)
+from tools.sqlite_workload_log import workload_log
 
 @tool("SQLite Execute Any SQL")
-def execute_any_sql(db_name: str = None, sql: str = "") -> str:
+@traced_tool("SQLite Execute Any SQL")
+def execute_any_sql(
+    db_name: Optional[str] = None,
+    sql: str = "",
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    keyset_column: Optional[str] = None,
+    output_format: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    params: Optional[Union[str, list, dict]] = None,
+) -> str:
     """
     Executa qualquer instrução SQL em um banco SQLite.
     Suporta SELECT, INSERT, UPDATE, DELETE, CREATE, DROP, ALTER, etc.
 
+    Scripts com várias instruções são divididos e executados em uma única transação:
+    se uma instrução falhar, nada é aplicado. O retorno traz, para cada instrução, as
+    linhas afetadas ou o conjunto de resultados.
+
     Args:
-        db_name (str): Nome do banco de dados (ex: 'devcrew.db'). Se não informado, usa o banco ativo.
-        sql (str): Instrução SQL completa.
+        db_name (str): Nome do banco de dados (ex: 'devcrew.db'). Se não informado, usa o banco ativo da sessão.
+        sql (str): Instrução SQL completa (ou script com várias instruções separadas por ';').
+        limit, offset, cursor, keyset_column: paginação em modo streaming para consultas
+            de leitura (mesma semântica da tool 'SQLite Query Executor').
+        output_format, max_bytes: formato compacto da saída e orçamento de bytes
+            (mesma semântica da tool 'SQLite Query Executor').
+        params (list | dict | str, optional): parâmetros para os placeholders (? ou :nome)
+            de uma única instrução. Uma lista de conjuntos (ex: [[1, "a"], [2, "b"]])
+            repete a mesma instrução preparada para cada conjunto (executemany).
 
     Returns:
         str: Resultado formatado ou mensagem de sucesso.
@@ -19,45 +60,79 @@ def execute_any_sql(db_name: str = None, sql: str = "") -> str:
         if not sql or not isinstance(sql, str):
             return "⚠️ A instrução SQL está vazia ou inválida."
 
+        statements = split_statements(sql)
+        if not statements:
+            return "⚠️ A instrução SQL está vazia ou inválida."
 
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-
-        sql_clean = sql.strip().lower()
-
-        # Verifica se é uma consulta (SELECT)
-        is_select = sql_clean.startswith("select") or sql_clean.startswith("pragma") or sql_clean.startswith("explain")
-
-        if is_select:
-            cursor.execute(sql)
-            rows = cursor.fetchall()
+        db_name = resolve_db_name(db_name)
 
-            if not rows:
-                conn.close()
-                return "📭 Nenhum resultado encontrado."
+        # Consulta única somente leitura (inclui WITH ... SELECT): caminho de leitura
+        # com guarda de custo, paginação e formato compacto, em conexão somente leitura
+        with read_connection(db_name) as conn:
+            if len(statements) == 1 and params in (None, "") and is_read_only(conn, statements[0]):
+                statement = statements[0]
+                streaming = wants_streaming(limit, cursor, output_format)
+                plan = assess_query(conn, statement, paginated=streaming)
+                started = time.perf_counter()
+                with query_guard.budget(conn):
+                    if streaming:
+                        result = render_page(statement, conn, limit, offset, cursor, keyset_column,
+                                             output_format, max_bytes)
+                        workload_log.record(db_name, conn, statement, (time.perf_counter() - started) * 1000)
+                        return result
 
-            columns = [desc[0] for desc in cursor.description]
-            data = [dict(zip(columns, r)) for r in rows]
-            pretty = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+                    db_cursor = conn.cursor()
+                    with tracer.span("sql.execute"):
+                        db_cursor.execute(plan.sql)
+                    result = format_query_result(db_cursor, output_format, max_bytes)
+                workload_log.record(db_name, conn, statement, (time.perf_counter() - started) * 1000)
+                if plan.note and not result.startswith("📭"):
+                    result += f"\n\n{plan.note}"
+                return result
 
-            conn.close()
-            return f"📊 Resultado da consulta:\n\n{pretty}"
+        # Demais casos: instrução a instrução, em uma transação explícita, na vez do
+        # chamador na fila de escrita do banco. Escritas também respeitam o orçamento
+        # e o cancelamento (rollback ao interromper)
+        with write_connection(db_name) as conn:
+            try:
+                with tracer.span("sql.execute", write=True), query_guard.budget(conn):
+                    script = statement_engine.run(conn, statements, params, output_format, max_bytes)
+            except StatementError as e:
+                if not e.rolled_back:
+                    _after_write(db_name, schema_changed=True)
+                return format_statement_error(e)
+            except QueryInterrupted:
+                # A transação foi desfeita, mas instruções fora dela podem ter sido gravadas
+                _after_write(db_name, schema_changed=True)
+                raise
 
-        # Para outras instruções (INSERT, UPDATE, DELETE, CREATE, etc.)
-        try:
-            cursor.executescript(sql)
-            conn.commit()
-        except sqlite3.Error as e:
-            conn.rollback()
-            conn.close()
-            return f"⚠️ Erro ao executar SQL: {e}"
+            if script.changed_data or script.changed_schema:
+                _after_write(db_name, schema_changed=script.changed_schema)
 
-        affected = cursor.rowcount
-        conn.close()
+            # Consultas e DML do script entram no workload; DDL/PRAGMA não
+            for statement_result in script.statements:
+                if statement_result.kind in ("rows", "write"):
+                    workload_log.record(db_name, conn, statement_result.sql, statement_result.elapsed_ms,
+                                        rows=statement_result.rowcount or 0)
 
-        return f"✅ Instrução executada com sucesso no banco '{db_name}'. Linhas afetadas: {affected if affected >= 0 else 'N/A'}"
+        return format_script_result(db_name, script)
 
+    except PageTokenError as e:
+        return f"⚠️ Cursor inválido: {e}"
+    except QueryGuardError as e:
+        return str(e)
+    except json.JSONDecodeError as e:
+        return f"⚠️ O parâmetro 'params' não é JSON válido: {e}"
+    except ValueError as e:
+        return f"⚠️ Parâmetros inválidos: {e}"
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
     except Exception as e:
         return f"⚠️ Erro inesperado: {e}"
+
+
+def _after_write(db_name: Any, schema_changed: bool) -> None:
+    # A instrução pode ter alterado o esquema (CREATE/ALTER/DROP)
+    if schema_changed:
+        schema_cache.invalidate(db_name)
+    result_cache.notify_write(db_name)
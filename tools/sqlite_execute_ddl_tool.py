@@ -3,6 +3,18 @@ import sqlite3
 import re
 from typing import Optional
 from crewai.tools import tool
+from runtime.tracing import traced_tool
+from tools.sqlite_connection_pool import write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
+from tools.sqlite_statement_engine import (
+    StatementError,
+    format_script_result,
+    format_statement_error,
+    split_statements,
+    statement_engine,
+)
 
 _ALLOWED_DDL_PREFIXES = (
     "create",
@@ -18,12 +30,13 @@ _ALLOWED_DDL_PREFIXES = (
 _PROHIBITED_KEYWORDS = ("drop", "delete", "truncate", "replace into")
 
 @tool("SQLite Execute DDL")
-def execute_sqlite_ddl(db_name: str, ddl_sql: str, force: Optional[bool] = False) -> str:
+@traced_tool("SQLite Execute DDL")
+def execute_sqlite_ddl(db_name: Optional[str] = None, ddl_sql: str = "", force: Optional[bool] = False) -> str:
     """
     Executa instruções DDL em um banco SQLite.
 
     Args:
-        db_name (str): nome do arquivo do banco (ex: 'devcrew.db')
+        db_name (str, optional): nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
         ddl_sql (str): script DDL a ser executado (pode conter múltiplas instruções; ex: 'CREATE TABLE ...;')
         force (bool, optional): se True permite palavras proibidas (DROP/DELETE/TRUNCATE) — usar com cautela.
 
@@ -35,9 +48,17 @@ def execute_sqlite_ddl(db_name: str, ddl_sql: str, force: Optional[bool] = False
       serão rejeitadas e a execução será abortada.
     - Se realmente desejar executar uma instrução destrutiva, passe force=True explicitamente.
     """
+    return apply_ddl_script(db_name, ddl_sql, force)
+
+
+def apply_ddl_script(db_name: Optional[str], ddl_sql: str, force: Optional[bool] = False) -> str:
+    """
+    Caminho de execução da tool 'SQLite Execute DDL', reutilizável por outras tools que
+    geram DDL (ex.: índices de busca textual): validação, transação única, atualização
+    do cache de esquema e invalidação do cache de resultados.
+    """
     try:
-        if not db_name.endswith(".db"):
-            db_name = f"{db_name}.db"
+        db_name = resolve_db_name(db_name)
 
         if not ddl_sql or not isinstance(ddl_sql, str):
             return "⚠️ O parâmetro 'ddl_sql' está vazio ou inválido."
@@ -62,23 +83,25 @@ def execute_sqlite_ddl(db_name: str, ddl_sql: str, force: Optional[bool] = False
                         "Use force=True apenas se tiver certeza do que está fazendo."
                     )
 
-        # Executa o script com executescript (permite múltiplas instruções)
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        try:
-            cursor.executescript(ddl_sql)
-            conn.commit()
-        except sqlite3.OperationalError as oe:
-            conn.rollback()
-            conn.close()
-            return f"⚠️ Erro operacional ao executar DDL: {oe}"
-        except sqlite3.DatabaseError as de:
-            conn.rollback()
-            conn.close()
-            return f"⚠️ Erro de banco ao executar DDL: {de}"
+        statements = split_statements(ddl_sql)
+        if not statements:
+            return "⚠️ O parâmetro 'ddl_sql' está vazio ou inválido."
+
+        # Executa o script instrução a instrução em uma única transação (tudo ou nada)
+        with write_connection(db_name) as conn:
+            try:
+                script = statement_engine.run(conn, statements)
+            except StatementError as se:
+                if not se.rolled_back:
+                    schema_cache.refresh(conn, db_name)
+                    result_cache.notify_write(db_name)
+                return format_statement_error(se)
+            schema_cache.refresh(conn, db_name)
+            result_cache.notify_write(db_name)
 
-        conn.close()
-        return f"✅ DDL executado com sucesso no banco '{db_name}'."
+        return format_script_result(
+            db_name, script, title=f"✅ DDL executado com sucesso no banco '{db_name}' ({len(statements)} instrução(ões))."
+        )
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
     except Exception as e:
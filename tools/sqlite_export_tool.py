@@ -0,0 +1,303 @@
+# tools/sqlite_export_tool.py
+import base64
+import csv
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from crewai.tools import tool
+from runtime.tracing import annotate, traced_tool, tracer
+from tools.sqlite_connection_pool import read_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_query_guard import QueryGuardError, query_guard
+from tools.sqlite_schema_cache import schema_cache
+from tools.sqlite_statement_engine import is_read_only, split_statements
+
+# Diretório padrão dos arquivos exportados
+EXPORT_DIR = os.getenv("DEVCREW_EXPORT_DIR", "exports")
+# Linhas lidas (fetchmany) e gravadas por lote
+EXPORT_BATCH_SIZE = int(os.getenv("DEVCREW_EXPORT_BATCH_SIZE", "5000"))
+# Tempo máximo (s) de uma exportação; exportações são longas por natureza
+EXPORT_TIMEOUT = float(os.getenv("DEVCREW_EXPORT_TIMEOUT", "600"))
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+# csv/ndjson: 'gzip'; parquet: codecs do próprio formato (por coluna, dentro do arquivo)
+TEXT_COMPRESSIONS = ("gzip",)
+PARQUET_COMPRESSIONS = ("snappy", "gzip", "zstd", "brotli", "lz4")
+_EXTENSIONS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+
+
+class ExportError(Exception):
+    """Exportação recusada; str(e) é a mensagem devolvida pela tool."""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _text_value(value: Any) -> Any:
+    # Texto não tem representação para BLOB: exporta em base64
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _iter_batches(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[List[Sequence[Any]]]:
+    """Lê o resultado em lotes de tamanho fixo (o cursor do SQLite avança sob demanda)."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+def _default_path(db_name: str, table_name: Optional[str], fmt: str, compression: Optional[str]) -> str:
+    base = re.sub(r"[^\w.-]+", "_", table_name or "query")
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = _EXTENSIONS[fmt] + (".gz" if compression in TEXT_COMPRESSIONS and fmt != "parquet" else "")
+    return os.path.join(EXPORT_DIR, f"{os.path.splitext(os.path.basename(db_name))[0]}_{base}_{stamp}{suffix}")
+
+
+def _resolve_output_path(output_path: str) -> str:
+    """
+    Caminho relativo a EXPORT_DIR: a tool é exposta ao LLM e não pode gravar fora do
+    diretório de exportação (código-fonte, bancos, arquivos de configuração).
+    """
+    export_dir = os.path.realpath(EXPORT_DIR)
+    relative = os.path.normpath(output_path.strip())
+    if os.path.isabs(output_path.strip()) or relative == ".." or relative.startswith(".." + os.sep):
+        raise ExportError(f"🚫 'output_path' deve ser um caminho relativo dentro de '{EXPORT_DIR}/' (sem '..').")
+    # Aceita 'exports/arquivo.csv' além de 'arquivo.csv'
+    prefix = os.path.normpath(EXPORT_DIR) + os.sep
+    if relative.startswith(prefix):
+        relative = relative[len(prefix):]
+    path = os.path.realpath(os.path.join(export_dir, relative))
+    if not path.startswith(export_dir + os.sep):
+        raise ExportError(f"🚫 'output_path' deve ser um caminho relativo dentro de '{EXPORT_DIR}/' (sem '..').")
+    return path
+
+
+def _write_text(path: str, fmt: str, columns: List[str], batches: Iterator[List[Sequence[Any]]],
+                compression: Optional[str]) -> int:
+    opener: Callable[..., Any] = gzip.open if compression == "gzip" else open
+    rows = 0
+    with opener(path, "wt", encoding="utf-8", newline="") as fh:
+        if fmt == "csv":
+            writer = csv.writer(fh)
+            writer.writerow(columns)
+            for batch in batches:
+                writer.writerows([_text_value(v) for v in row] for row in batch)
+                rows += len(batch)
+        else:
+            for batch in batches:
+                fh.write("".join(
+                    json.dumps({c: _text_value(v) for c, v in zip(columns, row)}, ensure_ascii=False, default=str)
+                    + "\n"
+                    for row in batch
+                ))
+                rows += len(batch)
+    return rows
+
+
+def _declared_arrow_type(pa: Any, declared: str) -> Any:
+    """Tipo Arrow pela afinidade do tipo declarado da coluna (regras do SQLite); None se indefinido."""
+    declared = (declared or "").upper()
+    if not declared:
+        return None
+    if "INT" in declared:
+        return pa.int64()
+    if any(k in declared for k in ("CHAR", "CLOB", "TEXT")):
+        return pa.string()
+    if "BLOB" in declared:
+        return pa.binary()
+    if any(k in declared for k in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return None
+
+
+def _parquet_schema(pa: Any, columns: List[str], batch: List[Sequence[Any]], declared: Dict[str, str]) -> Any:
+    """
+    Esquema fixo do arquivo: tipo declarado da coluna quando conhecido; senão o tipo
+    inferido do primeiro lote (coluna só com NULL → texto). Inteiros ficam int64: só
+    viram double quando o próprio lote mistura inteiros e reais.
+    """
+    fields = []
+    for i, column in enumerate(columns):
+        arrow_type = _declared_arrow_type(pa, declared.get(column, ""))
+        if arrow_type is None:
+            try:
+                inferred = pa.array([row[i] for row in batch]).type if batch else pa.null()
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                inferred = pa.string()  # tipos mistos já no primeiro lote
+            arrow_type = pa.string() if pa.types.is_null(inferred) else inferred
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def _parquet_column(pa: Any, values: List[Any], arrow_field: Any) -> Any:
+    if pa.types.is_integer(arrow_field.type):
+        # Real com valor inteiro (ex.: 2.0) cabe na coluna int64; frações não
+        values = [int(v) if isinstance(v, float) and v.is_integer() else v for v in values]
+    try:
+        return pa.array(values, type=arrow_field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Coluna texto com valores de outros tipos (tipagem flexível do SQLite): converte para texto
+        if pa.types.is_string(arrow_field.type):
+            return pa.array([None if v is None else str(_text_value(v)) for v in values], type=pa.string())
+        raise ExportError(
+            f"⚠️ A coluna '{arrow_field.name}' mistura valores incompatíveis com o tipo {arrow_field.type} "
+            "no Parquet. Use file_format='csv' ou 'ndjson', ou converta a coluna com CAST na consulta."
+        )
+
+
+def _write_parquet(path: str, columns: List[str], batches: Iterator[List[Sequence[Any]]],
+                   compression: Optional[str], declared: Optional[Dict[str, str]] = None) -> int:
+    # Dependência opcional: só é importada quando o formato Parquet é pedido
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for batch in batches:
+            if schema is None:
+                schema = _parquet_schema(pa, columns, batch, declared or {})
+                writer = pq.ParquetWriter(path, schema, compression=compression or "snappy")
+            arrays = [_parquet_column(pa, [row[i] for row in batch], schema.field(i)) for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(batch)
+        if writer is None:
+            # Resultado vazio: arquivo válido apenas com o esquema
+            schema = _parquet_schema(pa, columns, [], declared or {})
+            writer = pq.ParquetWriter(path, schema, compression=compression or "snappy")
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size} B"
+
+
+@tool("SQLite Export Query")
+@traced_tool("SQLite Export Query")
+def export_query_to_file(
+    db_name: Optional[str] = None,
+    sql: Optional[str] = None,
+    table_name: Optional[str] = None,
+    file_format: str = "csv",
+    output_path: Optional[str] = None,
+    compression: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    overwrite: Optional[bool] = False,
+) -> str:
+    """
+    Exporta o resultado de uma consulta (ou uma tabela inteira) para um arquivo, em lotes,
+    sem passar as linhas pelo chat. Use esta tool para pedidos como "exporte a tabela users".
+
+    Args:
+        db_name (str, optional): Nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
+        sql (str, optional): Consulta de leitura (SELECT/WITH) cujo resultado será exportado.
+        table_name (str, optional): Alternativa a 'sql': exporta todas as linhas da tabela.
+        file_format (str): 'csv' (padrão), 'ndjson' (um objeto JSON por linha) ou 'parquet'
+            (requer o pacote opcional 'pyarrow').
+        output_path (str, optional): Caminho do arquivo, relativo ao diretório 'exports/'
+            (DEVCREW_EXPORT_DIR). Padrão: nome gerado a partir do banco, da tabela e da hora.
+        compression (str, optional): 'gzip' para csv/ndjson; 'snappy', 'gzip', 'zstd',
+            'brotli' ou 'lz4' para parquet.
+        batch_size (int): linhas lidas e gravadas por lote.
+        overwrite (bool, optional): substitui o arquivo de destino se ele já existir.
+
+    Returns:
+        str: Caminho do arquivo, número de linhas, tamanho em bytes e tempo gasto.
+    """
+    try:
+        fmt = (file_format or "csv").strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            return f"⚠️ Formato inválido: '{file_format}'. Use: {', '.join(EXPORT_FORMATS)}."
+        compression = (compression or "").strip().lower() or None
+        allowed = PARQUET_COMPRESSIONS if fmt == "parquet" else TEXT_COMPRESSIONS
+        if compression and compression not in allowed:
+            return f"⚠️ Compressão '{compression}' não suportada para {fmt}. Use: {', '.join(allowed)}."
+
+        if table_name and table_name.strip():
+            table_name = table_name.strip()
+            sql = f"SELECT * FROM {_quote(table_name)};"
+        if not sql or not sql.strip():
+            return "⚠️ Informe 'sql' (consulta de leitura) ou 'table_name'."
+        statements = split_statements(sql)
+        if len(statements) != 1:
+            return "⚠️ Exporte uma única consulta por vez."
+        statement = statements[0]
+
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return ("⚠️ Exportação Parquet requer o pacote opcional 'pyarrow' (pip install pyarrow). "
+                        "Use file_format='csv' ou 'ndjson'.")
+
+        db_name = resolve_db_name(db_name)
+        path = _resolve_output_path(output_path) if output_path and output_path.strip() else \
+            _default_path(db_name, table_name, fmt, compression)
+        if os.path.exists(path) and not overwrite:
+            return f"⚠️ O arquivo '{path}' já existe. Use overwrite=True para substituí-lo ou outro 'output_path'."
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Grava em arquivo temporário e renomeia ao final: sem arquivo parcial em caso de erro
+        tmp_path = f"{path}.part"
+        batch_size = max(int(batch_size or EXPORT_BATCH_SIZE), 1)
+
+        started = time.perf_counter()
+        with read_connection(db_name) as conn:
+            if not is_read_only(conn, statement):
+                return "🚫 Somente consultas de leitura podem ser exportadas (SELECT/WITH)."
+            # Sem LIMIT automático da guarda de custo (exportar tudo é o objetivo), mas com
+            # orçamento de tempo próprio e cancelamento pela UI
+            with query_guard.budget(conn, timeout=EXPORT_TIMEOUT):
+                db_cursor = conn.cursor()
+                try:
+                    with tracer.span("sql.execute"):
+                        db_cursor.execute(statement)
+                    columns = [d[0] for d in db_cursor.description or []]
+                    # Tipos declarados da tabela exportada fixam o esquema Parquet
+                    declared = {c[1]: c[2] for c in schema_cache.table_columns(conn, db_name, table_name)} \
+                        if fmt == "parquet" and table_name else {}
+                    batches = _iter_batches(db_cursor, batch_size)
+                    with tracer.span("export.write", format=fmt, compression=compression):
+                        if fmt == "parquet":
+                            rows = _write_parquet(tmp_path, columns, batches, compression, declared)
+                        else:
+                            rows = _write_text(tmp_path, fmt, columns, batches, compression)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                finally:
+                    db_cursor.close()
+        os.replace(tmp_path, path)
+
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+        annotate(rows=rows, file_bytes=size)
+        return (
+            f"✅ Exportação concluída: {path}\n"
+            f"formato={fmt} compressão={compression or 'nenhuma'} linhas={rows} "
+            f"tamanho={_format_size(size)} ({size} bytes) tempo={elapsed:.2f}s"
+        )
+    except (ExportError, QueryGuardError) as e:
+        return str(e)
+    except OSError as e:
+        return f"⚠️ Erro ao gravar o arquivo: {e}"
+    except sqlite3.Error as e:
+        return f"⚠️ Erro SQLite: {e}"
+    except Exception as e:
+        return f"⚠️ Erro inesperado: {e}"
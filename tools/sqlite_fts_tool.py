@@ -0,0 +1,289 @@
+# tools/sqlite_fts_tool.py
+import re
+import sqlite3
+from typing import List, Optional, Tuple, Union
+from crewai.tools import tool
+from runtime.tracing import traced_tool
+from tools.sqlite_connection_pool import read_connection
+from tools.sqlite_execute_ddl_tool import apply_ddl_script
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_query_guard import QueryGuardError, query_guard
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_result_stream import PageTokenError, render_page
+from tools.sqlite_schema_cache import schema_cache
+
+# Tokenizador padrão: Unicode, sem diferenciar acentos ("joao" encontra "João")
+DEFAULT_TOKENIZE = "unicode61 remove_diacritics 2"
+DEFAULT_SEARCH_LIMIT = 10
+MATCH_MODES = ("terms", "prefix", "phrase", "raw")
+FTS_SUFFIX = "_fts"
+
+_OPTION_RE = r"{name}\s*=\s*(?:'((?:[^']|'')*)'|\"((?:[^\"]|\"\")*)\"|([\w]+))"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _parse_columns(columns: Union[str, List[str], None]) -> List[str]:
+    if columns is None:
+        return []
+    if isinstance(columns, str):
+        columns = columns.split(",")
+    return [c.strip().strip('"') for c in columns if c and c.strip()]
+
+
+def _fts_option(sql: str, name: str) -> Optional[str]:
+    match = re.search(_OPTION_RE.format(name=name), sql or "", re.IGNORECASE)
+    if not match:
+        return None
+    value = next(g for g in match.groups() if g is not None)
+    return value.replace("''", "'").replace('""', '"')
+
+
+def _rowid_column(conn: sqlite3.Connection, db_name: str, table_name: str) -> str:
+    """Coluna INTEGER PRIMARY KEY (alias do rowid) ou o próprio 'rowid'."""
+    pk = [c for c in schema_cache.table_columns(conn, db_name, table_name) if c[5]]
+    if len(pk) == 1 and str(pk[0][2]).upper() == "INTEGER":
+        return pk[0][1]
+    return "rowid"
+
+
+def find_fts_index(conn: sqlite3.Connection, table_name: str) -> Optional[Tuple[str, List[str], str]]:
+    """
+    Índice FTS5 de conteúdo externo da tabela: (nome do índice, colunas indexadas,
+    coluna de rowid da tabela). Também reconhece índices criados fora desta tool.
+    """
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%fts5%';"
+    ).fetchall()
+    preferred = f"{table_name}{FTS_SUFFIX}".lower()
+    matches = [
+        (name, sql) for name, sql in rows
+        if (_fts_option(sql, "content") or "").lower() == table_name.lower()
+    ]
+    matches.sort(key=lambda item: item[0].lower() != preferred)
+    if not matches:
+        return None
+    name, sql = matches[0]
+    columns = [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(name)});").fetchall()]
+    return name, columns, _fts_option(sql, "content_rowid") or "rowid"
+
+
+def build_fts_ddl(table_name: str, columns: List[str], rowid_column: str,
+                  tokenize: str = DEFAULT_TOKENIZE) -> str:
+    """
+    Script que (re)cria o índice FTS5 de conteúdo externo e os triggers que o mantêm
+    sincronizado com a tabela, e popula o índice com as linhas existentes.
+    """
+    index = f"{table_name}{FTS_SUFFIX}"
+    q_index, q_table, key = _quote(index), _quote(table_name), _quote(rowid_column)
+    cols = ", ".join(_quote(c) for c in columns)
+    new_values = ", ".join(f"new.{_quote(c)}" for c in columns)
+    old_values = ", ".join(f"old.{_quote(c)}" for c in columns)
+    delete_old = (f"INSERT INTO {q_index}({q_index}, rowid, {cols}) "
+                  f"VALUES ('delete', old.{key}, {old_values});")
+    insert_new = f"INSERT INTO {q_index}(rowid, {cols}) VALUES (new.{key}, {new_values});"
+    return "\n".join([
+        f"DROP TRIGGER IF EXISTS {_quote(index + '_ai')};",
+        f"DROP TRIGGER IF EXISTS {_quote(index + '_ad')};",
+        f"DROP TRIGGER IF EXISTS {_quote(index + '_au')};",
+        f"DROP TABLE IF EXISTS {q_index};",
+        f"CREATE VIRTUAL TABLE {q_index} USING fts5({cols}, content={_literal(table_name)}, "
+        f"content_rowid={_literal(rowid_column)}, tokenize={_literal(tokenize)});",
+        f"CREATE TRIGGER {_quote(index + '_ai')} AFTER INSERT ON {q_table} BEGIN {insert_new} END;",
+        f"CREATE TRIGGER {_quote(index + '_ad')} AFTER DELETE ON {q_table} BEGIN {delete_old} END;",
+        f"CREATE TRIGGER {_quote(index + '_au')} AFTER UPDATE OF {cols} ON {q_table} "
+        f"BEGIN {delete_old} {insert_new} END;",
+        # Indexa as linhas já existentes lendo a tabela de conteúdo
+        f"INSERT INTO {q_index}({q_index}) VALUES ('rebuild');",
+    ])
+
+
+def build_match_query(text: str, mode: str = "terms", columns: Optional[List[str]] = None) -> str:
+    """
+    Converte o texto do usuário em uma expressão MATCH do FTS5.
+
+    - terms: todas as palavras, em qualquer ordem (cada uma entre aspas, sem sintaxe especial);
+    - prefix: idem, casando prefixos ("prog" encontra "programador");
+    - phrase: o texto exato, como frase;
+    - raw: sintaxe FTS5 completa (AND/OR/NOT, NEAR, col:termo...).
+    """
+    if mode == "raw":
+        expression = text
+    elif mode == "phrase":
+        expression = '"' + text.replace('"', '""') + '"'
+    else:
+        star = "*" if mode == "prefix" else ""
+        expression = " ".join('"' + t.replace('"', '""') + '"' + star for t in text.split())
+    if columns:
+        expression = "{" + " ".join(_quote(c) for c in columns) + "}: (" + expression + ")"
+    return expression
+
+
+@tool("SQLite Create Full-Text Index")
+@traced_tool("SQLite Create Full-Text Index")
+def create_fulltext_index(
+    db_name: Optional[str] = None,
+    table_name: str = "",
+    columns: Union[str, List[str], None] = None,
+    tokenize: str = DEFAULT_TOKENIZE,
+) -> str:
+    """
+    Cria (ou recria) um índice de busca textual FTS5 sobre colunas de texto de uma tabela.
+
+    O índice é de conteúdo externo (não duplica o texto) e fica sincronizado com a
+    tabela por triggers de INSERT/UPDATE/DELETE, instalados pelo mesmo caminho da
+    tool 'SQLite Execute DDL' (transação única). Depois use 'SQLite Full-Text Search'
+    em vez de LIKE '%termo%', que sempre varre a tabela inteira.
+
+    Args:
+        db_name (str, optional): Nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
+        table_name (str): Tabela a indexar.
+        columns (list | str): Colunas de texto indexadas (lista ou 'bio, titulo').
+        tokenize (str, optional): Tokenizador FTS5 (padrão: unicode61 sem acentos).
+
+    Returns:
+        str: Confirmação com o nome do índice e as linhas indexadas, ou o erro.
+    """
+    try:
+        table_name = (table_name or "").strip()
+        wanted = _parse_columns(columns)
+        if not table_name or not wanted:
+            return "⚠️ Informe 'table_name' e ao menos uma coluna em 'columns'."
+
+        db_name = resolve_db_name(db_name)
+        with read_connection(db_name) as conn:
+            if not schema_cache.table_exists(conn, db_name, table_name):
+                return f"⚠️ A tabela '{table_name}' não existe no banco '{db_name}'."
+            (table_sql,) = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE;", (table_name,)
+            ).fetchone()
+            if re.search(r"\bwithout\s+rowid\b", table_sql or "", re.IGNORECASE):
+                return "🚫 Tabelas WITHOUT ROWID não suportam índices FTS5 de conteúdo externo."
+            existing = {c[1].lower(): c[1] for c in schema_cache.table_columns(conn, db_name, table_name)}
+            missing = [c for c in wanted if c.lower() not in existing]
+            if missing:
+                return f"⚠️ Colunas inexistentes em '{table_name}': {', '.join(missing)}."
+            indexed = [existing[c.lower()] for c in wanted]
+            rowid_column = _rowid_column(conn, db_name, table_name)
+
+        # DDL gerado aqui (DROP/DELETE dos triggers são esperados): força a execução
+        result = apply_ddl_script(db_name, build_fts_ddl(table_name, indexed, rowid_column, tokenize), force=True)
+        if not result.startswith("✅"):
+            return result
+
+        index = f"{table_name}{FTS_SUFFIX}"
+        with read_connection(db_name) as conn:
+            (rows,) = conn.execute(f"SELECT COUNT(*) FROM {_quote(index)};").fetchone()
+        return (
+            f"✅ Índice de busca textual '{index}' criado em '{table_name}' ({', '.join(indexed)}) "
+            f"no banco '{db_name}': {rows} linha(s) indexada(s); triggers mantêm o índice atualizado.\n"
+            f"Use a tool 'SQLite Full-Text Search' com table_name='{table_name}'."
+        )
+    except sqlite3.Error as e:
+        return f"⚠️ Erro SQLite: {e}"
+    except Exception as e:
+        return f"⚠️ Erro inesperado: {e}"
+
+
+@tool("SQLite Full-Text Search")
+@traced_tool("SQLite Full-Text Search")
+def search_fulltext(
+    db_name: Optional[str] = None,
+    table_name: str = "",
+    query: str = "",
+    match_mode: str = "terms",
+    search_columns: Union[str, List[str], None] = None,
+    return_columns: Union[str, List[str], None] = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    cursor: Optional[str] = None,
+    snippet_tokens: int = 12,
+    max_bytes: Optional[int] = None,
+) -> str:
+    """
+    Busca textual ranqueada (BM25) em uma tabela com índice FTS5, com trechos destacados.
+
+    Requer um índice criado com 'SQLite Create Full-Text Index'. Cada resultado traz as
+    colunas da tabela, 'score' (menor = mais relevante) e 'snippet' com os termos
+    encontrados entre [colchetes].
+
+    Args:
+        db_name (str, optional): Nome do arquivo do banco. Se omitido, usa o banco ativo da sessão.
+        table_name (str): Tabela indexada.
+        query (str): Texto procurado.
+        match_mode (str): 'terms' (padrão; todas as palavras), 'prefix' (prefixos das
+            palavras), 'phrase' (frase exata) ou 'raw' (sintaxe FTS5: OR, NOT, NEAR...).
+        search_columns (list | str, optional): Restringe a busca a estas colunas indexadas.
+        return_columns (list | str, optional): Colunas da tabela no resultado
+            (padrão: todas as colunas não indexadas, mais o trecho destacado).
+        limit (int): Resultados por página.
+        cursor (str, optional): Token de continuação retornado pela página anterior.
+        snippet_tokens (int): Tamanho do trecho destacado, em palavras.
+        max_bytes (int, optional): Orçamento de bytes da saída.
+
+    Returns:
+        str: Página de resultados (do mais ao menos relevante) ou mensagem de erro.
+    """
+    try:
+        table_name = (table_name or "").strip()
+        if not table_name or not query or not query.strip():
+            return "⚠️ Informe 'table_name' e o texto da busca em 'query'."
+        match_mode = (match_mode or "terms").strip().lower()
+        if match_mode not in MATCH_MODES:
+            return f"⚠️ match_mode inválido: '{match_mode}'. Use: {', '.join(MATCH_MODES)}."
+
+        db_name = resolve_db_name(db_name)
+        with read_connection(db_name) as conn:
+            found = find_fts_index(conn, table_name)
+            if found is None:
+                return (f"⚠️ A tabela '{table_name}' não tem índice de busca textual. "
+                        "Crie um com a tool 'SQLite Create Full-Text Index'.")
+            index, indexed, rowid_column = found
+            lowered = {c.lower(): c for c in indexed}
+            restrict = _parse_columns(search_columns)
+            if any(c.lower() not in lowered for c in restrict):
+                return f"⚠️ 'search_columns' deve conter apenas colunas indexadas: {', '.join(indexed)}."
+            table_cols = [c[1] for c in schema_cache.table_columns(conn, db_name, table_name)]
+            selected = _parse_columns(return_columns) or [c for c in table_cols if c.lower() not in lowered]
+            unknown = [c for c in selected if c.lower() not in {t.lower() for t in table_cols}]
+            if unknown:
+                return f"⚠️ Colunas inexistentes em '{table_name}': {', '.join(unknown)}."
+
+            expression = build_match_query(query.strip(), match_mode, [lowered[c.lower()] for c in restrict])
+            tokens = min(max(int(snippet_tokens or 12), 1), 64)
+            projection = ", ".join([f"t.{_quote(c)}" for c in selected] + [
+                f"snippet({_quote(index)}, -1, '[', ']', '…', {tokens}) AS snippet",
+                f"round({_quote(index)}.rank, 4) AS score",
+            ])
+            # A expressão vai como literal: o token de página identifica a busca pelo SQL
+            sql = (
+                f"SELECT {projection} FROM {_quote(index)} "
+                f"JOIN {_quote(table_name)} AS t ON t.{_quote(rowid_column)} = {_quote(index)}.rowid "
+                f"WHERE {_quote(index)} MATCH {_literal(expression)} ORDER BY {_quote(index)}.rank"
+            )
+
+            def run() -> str:
+                with query_guard.budget(conn):
+                    return render_page(sql, conn, limit or DEFAULT_SEARCH_LIMIT, 0, cursor, None,
+                                       "compact", max_bytes)
+
+            # Buscas repetidas sobre o mesmo estado do banco saem do cache de resultados
+            return result_cache.get_or_compute(db_name, ("fts", sql, limit, cursor, max_bytes), run)
+
+    except PageTokenError as e:
+        return f"⚠️ Cursor inválido: {e}"
+    except QueryGuardError as e:
+        return str(e)
+    except sqlite3.OperationalError as e:
+        if any(k in str(e).lower() for k in ("fts5", "syntax", "unterminated")):
+            return f"⚠️ Expressão de busca inválida para o FTS5: {e}. Tente match_mode='terms'."
+        return f"⚠️ Erro SQLite: {e}"
+    except sqlite3.Error as e:
+        return f"⚠️ Erro SQLite: {e}"
+    except Exception as e:
+        return f"⚠️ Erro inesperado: {e}"
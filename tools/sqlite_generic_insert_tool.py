@@ -1,29 +1,262 @@
+import csv
+import os
 import sqlite3
 import json
-from typing import Any, Dict, Iterable, List, Tuple, Union
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from crewai.tools import tool
+from runtime.tracing import traced_tool
+from tools.sqlite_connection_pool import write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
+
+JsonLike = Union[Dict[str, Any], List[Dict[str, Any]], str]
+
+# Tamanho padrão de cada lote (um commit por lote no modo bulk)
+DEFAULT_CHUNK_SIZE = 1000
+# Quantidade máxima de linhas rejeitadas / lotes detalhados no relatório
+_REPORT_MAX_ITEMS = 20
+_BULK_FILE_EXTENSIONS = (".csv", ".ndjson", ".jsonl", ".json")
+# Diretório de onde os arquivos de carga podem ser lidos (caminhos relativos a ele)
+IMPORT_DIR = os.getenv("DEVCREW_IMPORT_DIR", "imports")
+
+
+class ImportSourceError(Exception):
+    """Arquivo de carga recusado; str(e) é a mensagem devolvida pela tool."""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _resolve_import_path(source: str) -> str:
+    """
+    Caminho relativo a IMPORT_DIR: 'record' vem do LLM e não pode apontar para arquivos
+    fora do diretório de importação (código-fonte, bancos, arquivos de configuração).
+    """
+    import_dir = os.path.realpath(IMPORT_DIR)
+    relative = os.path.normpath(source)
+    if os.path.isabs(source) or relative == ".." or relative.startswith(".." + os.sep):
+        raise ImportSourceError(f"🚫 O arquivo de carga deve ser um caminho relativo dentro de '{IMPORT_DIR}/' (sem '..').")
+    # Aceita 'imports/arquivo.csv' além de 'arquivo.csv'
+    prefix = os.path.normpath(IMPORT_DIR) + os.sep
+    if relative.startswith(prefix):
+        relative = relative[len(prefix):]
+    path = os.path.realpath(os.path.join(import_dir, relative))
+    if not path.startswith(import_dir + os.sep):
+        raise ImportSourceError(f"🚫 O arquivo de carga deve ser um caminho relativo dentro de '{IMPORT_DIR}/' (sem '..').")
+    return path
+
+
+def _iter_file_records(path: str) -> Iterator[Any]:
+    """Lê registros de um arquivo CSV, NDJSON/JSONL ou JSON (array) sem carregar tudo em memória."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if ext == ".csv":
+            for row in csv.DictReader(fh):
+                # Campos vazios do CSV viram NULL para o banco aplicar defaults/afinidade
+                yield {k: (v if v != "" else None) for k, v in row.items()}
+        elif ext in (".ndjson", ".jsonl"):
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield ValueError(f"JSON inválido: {e}")
+        else:
+            data = json.load(fh)
+            yield from (data if isinstance(data, list) else [data])
+
+
+def _batch_source(record: Any) -> Optional[Iterable[Any]]:
+    """
+    Identifica se 'record' representa um lote (lista, array JSON ou caminho de arquivo).
+    Retorna um iterável de registros ou None quando for um registro único.
+    """
+    if isinstance(record, list):
+        return record
+    if isinstance(record, str):
+        text = record.strip()
+        if text.startswith("["):
+            data = json.loads(text)
+            return data if isinstance(data, list) else None
+        if text.lower().endswith(_BULK_FILE_EXTENSIONS) and not text.startswith("{"):
+            path = _resolve_import_path(text)
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"arquivo de carga '{text}' não encontrado em '{IMPORT_DIR}/'")
+            return _iter_file_records(path)
+    return None
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk: List[Tuple[int, Any]] = []
+    for item in enumerate(items, 1):
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _bulk_insert(db_name: str, table_name: str, records: Iterable[Any], chunk_size: int) -> str:
+    """
+    Insere um lote de registros com executemany, um commit por lote.
+
+    - A estrutura da tabela é lida uma única vez.
+    - Cada assinatura de colunas é validada uma única vez e os registros são agrupados por ela.
+    - Se um executemany falhar, o grupo é refeito linha a linha para apontar as linhas rejeitadas.
+    """
+    chunk_size = max(int(chunk_size or DEFAULT_CHUNK_SIZE), 1)
+
+    with write_connection(db_name) as conn:
+        cursor = conn.cursor()
+
+        if not schema_cache.table_exists(conn, db_name, table_name):
+            return f"⚠️ A tabela '{table_name}' não existe no banco '{db_name}'."
+
+        column_names: List[str] = schema_cache.column_names(conn, db_name, table_name)
+        allowed_cols = set(column_names)
+
+        # assinatura (colunas ordenadas) -> (colunas de inserção, motivo de rejeição)
+        signatures: Dict[frozenset, Tuple[Tuple[str, ...], Optional[str]]] = {}
+        rejected: List[Tuple[int, str]] = []
+        chunk_reports: List[Tuple[int, int, float]] = []
+        total_inserted = 0
+        total_started = time.perf_counter()
+
+        for chunk_no, chunk in enumerate(_chunked(records, chunk_size), 1):
+            groups: Dict[Tuple[str, ...], List[Tuple[int, tuple]]] = {}
+            for idx, rec in chunk:
+                if isinstance(rec, Exception):
+                    rejected.append((idx, str(rec)))
+                    continue
+                if not isinstance(rec, dict) or not rec:
+                    rejected.append((idx, "registro vazio ou não é um objeto JSON"))
+                    continue
+
+                key = frozenset(rec.keys())
+                if key not in signatures:
+                    invalid = key - allowed_cols
+                    if invalid:
+                        signatures[key] = ((), f"colunas inexistentes {sorted(invalid)}")
+                    else:
+                        signatures[key] = (tuple(c for c in column_names if c in key), None)
+                insert_cols, reason = signatures[key]
+                if reason:
+                    rejected.append((idx, reason))
+                    continue
+                groups.setdefault(insert_cols, []).append((idx, tuple(rec[c] for c in insert_cols)))
+
+            started = time.perf_counter()
+            inserted = 0
+            cursor.execute("BEGIN;")
+            try:
+                for insert_cols, rows in groups.items():
+                    cols_sql = ", ".join([f'"{c}"' for c in insert_cols])
+                    placeholders = ", ".join(["?"] * len(insert_cols))
+                    insert_sql = f"INSERT INTO {_quote(table_name)} ({cols_sql}) VALUES ({placeholders});"
+
+                    cursor.execute("SAVEPOINT bulk_group;")
+                    try:
+                        cursor.executemany(insert_sql, [values for _, values in rows])
+                        cursor.execute("RELEASE bulk_group;")
+                        inserted += len(rows)
+                        continue
+                    except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError):
+                        cursor.execute("ROLLBACK TO bulk_group;")
+                        cursor.execute("RELEASE bulk_group;")
+
+                    # Refaz o grupo linha a linha para identificar quais registros falham
+                    for idx, values in rows:
+                        try:
+                            cursor.execute(insert_sql, values)
+                            inserted += 1
+                        except sqlite3.IntegrityError as ie:
+                            rejected.append((idx, f"violação de integridade: {ie}"))
+                        except (sqlite3.InterfaceError, sqlite3.ProgrammingError) as pe:
+                            rejected.append((idx, f"valor não suportado: {pe}"))
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            finally:
+                result_cache.notify_write(db_name)
+
+            total_inserted += inserted
+            chunk_reports.append((chunk_no, inserted, time.perf_counter() - started))
+
+    elapsed = time.perf_counter() - total_started
+    rate = total_inserted / elapsed if elapsed > 0 else 0.0
+    lines = [
+        f"✅ Inserção em lote na tabela '{table_name}' ({db_name}): {total_inserted} inseridas, "
+        f"{len(rejected)} rejeitadas em {len(chunk_reports)} lotes ({elapsed:.3f}s, {rate:.0f} linhas/s)."
+    ]
+
+    if chunk_reports:
+        lines.append("Lotes:")
+        for chunk_no, inserted, secs in chunk_reports[:_REPORT_MAX_ITEMS]:
+            chunk_rate = inserted / secs if secs > 0 else 0.0
+            lines.append(f"  • lote {chunk_no}: {inserted} linhas em {secs:.3f}s ({chunk_rate:.0f} linhas/s)")
+        if len(chunk_reports) > _REPORT_MAX_ITEMS:
+            lines.append(f"  • ... e mais {len(chunk_reports) - _REPORT_MAX_ITEMS} lotes")
+
+    if rejected:
+        rejected.sort()
+        lines.append("Rejeitadas (registro nº: motivo):")
+        for idx, reason in rejected[:_REPORT_MAX_ITEMS]:
+            lines.append(f"  • #{idx}: {reason}")
+        if len(rejected) > _REPORT_MAX_ITEMS:
+            lines.append(f"  • ... e mais {len(rejected) - _REPORT_MAX_ITEMS} registros rejeitados")
+
+    return "\n".join(lines)
 
-JsonLike = Union[Dict[str, Any], str]
 
 @tool("SQLite Generic Inserter")
-def insert_into_table(db_name: str, table_name: str, record: JsonLike, return_row: bool = False) -> str:
+@traced_tool("SQLite Generic Inserter")
+def insert_into_table(
+    db_name: Optional[str] = None,
+    table_name: str = "",
+    record: JsonLike = None,
+    return_row: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> str:
     """
-    Insere um registro na tabela especificada de um banco SQLite, de forma genérica.
+    Insere um registro (ou um lote de registros) na tabela especificada de um banco SQLite, de forma genérica.
 
     Args:
-        db_name (str): nome do arquivo do banco (ex: 'devcrew.db').
+        db_name (str, optional): nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
         table_name (str): nome da tabela onde será inserido o registro.
-        record (dict | str): dicionário contendo {coluna: valor} ou JSON string.
-        return_row (bool): se True, busca e retorna a linha inserida (quando possível).
+        record (dict | list | str): dicionário contendo {coluna: valor} ou JSON string.
+            Para carga em lote: lista de dicionários, array JSON ou caminho para um
+            arquivo .ndjson/.jsonl/.csv/.json (relativo a DEVCREW_IMPORT_DIR, padrão 'imports/').
+        return_row (bool): se True, busca e retorna a linha inserida (quando possível, apenas registro único).
+        chunk_size (int): registros por lote no modo bulk (um commit por lote).
 
     Retorna:
         str: mensagem de sucesso com id inserido ou descrição do erro.
     """
     try:
         # Normalizações simples
-        if not db_name.endswith(".db"):
-            db_name = f"{db_name}.db"
-        table_name = table_name.strip()
+        db_name = resolve_db_name(db_name)
+        table_name = (table_name or "").strip()
+        if not table_name:
+            return "⚠️ Informe o nome da tabela ('table_name')."
+
+        # Modo bulk: lista de registros, array JSON ou arquivo NDJSON/CSV
+        try:
+            batch = _batch_source(record)
+        except json.JSONDecodeError:
+            return "⚠️ O parâmetro 'record' parece um array JSON, mas não é JSON válido."
+        except ImportSourceError as ie:
+            return str(ie)
+        except FileNotFoundError as fe:
+            return f"⚠️ Não foi possível ler o lote: {fe}"
+        if batch is not None:
+            return _bulk_insert(db_name, table_name, batch, chunk_size)
 
         # Parse record se veio como JSON string
         if isinstance(record, str):
@@ -39,87 +272,80 @@ def insert_into_table(db_name: str, table_name: str, record: JsonLike, return_ro
         if not record_dict:
             return "⚠️ O registro fornecido está vazio."
 
-        # Conectar ao banco
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
+        # Conectar ao banco (conexão reutilizável do pool)
+        with write_connection(db_name) as conn:
+            cursor = conn.cursor()
 
-        # Verifica se a tabela existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (table_name,))
-        if not cursor.fetchone():
-            conn.close()
-            return f"⚠️ A tabela '{table_name}' não existe no banco '{db_name}'."
+            # Verifica se a tabela existe (metadados em cache)
+            if not schema_cache.table_exists(conn, db_name, table_name):
+                return f"⚠️ A tabela '{table_name}' não existe no banco '{db_name}'."
 
-        # Obter metadados da tabela
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        cols_info: List[Tuple] = cursor.fetchall()
-        if not cols_info:
-            conn.close()
-            return f"⚠️ Não foi possível obter a estrutura da tabela '{table_name}'."
+            # Obter metadados da tabela
+            cols_info: List[Tuple] = schema_cache.table_columns(conn, db_name, table_name)
+            if not cols_info:
+                return f"⚠️ Não foi possível obter a estrutura da tabela '{table_name}'."
 
-        # cols_info: [(cid, name, type, notnull, dflt_value, pk), ...]
-        column_names: List[str] = [col[1] for col in cols_info]
+            # cols_info: [(cid, name, type, notnull, dflt_value, pk), ...]
+            column_names: List[str] = [col[1] for col in cols_info]
 
-        # Validar campos fornecidos vs colunas da tabela
-        provided_cols = set(record_dict.keys())
-        allowed_cols = set(column_names)
+            # Validar campos fornecidos vs colunas da tabela
+            provided_cols = set(record_dict.keys())
+            allowed_cols = set(column_names)
 
-        invalid_cols = provided_cols - allowed_cols
-        if invalid_cols:
-            return f"⚠️ As colunas {sorted(list(invalid_cols))} não existem na tabela '{table_name}'. Colunas válidas: {sorted(column_names)}"
+            invalid_cols = provided_cols - allowed_cols
+            if invalid_cols:
+                return f"⚠️ As colunas {sorted(list(invalid_cols))} não existem na tabela '{table_name}'. Colunas válidas: {sorted(column_names)}"
 
-        # Build insert: only provided columns (let database apply defaults for others)
-        insert_cols = [c for c in column_names if c in record_dict]
-        if not insert_cols:
-            return "⚠️ Nenhuma coluna válida fornecida para inserção."
+            # Build insert: only provided columns (let database apply defaults for others)
+            insert_cols = [c for c in column_names if c in record_dict]
+            if not insert_cols:
+                return "⚠️ Nenhuma coluna válida fornecida para inserção."
 
-        placeholders = ", ".join(["?"] * len(insert_cols))
-        cols_sql = ", ".join([f'"{c}"' for c in insert_cols])  # escape simples com aspas duplas
-        values = [record_dict[c] for c in insert_cols]
+            placeholders = ", ".join(["?"] * len(insert_cols))
+            cols_sql = ", ".join([f'"{c}"' for c in insert_cols])  # escape simples com aspas duplas
+            values = [record_dict[c] for c in insert_cols]
 
-        # Executa inserção de forma parametrizada
-        try:
-            cursor.execute(f"INSERT INTO {table_name} ({cols_sql}) VALUES ({placeholders});", tuple(values))
-            conn.commit()
-        except sqlite3.IntegrityError as ie:
-            conn.rollback()
-            conn.close()
-            return f"⚠️ Violação de integridade: {ie}"
-        except sqlite3.OperationalError as oe:
-            conn.rollback()
-            conn.close()
-            return f"⚠️ Erro operacional ao inserir: {oe}"
-
-        last_row_id = cursor.lastrowid
-
-        # Opcional: retornar a linha inserida (se solicitado)
-        if return_row:
-            # Tenta buscar por ROWID ou pela PK caso exista
-            # Se last_row_id == 0, pode não haver rowid (p.ex. tabela WITHOUT ROWID), então buscar por combinação de valores
-            fetched: List[Tuple] = []
+            # Executa inserção de forma parametrizada
             try:
-                if last_row_id and last_row_id != 0:
-                    cursor.execute(f"SELECT * FROM {table_name} WHERE rowid = ? LIMIT 1;", (last_row_id,))
-                    fetched = cursor.fetchall()
-                if not fetched:
-                    # tenta localizar pela combinação dos valores fornecidos
-                    where_clauses = " AND ".join([f'"{c}" = ?' for c in insert_cols])
-                    cursor.execute(f"SELECT * FROM {table_name} WHERE {where_clauses} LIMIT 1;", tuple(values))
-                    fetched = cursor.fetchall()
-            except Exception:
-                fetched = []
-
-            # Formata a linha
-            if fetched:
-                # pega nomes das colunas na ordem do cursor.description
-                col_names = [d[0] for d in cursor.description] if cursor.description else column_names
-                row = fetched[0]
-                row_dict = {col_names[i]: row[i] for i in range(len(row))}
-                conn.close()
-                pretty = json.dumps(row_dict, default=str, ensure_ascii=False, indent=2)
-                return f"✅ Inserido com sucesso (rowid={last_row_id}).\nLinha:\n{pretty}"
-
-        conn.close()
-        return f"✅ Inserido com sucesso (rowid={last_row_id})."
+                cursor.execute(f"INSERT INTO {_quote(table_name)} ({cols_sql}) VALUES ({placeholders});", tuple(values))
+                conn.commit()
+                result_cache.notify_write(db_name)
+            except sqlite3.IntegrityError as ie:
+                conn.rollback()
+                return f"⚠️ Violação de integridade: {ie}"
+            except sqlite3.OperationalError as oe:
+                conn.rollback()
+                return f"⚠️ Erro operacional ao inserir: {oe}"
+
+            last_row_id = cursor.lastrowid
+
+            # Opcional: retornar a linha inserida (se solicitado)
+            if return_row:
+                # Tenta buscar por ROWID ou pela PK caso exista
+                # Se last_row_id == 0, pode não haver rowid (p.ex. tabela WITHOUT ROWID), então buscar por combinação de valores
+                fetched: List[Tuple] = []
+                try:
+                    if last_row_id and last_row_id != 0:
+                        cursor.execute(f"SELECT * FROM {_quote(table_name)} WHERE rowid = ? LIMIT 1;", (last_row_id,))
+                        fetched = cursor.fetchall()
+                    if not fetched:
+                        # tenta localizar pela combinação dos valores fornecidos
+                        where_clauses = " AND ".join([f'"{c}" = ?' for c in insert_cols])
+                        cursor.execute(f"SELECT * FROM {_quote(table_name)} WHERE {where_clauses} LIMIT 1;", tuple(values))
+                        fetched = cursor.fetchall()
+                except Exception:
+                    fetched = []
+
+                # Formata a linha
+                if fetched:
+                    # pega nomes das colunas na ordem do cursor.description
+                    col_names = [d[0] for d in cursor.description] if cursor.description else column_names
+                    row = fetched[0]
+                    row_dict = {col_names[i]: row[i] for i in range(len(row))}
+                    pretty = json.dumps(row_dict, default=str, ensure_ascii=False, indent=2)
+                    return f"✅ Inserido com sucesso (rowid={last_row_id}).\nLinha:\n{pretty}"
+
+            return f"✅ Inserido com sucesso (rowid={last_row_id})."
 
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
@@ -0,0 +1,318 @@
+# tools/sqlite_index_advisor_tool.py
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from crewai.tools import tool
+from runtime.tracing import annotate, traced_tool
+from tools.sqlite_connection_pool import read_connection
+from tools.sqlite_execute_ddl_tool import apply_ddl_script
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_query_guard import estimate_rows
+from tools.sqlite_schema_cache import schema_cache
+from tools.sqlite_workload_log import WorkloadEntry, explain_plan, workload_log
+
+# Colunas extras aceitas para tornar um índice "covering" (sem voltar à tabela)
+COVERING_MAX_COLUMNS = 4
+MAX_INDEX_COLUMNS = 6
+
+_SQL_KEYWORDS = {
+    "where", "join", "inner", "left", "right", "full", "outer", "cross", "natural", "on", "using",
+    "group", "order", "limit", "having", "union", "except", "intersect", "window", "as", "set", "values",
+}
+_TABLE_REF_RE = re.compile(r"\b(?:from|join|update|into)\s+\"?(\w+)\"?(?:\s+(?:as\s+)?\"?(\w+)\"?)?")
+_COLUMN_REF = r"(?:\"?(\w+)\"?\s*\.\s*)?\"?([a-z_]\w*)\"?"
+_EQ_LEFT_RE = re.compile(_COLUMN_REF + r"\s*(?:==|=|\bis\b(?!\s+not)|\bin\b)")
+_EQ_RIGHT_RE = re.compile(r"(?<![<>!])(?:==|=)\s*" + _COLUMN_REF)
+_RANGE_LEFT_RE = re.compile(_COLUMN_REF + r"\s*(?:<=|>=|<(?!>)|>|\bbetween\b|\blike\b|\bglob\b)")
+_RANGE_RIGHT_RE = re.compile(r"(?:<=|>=|<(?!>)|(?<!<)>)\s*" + _COLUMN_REF)
+_CLAUSE_END = r"(?=\b(?:group\s+by|order\s+by|limit|having|union|except|intersect|window)\b|$)"
+_WHERE_RE = re.compile(r"\bwhere\b(.*?)" + _CLAUSE_END)
+_ON_RE = re.compile(r"\bon\b(.*?)(?=\b(?:join|inner|left|cross|natural|where|group\s+by|order\s+by|limit)\b|$)")
+_GROUP_RE = re.compile(r"\bgroup\s+by\b(.*?)(?=\b(?:having|order\s+by|limit|union|except|intersect|window)\b|$)")
+_ORDER_RE = re.compile(r"\border\s+by\b(.*?)(?=\b(?:limit|union|except|intersect)\b|$)")
+_SELECT_RE = re.compile(r"^\s*select\s+(?:distinct\s+|all\s+)?(.*?)\bfrom\b")
+# '*' ou 'alias.*' como item da lista do SELECT (não o '*' de count(*) ou de a * b)
+_STAR_ITEM_RE = re.compile(r"(?:^|,)\s*(?:\"?\w+\"?\s*\.\s*)?\*\s*(?=,|$)")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+@dataclass
+class IndexProposal:
+    """Índice sugerido, com a evidência do workload e do plano antes/depois."""
+
+    table: str
+    columns: List[str]
+    covering: bool
+    fingerprints: List[str] = field(default_factory=list)
+    calls: int = 0
+    total_ms: float = 0.0
+    rows_per_call: Optional[int] = None
+    plan_before: str = ""
+    plan_after: str = ""
+    removes_scan: bool = False
+    removes_sorts: int = 0
+
+    @property
+    def name(self) -> str:
+        return index_name(self.table, self.columns)
+
+    @property
+    def ddl(self) -> str:
+        cols = ", ".join(_quote(c) for c in self.columns)
+        return f"CREATE INDEX IF NOT EXISTS {_quote(self.name)} ON {_quote(self.table)} ({cols});"
+
+    @property
+    def rows_avoided(self) -> Optional[int]:
+        # Linhas lidas a menos no workload registrado (varredura completa → busca no índice)
+        if not self.removes_scan or self.rows_per_call is None:
+            return None
+        return self.rows_per_call * self.calls
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    return re.sub(r"\W+", "_", f"idx_{table}_{'_'.join(columns)}")[:60].lower()
+
+
+def _aliases(sql: str, table: str) -> set:
+    """Nomes pelos quais `table` é referenciada na instrução (ela própria e seus aliases)."""
+    names = {table.lower()}
+    for name, alias in _TABLE_REF_RE.findall(sql):
+        if name.lower() == table.lower() and alias and alias.lower() not in _SQL_KEYWORDS:
+            names.add(alias.lower())
+    return names
+
+
+def _refs(text: str, pattern: re.Pattern, names: set, columns: Dict[str, str]) -> List[str]:
+    found: List[str] = []
+    for qualifier, column in pattern.findall(text):
+        if qualifier and qualifier.lower() not in names:
+            continue
+        real = columns.get(column.lower())
+        if real and real not in found:
+            found.append(real)
+    return found
+
+
+def _sections(pattern: re.Pattern, sql: str) -> str:
+    return " ".join(m.group(1) for m in pattern.finditer(sql))
+
+
+def candidate_columns(sql: str, table: str, table_columns: List[str],
+                      rowid_column: Optional[str] = None) -> Tuple[List[str], bool]:
+    """
+    Colunas de um índice para a tabela varrida em `sql` (forma normalizada): igualdades
+    do WHERE/ON, depois GROUP BY ou ORDER BY (evita a B-tree temporária) ou, na falta
+    deles, a primeira coluna com filtro de intervalo. Quando a consulta lê poucas colunas
+    da tabela, elas são acrescentadas para o índice cobrir a consulta. Heurística: a
+    proposta só é mantida se o plano melhorar na cópia de teste.
+    """
+    names = _aliases(sql, table)
+    columns = {c.lower(): c for c in table_columns}
+    filters = _sections(_WHERE_RE, sql) + " " + _sections(_ON_RE, sql)
+    equality = _refs(filters, _EQ_LEFT_RE, names, columns)
+    equality += [c for c in _refs(filters, _EQ_RIGHT_RE, names, columns) if c not in equality]
+    ranges = _refs(filters, _RANGE_LEFT_RE, names, columns)
+    ranges += [c for c in _refs(filters, _RANGE_RIGHT_RE, names, columns) if c not in ranges]
+    ordering = _refs(_sections(_GROUP_RE, sql), re.compile(_COLUMN_REF), names, columns)
+    if not ordering:
+        order_text = _sections(_ORDER_RE, sql)
+        # Ordenação mista (ASC/DESC) ou por expressão não é atendida por um índice simples
+        if order_text and " desc" not in order_text:
+            ordering = _refs(order_text, re.compile(_COLUMN_REF), names, columns)
+
+    index = list(equality)
+    tail = [c for c in ordering if c not in index] or [c for c in ranges[:1] if c not in index]
+    index += tail
+    if not index:
+        return [], False
+
+    select = _SELECT_RE.search(sql)
+    select_list = select.group(1) if select else "*"
+    if _STAR_ITEM_RE.search(select_list):
+        return index[:MAX_INDEX_COLUMNS], False
+    used = _refs(select_list, re.compile(_COLUMN_REF), names, columns)
+    used += [c for c in ranges if c not in used]
+    # O rowid (e seu alias INTEGER PRIMARY KEY) já faz parte de toda entrada de índice
+    extra = [c for c in used if c not in index and c != rowid_column]
+    if extra and len(extra) <= COVERING_MAX_COLUMNS and len(index) + len(extra) <= MAX_INDEX_COLUMNS:
+        return index + extra, True
+    return index[:MAX_INDEX_COLUMNS], not extra
+
+
+def scratch_copy(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Cópia de teste em memória: só o esquema (tabelas, índices e views) e as estatísticas
+    do ANALYZE. Basta para o EXPLAIN QUERY PLAN, que não lê os dados, e não custa nada
+    mesmo para bancos grandes.
+    """
+    scratch = sqlite3.connect(":memory:")
+    rows = conn.execute(
+        "SELECT type, sql FROM sqlite_master WHERE sql IS NOT NULL AND type IN ('table', 'index', 'view') "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END;"
+    ).fetchall()
+    for _, sql in rows:
+        try:
+            scratch.execute(sql)
+        except sqlite3.Error:
+            continue  # tabelas-sombra de FTS5 (já criadas pela tabela virtual), módulos ausentes etc.
+    try:
+        stats = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1;").fetchall()
+    except sqlite3.Error:
+        stats = []  # banco sem ANALYZE: o planejador usa as mesmas estimativas padrão
+    if stats:
+        scratch.execute("ANALYZE;")
+        scratch.execute("DELETE FROM sqlite_stat1;")
+        scratch.executemany("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?);", stats)
+        scratch.execute("ANALYZE sqlite_schema;")  # recarrega as estatísticas
+    scratch.commit()
+    return scratch
+
+
+def _evaluate(scratch: sqlite3.Connection, entry: WorkloadEntry, table: str,
+              columns: List[str]) -> Optional[Tuple[str, str, bool, int]]:
+    """Plano antes/depois do índice candidato na cópia de teste; None se não melhorar."""
+    before = explain_plan(scratch, entry.normalized_sql)
+    if before is None:
+        return None
+    probe = "__devcrew_advisor_probe"
+    scratch.execute(f"CREATE INDEX {_quote(probe)} ON {_quote(table)} ({', '.join(_quote(c) for c in columns)});")
+    try:
+        after = explain_plan(scratch, entry.normalized_sql)
+    finally:
+        scratch.execute(f"DROP INDEX {_quote(probe)};")
+    if after is None:
+        return None
+    # Só SEARCH ou SCAN ... USING COVERING INDEX tiram a tabela de full_scans (explain_plan)
+    removes_scan = table in before.full_scans and table not in after.full_scans
+    removes_sorts = max(len(before.temp_btrees) - len(after.temp_btrees), 0)
+    if not removes_scan and not removes_sorts:
+        return None
+    return before.text, after.text.replace(probe, index_name(table, columns)), removes_scan, removes_sorts
+
+
+def _already_indexed(indexes: List[Tuple[str, bool, List[str]]], columns: List[str]) -> bool:
+    wanted = [c.lower() for c in columns]
+    return any([c.lower() for c in cols[:len(wanted)]] == wanted for _, _, cols in indexes)
+
+
+def advise_indexes(conn: sqlite3.Connection, db_name: str, min_calls: int = 2,
+                   max_proposals: int = 5) -> Tuple[List[IndexProposal], int]:
+    """
+    Lê o workload do banco e devolve (propostas validadas, instruções analisadas).
+    Instruções iguais que pedem o mesmo índice são somadas em uma única proposta.
+    """
+    entries = [e for e in workload_log.entries(db_name, min_calls=min_calls) if e.full_scans or e.temp_btrees]
+    proposals: Dict[Tuple[str, Tuple[str, ...]], IndexProposal] = {}
+    scratch = scratch_copy(conn)
+    try:
+        for entry in entries:
+            # Só ordenação temporária: considera as tabelas citadas em FROM/JOIN
+            referenced = {name.lower() for name, _ in _TABLE_REF_RE.findall(entry.normalized_sql)}
+            tables = entry.full_scans or [t for t in schema_cache.list_tables(conn, db_name) if t.lower() in referenced]
+            for table in tables:
+                if not schema_cache.table_exists(conn, db_name, table):
+                    continue
+                table_columns = schema_cache.table_columns(conn, db_name, table)
+                pk = [c[1] for c in table_columns if c[5]]
+                rowid_column = next((c[1] for c in table_columns if c[5] and str(c[2]).upper() == "INTEGER"
+                                     and len(pk) == 1), None)
+                columns, covering = candidate_columns(
+                    entry.normalized_sql, table, [c[1] for c in table_columns], rowid_column
+                )
+                if not columns or _already_indexed(schema_cache.table_indexes(conn, db_name, table), columns):
+                    continue
+                evaluated = _evaluate(scratch, entry, table, columns)
+                if evaluated is None:
+                    continue
+                key = (table.lower(), tuple(c.lower() for c in columns))
+                proposal = proposals.get(key)
+                if proposal is None:
+                    proposal = IndexProposal(table, columns, covering, rows_per_call=estimate_rows(conn, table),
+                                             plan_before=evaluated[0], plan_after=evaluated[1])
+                    proposals[key] = proposal
+                proposal.fingerprints.append(entry.fingerprint)
+                proposal.calls += entry.calls
+                proposal.total_ms += entry.total_ms
+                proposal.removes_scan = proposal.removes_scan or evaluated[2]
+                proposal.removes_sorts += evaluated[3]
+    finally:
+        scratch.close()
+    ranked = sorted(proposals.values(), key=lambda p: (p.total_ms, p.rows_avoided or 0), reverse=True)
+    return ranked[:max(int(max_proposals or 5), 1)], len(entries)
+
+
+def _format_proposal(position: int, proposal: IndexProposal) -> str:
+    gains = []
+    if proposal.removes_scan:
+        rows = f"~{proposal.rows_per_call} linhas" if proposal.rows_per_call is not None else "a tabela inteira"
+        gains.append(f"deixa de varrer {rows} por execução")
+    if proposal.removes_sorts:
+        gains.append(f"elimina {proposal.removes_sorts} ordenação(ões) em B-tree temporária")
+    avoided = proposal.rows_avoided
+    return "\n".join([
+        f"{position}. {proposal.ddl}" + (" (covering)" if proposal.covering else ""),
+        f"   ganho estimado: {'; '.join(gains)}"
+        + (f"; ~{avoided} linhas a menos no workload registrado" if avoided else ""),
+        f"   workload: {len(proposal.fingerprints)} consulta(s), {proposal.calls} execução(ões), "
+        f"{proposal.total_ms:.1f} ms no total",
+        f"   plano antes:  {proposal.plan_before}",
+        f"   plano depois: {proposal.plan_after}",
+    ])
+
+
+@tool("SQLite Index Advisor")
+@traced_tool("SQLite Index Advisor")
+def advise_sqlite_indexes(
+    db_name: Optional[str] = None,
+    min_calls: int = 2,
+    max_proposals: int = 5,
+    apply: Optional[bool] = False,
+) -> str:
+    """
+    Sugere índices a partir das consultas realmente executadas pelas tools de SQL no banco.
+
+    Lê o workload registrado (consultas normalizadas, duração e plano), encontra as que
+    varrem tabelas inteiras ou ordenam em B-tree temporária e propõe índices (covering
+    quando a consulta lê poucas colunas). Cada proposta é conferida com EXPLAIN QUERY
+    PLAN antes e depois em uma cópia de teste do esquema; só as que melhoram o plano
+    são listadas, da que mais tempo consumiu à que menos.
+
+    Args:
+        db_name (str, optional): Nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
+        min_calls (int): Execuções mínimas de uma consulta para ela ser considerada.
+        max_proposals (int): Número máximo de índices sugeridos.
+        apply (bool, optional): Se True, cria os índices sugeridos pelo caminho da tool
+            'SQLite Execute DDL' (transação única).
+
+    Returns:
+        str: Índices sugeridos com o ganho estimado e os planos, ou o resultado da criação.
+    """
+    try:
+        db_name = resolve_db_name(db_name)
+        with read_connection(db_name) as conn:
+            proposals, analyzed = advise_indexes(conn, db_name, min_calls, max_proposals)
+        annotate(workload_statements=analyzed, proposals=len(proposals))
+
+        if not proposals:
+            if not analyzed:
+                return (f"📭 Nenhuma consulta com varredura completa ou ordenação temporária registrada para "
+                        f"'{db_name}' (mínimo de {min_calls} execução(ões)). Execute as consultas do dia a dia "
+                        "pelas tools de SQL e tente novamente.")
+            return (f"✅ {analyzed} consulta(s) com varredura/ordenação analisada(s) em '{db_name}': "
+                    "nenhum índice simples melhora os planos.")
+
+        report = "\n\n".join(_format_proposal(i, p) for i, p in enumerate(proposals, 1))
+        header = f"📊 Índices sugeridos para '{db_name}' ({analyzed} consulta(s) analisada(s) do workload):"
+        if not apply:
+            return f"{header}\n\n{report}\n\nPara criar, chame esta tool com apply=True."
+
+        result = apply_ddl_script(db_name, "\n".join(p.ddl for p in proposals))
+        return f"{header}\n\n{report}\n\n{result}"
+    except sqlite3.Error as e:
+        return f"⚠️ Erro SQLite: {e}"
+    except Exception as e:
+        return f"⚠️ Erro inesperado: {e}"
@@ -0,0 +1,262 @@
+# tools/sqlite_memory_store.py
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.sqlite_connection_pool import read_connection, write_connection
+from tools.sqlite_result_cache import LRUTTLCache
+
+# Arquivo SQLite onde a memória dos agentes é persistida
+MEMORY_DB = os.getenv("DEVCREW_MEMORY_DB", "devcrew_memory.db")
+# TTL padrão (s) de chaves e fatos; 0 = não expira
+MEMORY_TTL = float(os.getenv("DEVCREW_MEMORY_TTL", str(7 * 24 * 3600)))
+# TTL do cache em processo: limita o tempo em que outro processo pode ver um valor antigo
+MEMORY_CACHE_TTL = float(os.getenv("DEVCREW_MEMORY_CACHE_TTL", "30"))
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("DEVCREW_MEMORY_CACHE_MAX_ENTRIES", "4096"))
+# Intervalo mínimo (s) entre limpezas das entradas expiradas
+PURGE_INTERVAL = 60.0
+# Namespace usado fora de uma sessão (ex.: CLI, benchmarks)
+DEFAULT_NAMESPACE = "default"
+# Banco usado quando a sessão ainda não definiu um banco ativo
+DEFAULT_DB = os.getenv("DEVCREW_DEFAULT_DB", "devcrew.db")
+
+ACTIVE_DB_KEY = "current_db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS memory_facts (
+    id INTEGER PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    fact TEXT NOT NULL,
+    source TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_memory_facts_ns ON memory_facts(namespace, created_at);
+CREATE INDEX IF NOT EXISTS idx_memory_kv_expires ON memory_kv(expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_memory_facts_expires ON memory_facts(expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+_current_namespace: "contextvars.ContextVar[str]" = contextvars.ContextVar(
+    "devcrew_memory_namespace", default=DEFAULT_NAMESPACE
+)
+_MISSING = object()
+
+
+class CrewMemory:
+    """
+    Memória persistente dos agentes: chave-valor e fatos da conversa em um arquivo SQLite.
+
+    - Namespaces por sessão: `with memory.session(id):` isola as chaves (ex.: banco
+      ativo) de cada conversa; fora de uma sessão usa-se o namespace 'default'.
+    - Cache em processo com leitura direta (read-through) e escrita direta
+      (write-through); leituras repetidas, como o banco ativo em cada passo do
+      agente, não tocam o disco.
+    - TTL por entrada: entradas expiradas são ignoradas na leitura e removidas
+      periodicamente.
+    """
+
+    def __init__(self, path: str = MEMORY_DB, ttl: float = MEMORY_TTL,
+                 cache_ttl: float = MEMORY_CACHE_TTL, cache_max_entries: int = MEMORY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.cache = LRUTTLCache(cache_max_entries, 8 * 1024 * 1024, cache_ttl)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._last_purge = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Infraestrutura
+    # ------------------------------------------------------------------ #
+    def _ensure_schema(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                with write_connection(self.path) as conn:
+                    conn.executescript(_SCHEMA)
+                self._initialized = True
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl if ttl and ttl > 0 else None
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._last_purge >= PURGE_INTERVAL:
+            self._last_purge = now
+            self.purge_expired()
+
+    @staticmethod
+    def namespace(namespace: Optional[str] = None) -> str:
+        return namespace or _current_namespace.get()
+
+    @contextmanager
+    def session(self, session_id: Optional[str]) -> Iterator[str]:
+        """Define o namespace das operações de memória executadas neste contexto."""
+        token = _current_namespace.set(f"session:{session_id}" if session_id else DEFAULT_NAMESPACE)
+        try:
+            yield _current_namespace.get()
+        finally:
+            _current_namespace.reset(token)
+
+    # ------------------------------------------------------------------ #
+    # Chave-valor
+    # ------------------------------------------------------------------ #
+    def save(self, key: str, value: Any, ttl: Optional[float] = None, namespace: Optional[str] = None) -> None:
+        """Grava `value` (serializável em JSON) sob `key` no namespace atual."""
+        self._ensure_schema()
+        ns = self.namespace(namespace)
+        payload = json.dumps(value, ensure_ascii=False)
+        expires_at = self._expires_at(ttl)
+        with write_connection(self.path) as conn:
+            conn.execute(
+                "INSERT INTO memory_kv (namespace, key, value, updated_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, "
+                "updated_at = excluded.updated_at, expires_at = excluded.expires_at;",
+                (ns, key, payload, time.time(), expires_at),
+            )
+            conn.commit()
+        self.cache.put((ns, key), (value, expires_at), size=len(payload))
+        self._maybe_purge()
+
+    def get(self, key: str, default: Any = None, namespace: Optional[str] = None) -> Any:
+        """Lê `key` do namespace atual (cache em processo → arquivo SQLite)."""
+        ns = self.namespace(namespace)
+        cached = self.cache.get((ns, key))
+        if cached is None:
+            self._ensure_schema()
+            with read_connection(self.path) as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM memory_kv WHERE namespace = ? AND key = ?;", (ns, key)
+                ).fetchone()
+            # Chaves ausentes também vão para o cache, evitando consultas repetidas
+            cached = (json.loads(row[0]), row[1]) if row else (_MISSING, None)
+            self.cache.put((ns, key), cached, size=len(row[0]) if row else 1)
+        value, expires_at = cached
+        if value is _MISSING or (expires_at is not None and expires_at <= time.time()):
+            return default
+        return value
+
+    def delete(self, key: str, namespace: Optional[str] = None) -> None:
+        self._ensure_schema()
+        ns = self.namespace(namespace)
+        with write_connection(self.path) as conn:
+            conn.execute("DELETE FROM memory_kv WHERE namespace = ? AND key = ?;", (ns, key))
+            conn.commit()
+        self.cache.put((ns, key), (_MISSING, None), size=1)
+
+    # ------------------------------------------------------------------ #
+    # Fatos da conversa
+    # ------------------------------------------------------------------ #
+    def add_fact(self, fact: str, source: Optional[str] = None, ttl: Optional[float] = None,
+                 namespace: Optional[str] = None) -> int:
+        """Registra um fato da conversa (ex.: 'a tabela users usa e-mail como chave')."""
+        self._ensure_schema()
+        ns = self.namespace(namespace)
+        with write_connection(self.path) as conn:
+            cursor = conn.execute(
+                "INSERT INTO memory_facts (namespace, fact, source, created_at, expires_at) VALUES (?, ?, ?, ?, ?);",
+                (ns, fact.strip(), source, time.time(), self._expires_at(ttl)),
+            )
+            conn.commit()
+            fact_id = cursor.lastrowid
+        self.cache.invalidate(lambda k: k == ("facts", ns))
+        self._maybe_purge()
+        return fact_id
+
+    def facts(self, query: Optional[str] = None, limit: int = 20, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fatos mais recentes do namespace, opcionalmente filtrados pelos termos de `query`."""
+        ns = self.namespace(namespace)
+        cached = self.cache.get(("facts", ns))
+        if cached is None:
+            self._ensure_schema()
+            with read_connection(self.path) as conn:
+                rows = conn.execute(
+                    "SELECT id, fact, source, created_at, expires_at FROM memory_facts "
+                    "WHERE namespace = ? ORDER BY created_at DESC, id DESC LIMIT 500;",
+                    (ns,),
+                ).fetchall()
+            cached = [
+                {"id": r[0], "fact": r[1], "source": r[2], "created_at": r[3], "expires_at": r[4]} for r in rows
+            ]
+            self.cache.put(("facts", ns), cached, size=sum(len(f["fact"]) for f in cached) or 1)
+
+        now = time.time()
+        terms = [t for t in (query or "").lower().split() if t]
+        selected = []
+        for item in cached:
+            if item["expires_at"] is not None and item["expires_at"] <= now:
+                continue
+            if terms and not all(t in item["fact"].lower() for t in terms):
+                continue
+            selected.append(item)
+            if len(selected) >= limit:
+                break
+        return selected
+
+    # ------------------------------------------------------------------ #
+    # Manutenção
+    # ------------------------------------------------------------------ #
+    def purge_expired(self) -> int:
+        """Remove do arquivo as entradas expiradas. Retorna quantas foram removidas."""
+        self._ensure_schema()
+        now = time.time()
+        with write_connection(self.path) as conn:
+            removed = conn.execute("DELETE FROM memory_kv WHERE expires_at IS NOT NULL AND expires_at <= ?;",
+                                   (now,)).rowcount
+            removed += conn.execute("DELETE FROM memory_facts WHERE expires_at IS NOT NULL AND expires_at <= ?;",
+                                    (now,)).rowcount
+            conn.commit()
+        if removed:
+            self.cache.clear()
+        return removed
+
+    def clear_namespace(self, namespace: Optional[str] = None) -> None:
+        self._ensure_schema()
+        ns = self.namespace(namespace)
+        with write_connection(self.path) as conn:
+            conn.execute("DELETE FROM memory_kv WHERE namespace = ?;", (ns,))
+            conn.execute("DELETE FROM memory_facts WHERE namespace = ?;", (ns,))
+            conn.commit()
+        self.cache.invalidate(lambda k: k[0] == ns or k == ("facts", ns))
+
+    # ------------------------------------------------------------------ #
+    # Banco ativo da sessão
+    # ------------------------------------------------------------------ #
+    def active_db(self) -> str:
+        return self.get(ACTIVE_DB_KEY) or DEFAULT_DB
+
+    def set_active_db(self, db_name: str) -> None:
+        # Evita escrita em disco quando o banco ativo não mudou
+        if self.get(ACTIVE_DB_KEY) != db_name:
+            self.save(ACTIVE_DB_KEY, db_name)
+
+
+def resolve_db_name(db_name: Optional[str]) -> str:
+    """
+    Banco efetivo de uma chamada de tool: o informado (normalizado com '.db', que
+    passa a ser o banco ativo da sessão) ou, se omitido, o banco ativo da sessão.
+    """
+    if db_name and str(db_name).strip():
+        db_name = str(db_name).strip()
+        if not db_name.endswith(".db"):
+            db_name = f"{db_name}.db"
+        memory.set_active_db(db_name)
+        return db_name
+    return memory.active_db()
+
+
+# ✅ Instância global compartilhada pelas tools, pelo roteador e pela UI
+memory = CrewMemory()
@@ -1,11 +1,11 @@
 # tools/sqlite_memory_tools.py
-from crewai.memory import Memory
+from typing import Optional
 from crewai.tools import tool
-
-# ✅ Instância global de memória semântica
-memory = CrewMemory()
+from runtime.tracing import traced_tool
+from tools.sqlite_memory_store import ACTIVE_DB_KEY, DEFAULT_DB, memory
 
 @tool("Set Current SQLite Database")
+@traced_tool("Set Current SQLite Database")
 def set_current_db_tool(db_name: str) -> str:
     """
     Define o banco de dados SQLite ativo que será usado pelas outras Tools.
@@ -17,16 +17,20 @@ def set_current_db_tool(db_name: str) -> str:
         str: Mensagem confirmando o banco configurado.
     """
     try:
+        if not db_name or not db_name.strip():
+            return "⚠️ Informe o nome do banco de dados."
+        db_name = db_name.strip()
         if not db_name.endswith(".db"):
             db_name += ".db"
 
-        memory.save("current_db", db_name)
+        memory.set_active_db(db_name)
         return f"✅ Banco de dados ativo configurado para '{db_name}'."
     except Exception as e:
         return f"⚠️ Erro ao configurar banco de dados: {e}"
 
 
 @tool("Get Current SQLite Database")
+@traced_tool("Get Current SQLite Database")
 def get_current_db_tool() -> str:
     """
     Retorna o banco de dados SQLite atualmente configurado como ativo.
@@ -35,21 +39,63 @@ def get_current_db_tool() -> str:
         str: Nome do banco ativo.
     """
     try:
-        db = memory.get("current_db")
+        db = memory.get(ACTIVE_DB_KEY)
         if not db:
-            return "📦 Nenhum banco configurado. Use 'Set Current SQLite Database' para definir um."
+            return (f"📦 Nenhum banco configurado; as tools usam '{DEFAULT_DB}'. "
+                    "Use 'Set Current SQLite Database' para definir um.")
         return f"📦 Banco de dados ativo: '{db}'."
     except Exception as e:
         return f"⚠️ Erro ao obter banco de dados ativo: {e}"
 
 
+@tool("Remember Fact")
+@traced_tool("Remember Fact")
+def remember_fact_tool(fact: str, ttl_seconds: Optional[float] = None) -> str:
+    """
+    Guarda um fato da conversa na memória persistente da sessão
+    (ex: 'a tabela pedidos referencia clientes.id').
+
+    Args:
+        fact (str): Fato a ser lembrado, em uma frase.
+        ttl_seconds (float, optional): Validade do fato em segundos (padrão: TTL da memória).
+
+    Returns:
+        str: Confirmação com o identificador do fato.
+    """
+    try:
+        if not fact or not fact.strip():
+            return "⚠️ O fato está vazio."
+        fact_id = memory.add_fact(fact, source="agent", ttl=ttl_seconds)
+        return f"✅ Fato #{fact_id} registrado na memória da sessão."
+    except Exception as e:
+        return f"⚠️ Erro ao registrar fato: {e}"
+
+
+@tool("Recall Facts")
+@traced_tool("Recall Facts")
+def recall_facts_tool(query: Optional[str] = None, limit: int = 10) -> str:
+    """
+    Lista os fatos lembrados na sessão, do mais recente ao mais antigo.
+
+    Args:
+        query (str, optional): Termos que o fato deve conter (todos, sem diferenciar maiúsculas).
+        limit (int): Número máximo de fatos retornados.
+
+    Returns:
+        str: Lista de fatos ou aviso de que nada foi encontrado.
+    """
+    try:
+        found = memory.facts(query, limit=max(1, int(limit)))
+        if not found:
+            return "📭 Nenhum fato encontrado na memória da sessão."
+        return "🧠 Fatos lembrados:\n" + "\n".join(f"- #{f['id']}: {f['fact']}" for f in found)
+    except Exception as e:
+        return f"⚠️ Erro ao consultar a memória: {e}"
+
+
 def get_active_db_name() -> str:
     """
     Função auxiliar para uso interno por outras Tools.
-    Retorna apenas o nome do banco atual ou 'devcrew.db' por padrão.
+    Retorna apenas o nome do banco ativo da sessão ou o banco padrão.
     """
-    db = memory.get("current_db")
-    if not db:
-        db = "devcrew.db"
-        memory.save("current_db", db)
-    return db
+    return memory.active_db()
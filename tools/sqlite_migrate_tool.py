@@ -0,0 +1,130 @@
+# tools/sqlite_migrate_tool.py
+import json
+import sqlite3
+from typing import Dict, List, Optional, Union
+from crewai.tools import tool
+from runtime.tracing import annotate, traced_tool
+from tools.sqlite_connection_pool import write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_migration_engine import (
+    MigrationError,
+    MigrationPlan,
+    applied_migration,
+    apply_migration,
+    desired_catalog,
+    log_progress,
+    plan_migration,
+    read_catalog,
+)
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
+
+
+def _parse_renames(renames: Union[str, Dict[str, str], None]) -> Dict[str, str]:
+    if not renames:
+        return {}
+    if isinstance(renames, str):
+        renames = json.loads(renames)
+    if not isinstance(renames, dict):
+        raise MigrationError("⚠️ 'renames' deve ser um objeto {\"antiga\": \"nova\", \"tabela.coluna\": \"nova\"}.")
+    return {str(k): str(v) for k, v in renames.items()}
+
+
+def _format_plan(plan: MigrationPlan) -> str:
+    lines = [f"{i}. {op.describe()}" for i, op in enumerate(plan.operations, 1)]
+    if plan.kept:
+        lines.append(f"Mantidos (fora do esquema desejado; use allow_drop=True para remover): {', '.join(plan.kept)}")
+    return "\n".join(lines)
+
+
+@tool("SQLite Migrate Schema")
+@traced_tool("SQLite Migrate Schema")
+def migrate_sqlite_schema(
+    db_name: Optional[str] = None,
+    schema_sql: str = "",
+    version: Optional[str] = None,
+    description: Optional[str] = None,
+    renames: Union[str, Dict[str, str], None] = None,
+    allow_drop: Optional[bool] = False,
+    dry_run: Optional[bool] = False,
+) -> str:
+    """
+    Leva um banco existente ao esquema desejado com o menor conjunto de alterações,
+    sem reexecutar o script inteiro.
+
+    Compara o esquema desejado com o catálogo atual e gera só o necessário: ADD COLUMN,
+    RENAME de tabelas/colunas, criação/remoção de índices, views e triggers e, apenas
+    quando o SQLite não tem ALTER TABLE equivalente, a reconstrução da tabela (cópia
+    em lotes com progresso). A migração roda em uma única transação e a versão fica
+    registrada na tabela 'schema_migrations'.
+
+    Args:
+        db_name (str, optional): nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
+        schema_sql (str): esquema desejado completo (apenas CREATE TABLE/INDEX/VIEW/TRIGGER)
+        version (str, optional): identificador da migração, aplicada uma única vez (padrão:
+            derivado do esquema desejado; o banco é sempre comparado com ele)
+        description (str, optional): descrição registrada no histórico
+        renames (dict | str, optional): renomeações, ex.: {"clientes": "customers", "customers.nome": "name"}
+        allow_drop (bool, optional): permite remover tabelas, colunas, índices, views e triggers ausentes do esquema desejado
+        dry_run (bool, optional): apenas mostra o plano, sem alterar o banco
+
+    Returns:
+        str: plano de migração e resultado (ou descrição do erro)
+    """
+    try:
+        db_name = resolve_db_name(db_name)
+        if not schema_sql or not isinstance(schema_sql, str):
+            return "⚠️ Informe o esquema desejado completo em 'schema_sql'."
+        desired = desired_catalog(schema_sql)
+        rename_map = _parse_renames(renames)
+
+        progress: List[str] = []
+
+        def report(table: str, copied: int, total: int) -> None:
+            log_progress(table, copied, total)
+            if copied == total:
+                progress.append(f"{table}: {copied}/{total} linha(s) copiada(s)")
+
+        with write_connection(db_name) as conn:
+            # Versões explícitas são aplicadas uma única vez. Versões automáticas (derivadas do
+            # esquema desejado) sempre comparam com o catálogo atual: o banco pode ter migrado
+            # para outro esquema depois delas
+            explicit = bool(version and str(version).strip())
+            version = str(version).strip() if explicit else f"auto-{desired.checksum()[:12]}"
+            applied = applied_migration(conn, version) if explicit else None
+            if applied is not None:
+                if applied[0] != desired.checksum():
+                    return (f"🚫 A versão '{version}' já foi aplicada em '{db_name}' ({applied[1]}) com outro esquema. "
+                            "Use um novo identificador de versão.")
+                return f"✅ Versão '{version}' já aplicada em '{db_name}' ({applied[1]}); nada a fazer."
+
+            live = read_catalog(conn)
+            plan = plan_migration(live, desired, rename_map, bool(allow_drop))
+            annotate(operations=len(plan.operations), rebuilds=len(plan.rebuilds), dry_run=bool(dry_run))
+            if dry_run:
+                if not plan.operations:
+                    return f"✅ '{db_name}' já está no esquema desejado; nenhuma operação necessária."
+                return (f"📊 Plano de migração '{version}' para '{db_name}' ({len(plan.operations)} operação(ões), "
+                        f"{len(plan.rebuilds)} reconstrução(ões) de tabela):\n{_format_plan(plan)}")
+
+            try:
+                result = apply_migration(conn, plan, desired, version, description, report)
+            finally:
+                schema_cache.refresh(conn, db_name)
+                result_cache.notify_write(db_name)
+
+        if not plan.operations:
+            return f"✅ '{db_name}' já estava no esquema desejado; versão '{version}' registrada."
+        summary = (f"✅ Migração '{version}' aplicada em '{db_name}' em uma transação: "
+                   f"{len(plan.operations)} operação(ões) em {result.duration_ms:.0f} ms.\n{_format_plan(plan)}")
+        if progress:
+            summary += "\nReconstruções: " + "; ".join(progress)
+        return summary
+    except MigrationError as e:
+        return str(e)
+    except json.JSONDecodeError as e:
+        return f"⚠️ 'renames' não é um JSON válido: {e}"
+    except sqlite3.Error as e:
+        return f"⚠️ Erro SQLite (migração desfeita): {e}"
+    except Exception as e:
+        return f"⚠️ Erro inesperado: {e}"
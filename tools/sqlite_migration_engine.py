@@ -0,0 +1,576 @@
+# tools/sqlite_migration_engine.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from runtime.tracing import annotate, tracer
+from tools.sqlite_statement_engine import split_statements
+
+# Tabela com o histórico das migrações aplicadas em cada banco
+MIGRATIONS_TABLE = "schema_migrations"
+# Linhas copiadas por lote ao reconstruir uma tabela (progresso reportado a cada lote)
+REBUILD_BATCH_SIZE = int(os.getenv("DEVCREW_MIGRATION_BATCH_SIZE", "50000"))
+
+_REBUILD_PREFIX = "_migrate_new_"
+_CONSTRAINT_KEYWORDS = ("constraint", "primary", "unique", "check", "foreign")
+_STRING_RE = re.compile(r"('(?:[^']|'')*')")
+_SPACES_RE = re.compile(r"\s+")
+_NON_CONSTANT_DEFAULT_RE = re.compile(r"\bdefault\s*(?:\(|current_time|current_date|current_timestamp)")
+_CREATE_RE = re.compile(r"^\s*create\s+(?:temp\s+|temporary\s+)?(?:unique\s+)?(?:virtual\s+)?"
+                        r"(table|index|view|trigger)\b", re.IGNORECASE)
+
+logger = logging.getLogger("devcrew.migrations")
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class MigrationError(Exception):
+    """Migração recusada no planejamento; str(e) é a mensagem devolvida pela tool."""
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def normalize_sql(text: str) -> str:
+    """Espaços únicos e minúsculas fora de literais de texto (comparação de definições)."""
+    parts = _STRING_RE.split(text or "")
+    return "".join(p if i % 2 else _SPACES_RE.sub(" ", p).lower() for i, p in enumerate(parts)).strip().rstrip(";")
+
+
+def _unquote(name: str) -> str:
+    if len(name) >= 2 and name[0] in "\"`[" and name[-1] in "\"`]":
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Divide o corpo de um CREATE TABLE nas vírgulas de primeiro nível."""
+    parts: List[str] = []
+    depth = 0
+    quote: Optional[str] = None
+    current: List[str] = []
+    for char in body:
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"`":
+            quote = char
+        elif char == "[":
+            quote = "]"
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _first_token(text: str) -> Tuple[str, str]:
+    match = re.match(r'\s*("(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]|\S+)\s*(.*)$', text, re.DOTALL)
+    return (match.group(1), match.group(2)) if match else (text, "")
+
+
+@dataclass
+class TableDef:
+    name: str
+    sql: str
+    columns: List[Tuple[str, str]] = field(default_factory=list)  # (nome, definição)
+    constraints: List[str] = field(default_factory=list)
+    options: str = ""
+    body: str = ""
+    virtual: bool = False
+
+    @property
+    def column_names(self) -> List[str]:
+        return [c for c, _ in self.columns]
+
+    @property
+    def without_rowid(self) -> bool:
+        return "without rowid" in normalize_sql(self.options)
+
+    def signature(self) -> Tuple:
+        """Definição normalizada (colunas, restrições e opções), sem o nome da tabela."""
+        return (
+            tuple((c.lower(), normalize_sql(d)) for c, d in self.columns),
+            tuple(normalize_sql(c) for c in self.constraints),
+            normalize_sql(self.options),
+        )
+
+
+def parse_table(name: str, sql: str) -> TableDef:
+    table = TableDef(name=name, sql=sql)
+    if re.match(r"\s*create\s+virtual\b", sql, re.IGNORECASE):
+        table.virtual = True
+        return table
+    start = sql.index("(")
+    depth, end = 0, len(sql)
+    quote: Optional[str] = None
+    for i in range(start, len(sql)):
+        char = sql[i]
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"`":
+            quote = char
+        elif char == "[":
+            quote = "]"
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                end = i
+                break
+    table.body = sql[start + 1:end]
+    table.options = sql[end + 1:].strip()
+    for part in _split_top_level(table.body):
+        if part.lower().split(None, 1)[0] in _CONSTRAINT_KEYWORDS:
+            table.constraints.append(part)
+        else:
+            column, definition = _first_token(part)
+            table.columns.append((_unquote(column), definition.strip()))
+    return table
+
+
+@dataclass
+class Catalog:
+    """Objetos do esquema, por nome em minúsculas."""
+
+    tables: Dict[str, TableDef] = field(default_factory=dict)
+    indexes: Dict[str, Tuple[str, str, str]] = field(default_factory=dict)  # nome → (nome, tabela, sql)
+    views: Dict[str, Tuple[str, str]] = field(default_factory=dict)  # nome → (nome, sql)
+    triggers: Dict[str, Tuple[str, str, str]] = field(default_factory=dict)  # nome → (nome, tabela, sql)
+
+    def checksum(self) -> str:
+        items = sorted(
+            [normalize_sql(t.sql) for t in self.tables.values()]
+            + [normalize_sql(i[2]) for i in self.indexes.values()]
+            + [normalize_sql(v[1]) for v in self.views.values()]
+            + [normalize_sql(t[2]) for t in self.triggers.values()]
+        )
+        return hashlib.sha1("\n".join(items).encode("utf-8")).hexdigest()
+
+
+def read_catalog(conn: sqlite3.Connection) -> Catalog:
+    """Catálogo do banco, sem objetos internos, tabelas-sombra (FTS5) e o histórico de migrações."""
+    try:
+        shadow = {row[1].lower() for row in conn.execute("PRAGMA table_list;").fetchall()
+                  if row[2] == "shadow" and row[0] == "main"}
+    except sqlite3.Error:
+        shadow = set()  # SQLite < 3.37
+    catalog = Catalog()
+    rows = conn.execute(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid;"
+    ).fetchall()
+    for kind, name, table, sql in rows:
+        key = name.lower()
+        if key.startswith("sqlite_") or key == MIGRATIONS_TABLE or key in shadow:
+            continue
+        if table.lower() in shadow or table.lower() == MIGRATIONS_TABLE:
+            continue
+        if kind == "table":
+            catalog.tables[key] = parse_table(name, sql)
+        elif kind == "index":
+            catalog.indexes[key] = (name, table, sql)
+        elif kind == "view":
+            catalog.views[key] = (name, sql)
+        elif kind == "trigger":
+            catalog.triggers[key] = (name, table, sql)
+    return catalog
+
+
+def desired_catalog(schema_sql: str) -> Catalog:
+    """Carrega o esquema desejado em um banco em memória e lê o catálogo resultante."""
+    statements = split_statements(schema_sql)
+    if not statements:
+        raise MigrationError("⚠️ Informe o esquema desejado completo em 'schema_sql'.")
+    invalid = [s for s in statements if not _CREATE_RE.match(s)]
+    if invalid:
+        raise MigrationError(
+            "🚫 O esquema desejado deve conter apenas CREATE TABLE/INDEX/VIEW/TRIGGER "
+            f"(encontrado: {invalid[0][:80]})."
+        )
+    scratch = sqlite3.connect(":memory:")
+    try:
+        for statement in statements:
+            try:
+                scratch.execute(statement)
+            except sqlite3.Error as e:
+                raise MigrationError(f"⚠️ Esquema desejado inválido ({statement[:80]}): {e}")
+        return read_catalog(scratch)
+    finally:
+        scratch.close()
+
+
+@dataclass
+class MigrationOp:
+    kind: str  # rename_table, rename_column, create_table, add_column, rebuild_table, drop_table, create_index...
+    target: str
+    sql: str = ""
+    detail: str = ""
+
+    def describe(self) -> str:
+        return f"{self.kind} {self.target}" + (f": {self.detail}" if self.detail else "")
+
+
+@dataclass
+class MigrationPlan:
+    operations: List[MigrationOp] = field(default_factory=list)
+    kept: List[str] = field(default_factory=list)  # objetos só do banco, mantidos (allow_drop=False)
+    checksum: str = ""
+    allow_drop: bool = False
+
+    @property
+    def rebuilds(self) -> List[str]:
+        return [op.target for op in self.operations if op.kind == "rebuild_table"]
+
+
+def _add_column_allowed(definition: str) -> bool:
+    """Restrições do ALTER TABLE ADD COLUMN no SQLite."""
+    text = normalize_sql(definition)
+    if re.search(r"\bprimary\s+key\b|\bunique\b|\bstored\b", text):
+        return False
+    if _NON_CONSTANT_DEFAULT_RE.search(text):
+        return False
+    if re.search(r"\bnot\s+null\b", text) and not re.search(r"\bdefault\s+(?!null\b)\S", text):
+        return False
+    return True
+
+
+def _parse_renames(renames: Optional[Dict[str, str]]) -> Tuple[Dict[str, str], Dict[str, Dict[str, str]]]:
+    tables: Dict[str, str] = {}
+    columns: Dict[str, Dict[str, str]] = {}
+    for old, new in (renames or {}).items():
+        old, new = str(old).strip(), str(new).strip()
+        if "." in old:
+            table, column = old.split(".", 1)
+            columns.setdefault(table.lower(), {})[column.lower()] = new.split(".")[-1]
+        else:
+            tables[old.lower()] = new
+    return tables, columns
+
+
+def plan_migration(live: Catalog, desired: Catalog, renames: Optional[Dict[str, str]] = None,
+                   allow_drop: bool = False) -> MigrationPlan:
+    """
+    Menor conjunto de operações que leva o catálogo `live` ao `desired`:
+
+    - RENAME de tabelas e colunas (informados em `renames`: {"antiga": "nova",
+      "tabela.coluna_antiga": "coluna_nova"});
+    - ADD COLUMN quando as colunas novas vêm no fim e o SQLite aceita a definição;
+    - reconstrução da tabela (nova tabela + cópia + troca) só quando a mudança não
+      tem ALTER TABLE equivalente (tipo/restrição alterada, coluna removida ou fora
+      de ordem);
+    - criação/remoção de índices, views e triggers alterados.
+
+    Objetos que só existem no banco são mantidos, a menos que allow_drop=True. Lança
+    MigrationError quando a migração perderia dados sem allow_drop.
+    """
+    plan = MigrationPlan(checksum=desired.checksum(), allow_drop=allow_drop)
+    table_renames, column_renames = _parse_renames(renames)
+    live_tables = {key: replace(table) for key, table in live.tables.items()}  # cópia: ajustada pelos RENAMEs
+
+    # 1. Renomeações (ajustam a visão do catálogo atual para a comparação)
+    for old_key, new_name in table_renames.items():
+        table = live_tables.pop(old_key, None)
+        if table is None:
+            raise MigrationError(f"⚠️ Tabela a renomear não existe: '{old_key}'.")
+        if new_name.lower() not in desired.tables:
+            raise MigrationError(f"⚠️ O novo nome '{new_name}' não está no esquema desejado.")
+        if new_name.lower() in live_tables:
+            raise MigrationError(f"⚠️ Não é possível renomear '{table.name}': '{new_name}' já existe.")
+        plan.operations.append(MigrationOp(
+            "rename_table", new_name, f"ALTER TABLE {_quote(table.name)} RENAME TO {_quote(new_name)};",
+            f"{table.name} → {new_name}",
+        ))
+        live_tables[new_name.lower()] = replace(table, name=new_name)
+        # O RENAME também atualiza as chaves estrangeiras das outras tabelas
+        references = re.compile(rf"(\breferences\s+)(?:\"{re.escape(table.name)}\"|`{re.escape(table.name)}`|"
+                                rf"\[{re.escape(table.name)}\]|{re.escape(table.name)}\b)", re.IGNORECASE)
+        for other in live_tables.values():
+            other.columns = [(c, references.sub(rf"\g<1>{new_name}", d)) for c, d in other.columns]
+            other.constraints = [references.sub(rf"\g<1>{new_name}", c) for c in other.constraints]
+    for table_key, mapping in column_renames.items():
+        table = live_tables.get(table_key)
+        if table is None:
+            raise MigrationError(f"⚠️ Tabela das colunas a renomear não existe: '{table_key}'.")
+        columns = []
+        for column, definition in table.columns:
+            new_column = mapping.get(column.lower())
+            if new_column:
+                plan.operations.append(MigrationOp(
+                    "rename_column", f"{table.name}.{new_column}",
+                    f"ALTER TABLE {_quote(table.name)} RENAME COLUMN {_quote(column)} TO {_quote(new_column)};",
+                    f"{column} → {new_column}",
+                ))
+                column = new_column
+            columns.append((column, definition))
+        missing = set(mapping) - {c.lower() for c, _ in table.columns}
+        if missing:
+            raise MigrationError(f"⚠️ Colunas a renomear inexistentes em '{table.name}': {', '.join(sorted(missing))}.")
+        table.columns = columns
+
+    # 2. Tabelas
+    rebuilt: set = set()
+    for key, wanted in desired.tables.items():
+        current = live_tables.get(key)
+        if current is None:
+            plan.operations.append(MigrationOp("create_table", wanted.name, wanted.sql.rstrip(";") + ";"))
+            continue
+        if current.virtual or wanted.virtual:
+            if normalize_sql(current.sql) != normalize_sql(wanted.sql):
+                # Tabelas virtuais não têm ALTER TABLE: recria (índices FTS são reconstruídos)
+                plan.operations.append(MigrationOp("recreate_virtual_table", wanted.name, wanted.sql, "recriada"))
+            continue
+        if current.signature() == wanted.signature():
+            continue
+
+        live_cols = [(c.lower(), normalize_sql(d)) for c, d in current.columns]
+        wanted_cols = [(c.lower(), normalize_sql(d)) for c, d in wanted.columns]
+        appended = wanted_cols[len(live_cols):]
+        same_rest = (tuple(normalize_sql(c) for c in current.constraints) == tuple(normalize_sql(c) for c in wanted.constraints)
+                     and normalize_sql(current.options) == normalize_sql(wanted.options))
+        if (same_rest and wanted_cols[:len(live_cols)] == live_cols
+                and all(_add_column_allowed(d) for _, d in wanted.columns[len(live_cols):])):
+            for column, definition in wanted.columns[len(live_cols):]:
+                plan.operations.append(MigrationOp(
+                    "add_column", f"{wanted.name}.{column}",
+                    f"ALTER TABLE {_quote(wanted.name)} ADD COLUMN {_quote(column)} {definition};".replace(" ;", ";"),
+                ))
+            continue
+
+        dropped = [c for c in current.column_names if c.lower() not in {w.lower() for w in wanted.column_names}]
+        if dropped and not allow_drop:
+            raise MigrationError(
+                f"🚫 A migração removeria as colunas {', '.join(dropped)} de '{wanted.name}' (dados perdidos). "
+                f"Se for uma renomeação, informe renames={{'{wanted.name}.{dropped[0]}': 'novo_nome'}}; "
+                "para remover, use allow_drop=True."
+            )
+        reason = "colunas removidas: " + ", ".join(dropped) if dropped else (
+            "definição de colunas/restrições alterada" if appended or not same_rest else "colunas alteradas")
+        plan.operations.append(MigrationOp("rebuild_table", wanted.name, wanted.sql, reason))
+        rebuilt.add(key)
+
+    for key, current in live_tables.items():
+        if key in desired.tables:
+            continue
+        if allow_drop:
+            plan.operations.append(MigrationOp("drop_table", current.name, f"DROP TABLE {_quote(current.name)};"))
+        else:
+            plan.kept.append(f"tabela {current.name}")
+
+    # 3. Índices, views e triggers (objetos de tabelas reconstruídas são recriados na reconstrução)
+    dropped_tables = {op.target.lower() for op in plan.operations if op.kind == "drop_table"}
+    for key, (name, table, sql) in live.indexes.items():
+        table = table_renames.get(table.lower(), table)
+        if table.lower() in rebuilt or table.lower() in dropped_tables:
+            continue
+        wanted = desired.indexes.get(key)
+        if wanted is None:
+            if allow_drop:
+                plan.operations.append(MigrationOp("drop_index", name, f"DROP INDEX {_quote(name)};"))
+            else:
+                plan.kept.append(f"índice {name}")
+        elif normalize_sql(wanted[2]) != normalize_sql(sql):
+            plan.operations.append(MigrationOp("drop_index", name, f"DROP INDEX {_quote(name)};", "definição alterada"))
+    for key, (name, table, sql) in desired.indexes.items():
+        if table.lower() in rebuilt:
+            continue
+        current = live.indexes.get(key)
+        if current is None or normalize_sql(current[2]) != normalize_sql(sql):
+            plan.operations.append(MigrationOp("create_index", name, sql.rstrip(";") + ";"))
+
+    for kind, live_objects, desired_objects, sql_at in (("view", live.views, desired.views, 1),
+                                                        ("trigger", live.triggers, desired.triggers, 2)):
+        for key, current in live_objects.items():
+            wanted = desired_objects.get(key)
+            on_rebuilt = kind == "trigger" and current[1].lower() in rebuilt
+            if on_rebuilt:
+                continue  # DROP TABLE já remove os triggers da tabela
+            if wanted is None and not allow_drop:
+                plan.kept.append(f"{kind} {current[0]}")
+            elif wanted is None or normalize_sql(wanted[sql_at]) != normalize_sql(current[sql_at]):
+                plan.operations.append(MigrationOp(f"drop_{kind}", current[0],
+                                                   f"DROP {kind.upper()} {_quote(current[0])};"))
+        for key, wanted in desired_objects.items():
+            if kind == "trigger" and wanted[1].lower() in rebuilt:
+                continue
+            current = live_objects.get(key)
+            if current is None or normalize_sql(current[sql_at]) != normalize_sql(wanted[sql_at]):
+                plan.operations.append(MigrationOp(f"create_{kind}", wanted[0], wanted[sql_at].rstrip(";") + ";"))
+
+    # Views/triggers dependem das tabelas: remoções primeiro, criações por último
+    order = {"rename_table": 0, "rename_column": 1, "drop_trigger": 2, "drop_view": 2, "drop_index": 3,
+             "create_table": 4, "add_column": 5, "rebuild_table": 6, "recreate_virtual_table": 6, "drop_table": 7,
+             "create_index": 8, "create_view": 9, "create_trigger": 10}
+    plan.operations.sort(key=lambda op: order.get(op.kind, 99))
+    return plan
+
+
+def _rebuild_table(conn: sqlite3.Connection, live: TableDef, wanted: TableDef, desired: Catalog,
+                   kept_indexes: List[Tuple[str, str, str]], kept_triggers: List[Tuple[str, str, str]],
+                   progress: Optional[ProgressCallback]) -> int:
+    """
+    Reconstrução da tabela (procedimento recomendado pelo SQLite): cria a nova
+    definição com outro nome, copia as linhas em lotes ordenados por rowid (com
+    progresso), remove a antiga, renomeia a nova e recria índices e triggers.
+    """
+    temp_name = f"{_REBUILD_PREFIX}{wanted.name}"
+    conn.execute(f"CREATE TABLE {_quote(temp_name)} ({wanted.body}){(' ' + wanted.options) if wanted.options else ''};")
+    common = [c for c in wanted.column_names if c.lower() in {l.lower() for l in live.column_names}]
+    cols = ", ".join(_quote(c) for c in common)
+    (total,) = conn.execute(f"SELECT count(*) FROM {_quote(live.name)};").fetchone()
+    copied = 0
+    if progress:
+        progress(wanted.name, 0, total)
+
+    if live.without_rowid or wanted.without_rowid:
+        conn.execute(f"INSERT INTO {_quote(temp_name)} ({cols}) SELECT {cols} FROM {_quote(live.name)};")
+        copied = total
+    else:
+        # O rowid é preservado (referências externas, como índices FTS de conteúdo externo)
+        last = None
+        while True:
+            where = "" if last is None else "WHERE rowid > ? "
+            params = () if last is None else (last,)
+            cursor = conn.execute(
+                f"INSERT INTO {_quote(temp_name)} (rowid, {cols}) SELECT rowid, {cols} FROM {_quote(live.name)} "
+                f"{where}ORDER BY rowid LIMIT {REBUILD_BATCH_SIZE};", params,
+            )
+            if cursor.rowcount <= 0:
+                break
+            copied += cursor.rowcount
+            (last,) = conn.execute(f"SELECT max(rowid) FROM {_quote(temp_name)};").fetchone()
+            if progress:
+                progress(wanted.name, copied, total)
+            if cursor.rowcount < REBUILD_BATCH_SIZE:
+                break
+    if progress and (copied == 0 or live.without_rowid or wanted.without_rowid):
+        progress(wanted.name, copied, total)
+
+    conn.execute(f"DROP TABLE {_quote(live.name)};")
+    # Views que citam a tabela não são revalidadas durante a troca de nomes
+    conn.execute("PRAGMA legacy_alter_table=ON;")
+    try:
+        conn.execute(f"ALTER TABLE {_quote(temp_name)} RENAME TO {_quote(wanted.name)};")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table=OFF;")
+    for _, table, sql in list(desired.indexes.values()) + kept_indexes:
+        if table.lower() == wanted.name.lower():
+            conn.execute(sql)
+    for _, table, sql in list(desired.triggers.values()) + kept_triggers:
+        if table.lower() == wanted.name.lower():
+            conn.execute(sql)
+    return copied
+
+
+def ensure_migrations_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version TEXT PRIMARY KEY, checksum TEXT NOT NULL, description TEXT, operations INTEGER NOT NULL, "
+        "rebuilt_tables TEXT, duration_ms REAL, applied_at TEXT NOT NULL DEFAULT (datetime('now')));"
+    )
+
+
+def applied_migration(conn: sqlite3.Connection, version: str) -> Optional[Tuple[str, str]]:
+    """(checksum, applied_at) da versão, se já aplicada."""
+    try:
+        return conn.execute(f"SELECT checksum, applied_at FROM {MIGRATIONS_TABLE} WHERE version = ?;",
+                            (version,)).fetchone()
+    except sqlite3.OperationalError:
+        return None  # banco sem histórico
+
+
+@dataclass
+class MigrationResult:
+    version: str
+    plan: MigrationPlan
+    rows_copied: Dict[str, int] = field(default_factory=dict)
+    duration_ms: float = 0.0
+
+
+def apply_migration(conn: sqlite3.Connection, plan: MigrationPlan, desired: Catalog, version: str,
+                    description: Optional[str] = None,
+                    progress: Optional[ProgressCallback] = None) -> MigrationResult:
+    """
+    Aplica o plano em uma única transação e registra a versão em MIGRATIONS_TABLE.
+    Chaves estrangeiras ficam desligadas durante a migração e são conferidas
+    (PRAGMA foreign_key_check) antes do commit; qualquer erro desfaz tudo.
+    """
+    result = MigrationResult(version, plan)
+    started = time.perf_counter()
+    (foreign_keys,) = conn.execute("PRAGMA foreign_keys;").fetchone()
+    if conn.in_transaction:
+        conn.commit()
+    # Fora de transação: PRAGMA foreign_keys não tem efeito dentro de uma
+    conn.execute("PRAGMA foreign_keys=OFF;")
+    try:
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            ensure_migrations_table(conn)
+            for op in plan.operations:
+                with tracer.span("migration.op", op=op.kind, target=op.target):
+                    if op.kind == "rebuild_table":
+                        key = op.target.lower()
+                        # Catálogo atual (após as renomeações): índices/triggers fora do esquema desejado
+                        # são recriados, a menos que allow_drop permita descartá-los
+                        current = read_catalog(conn)
+                        kept_indexes = [] if plan.allow_drop else [
+                            i for k, i in current.indexes.items() if k not in desired.indexes and i[1].lower() == key]
+                        kept_triggers = [] if plan.allow_drop else [
+                            t for k, t in current.triggers.items() if k not in desired.triggers and t[1].lower() == key]
+                        result.rows_copied[op.target] = _rebuild_table(
+                            conn, current.tables[key], desired.tables[key], desired, kept_indexes, kept_triggers, progress,
+                        )
+                    elif op.kind == "recreate_virtual_table":
+                        conn.execute(f"DROP TABLE {_quote(op.target)};")
+                        conn.execute(op.sql)
+                        if re.search(r"\bcontent\s*=", op.sql, re.IGNORECASE):
+                            conn.execute(f"INSERT INTO {_quote(op.target)}({_quote(op.target)}) VALUES ('rebuild');")
+                    else:
+                        conn.execute(op.sql)
+            violations = conn.execute("PRAGMA foreign_key_check;").fetchall() if foreign_keys else []
+            if violations:
+                raise sqlite3.IntegrityError(
+                    f"a migração viola {len(violations)} chave(s) estrangeira(s) (ex.: tabela {violations[0][0]})"
+                )
+            result.duration_ms = (time.perf_counter() - started) * 1000
+            conn.execute(
+                f"INSERT OR REPLACE INTO {MIGRATIONS_TABLE} (version, checksum, description, operations, "
+                "rebuilt_tables, duration_ms) VALUES (?, ?, ?, ?, ?, ?);",
+                (version, plan.checksum, description, len(plan.operations), ",".join(plan.rebuilds) or None,
+                 round(result.duration_ms, 3)),
+            )
+            conn.execute("COMMIT;")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            raise
+    finally:
+        conn.execute(f"PRAGMA foreign_keys={'ON' if foreign_keys else 'OFF'};")
+    annotate(operations=len(plan.operations), rebuilt=len(plan.rebuilds))
+    return result
+
+
+def log_progress(table: str, copied: int, total: int) -> None:
+    """Progresso padrão das reconstruções: log 'devcrew.migrations' e span do tracing."""
+    percent = 100 * copied / total if total else 100.0
+    logger.info("reconstruindo %s: %d/%d linhas (%.0f%%)", table, copied, total, percent)
+    tracer.record("migration.rebuild.progress", kind="stage", duration_ms=0.0,
+                  table=table, copied=copied, total=total)
+
@@ -0,0 +1,236 @@
+# tools/sqlite_output_encoder.py
+import json
+import os
+import sqlite3
+import textwrap
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from runtime.tracing import BYTES_PER_TOKEN, annotate, tracer
+
+# Formato padrão das saídas enviadas ao LLM
+DEFAULT_OUTPUT_FORMAT = os.getenv("DEVCREW_TOOL_OUTPUT_FORMAT", "columnar")
+# Orçamento padrão (bytes) de cada saída de tool; ~4 bytes por token
+DEFAULT_MAX_BYTES = int(os.getenv("DEVCREW_TOOL_OUTPUT_MAX_BYTES", "16000"))
+
+# Formatos: 'json' é o formato histórico (lista de objetos indentada)
+OUTPUT_FORMATS = ("json", "columnar", "tsv", "preview")
+
+# Linhas exibidas no formato 'preview'
+PREVIEW_ROWS = 10
+# Teto de linhas lidas só para calcular as estatísticas do formato 'preview'
+_SCAN_CAP = 100_000
+_FETCH_BATCH_SIZE = 500
+
+
+class EncodedResult(NamedTuple):
+    text: str
+    rows_written: int
+    rows_omitted: int
+    omitted_capped: bool
+
+
+def budget_bytes(max_bytes: Optional[int] = None, max_tokens: Optional[int] = None) -> int:
+    """Converte o orçamento informado (bytes ou tokens) em bytes."""
+    if max_tokens:
+        return max(int(max_tokens), 1) * BYTES_PER_TOKEN
+    if max_bytes:
+        return max(int(max_bytes), 1)
+    return DEFAULT_MAX_BYTES
+
+
+def iter_cursor(cursor: sqlite3.Cursor, batch_size: int = _FETCH_BATCH_SIZE) -> Iterator[Sequence[Any]]:
+    """Itera sobre o cursor com fetchmany, sem materializar o resultado inteiro."""
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield from batch
+
+
+def _tsv_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return f"<blob {len(value)}B>"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _row_encoder(fmt: str, columns: List[str]) -> Callable[[Sequence[Any]], str]:
+    if fmt == "json":
+        # Mesmo layout de json.dumps(lista, indent=2): cada objeto recuado em 2 espaços
+        return lambda row: textwrap.indent(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, indent=2, default=str), "  "
+        )
+    if fmt in ("tsv", "preview"):
+        return lambda row: "\t".join(_tsv_cell(v) for v in row)
+    return lambda row: json.dumps(list(row), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _frame(fmt: str, columns: List[str]):
+    """(abertura, separador, fechamento) do corpo em cada formato."""
+    if fmt == "json":
+        return "[\n", ",\n", "\n]"
+    if fmt in ("tsv", "preview"):
+        return "\t".join(columns) + "\n", "\n", ""
+    header = json.dumps(columns, ensure_ascii=False, separators=(",", ":"))
+    return '{"columns":' + header + ',"rows":[\n', ",\n", "\n]}"
+
+
+class _ColumnStats:
+    __slots__ = ("non_null", "nulls", "min", "max", "total", "numeric")
+
+    def __init__(self):
+        self.non_null = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.total = 0.0
+        self.numeric = True
+
+    def add(self, value: Any) -> None:
+        if value is None:
+            self.nulls += 1
+            return
+        self.non_null += 1
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.total += value
+        else:
+            self.numeric = False
+        try:
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+        except TypeError:
+            pass  # tipos mistos na mesma coluna: min/max não comparáveis
+
+    def describe(self) -> str:
+        parts = [f"não nulos={self.non_null}", f"nulos={self.nulls}"]
+        if self.non_null and self.min is not None:
+            parts.append(f"min={_short(self.min)}")
+            parts.append(f"max={_short(self.max)}")
+        if self.non_null and self.numeric:
+            parts.append(f"média={self.total / self.non_null:.4g}")
+        return ", ".join(parts)
+
+
+def _short(value: Any, limit: int = 40) -> str:
+    text = _tsv_cell(value)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def encode_rows(columns: List[str], rows: Iterable[Sequence[Any]], fmt: str = DEFAULT_OUTPUT_FORMAT,
+                max_bytes: Optional[int] = None) -> EncodedResult:
+    """
+    Codifica as linhas no formato pedido respeitando o orçamento de bytes.
+
+    As linhas são consumidas de forma incremental e a leitura para assim que o
+    orçamento acaba: o restante não é lido só para ser contado (rows_omitted fica em
+    1 e omitted_capped indica "N+"). No formato 'preview' as linhas seguem sendo lidas,
+    até um teto, para as estatísticas por coluna.
+    """
+    if fmt not in OUTPUT_FORMATS:
+        fmt = DEFAULT_OUTPUT_FORMAT
+    budget = budget_bytes(max_bytes)
+    encode = _row_encoder(fmt, columns)
+    opening, separator, closing = _frame(fmt, columns)
+
+    parts: List[str] = [opening]
+    used = len(opening.encode("utf-8")) + len(closing.encode("utf-8"))
+    written = 0
+    omitted = 0
+    capped = False
+    stats = [_ColumnStats() for _ in columns] if fmt == "preview" else None
+    row_limit = PREVIEW_ROWS if fmt == "preview" else None
+
+    iterator = iter(rows)
+    for row in iterator:
+        if stats is not None:
+            for col_stats, value in zip(stats, row):
+                col_stats.add(value)
+        if omitted or (row_limit is not None and written >= row_limit):
+            omitted += 1
+        else:
+            line = encode(row)
+            cost = len(line.encode("utf-8")) + (len(separator) if written else 0)
+            if used + cost > budget and written:
+                omitted += 1
+                if stats is None:
+                    capped = True
+                    break
+            else:
+                if written:
+                    parts.append(separator)
+                parts.append(line)
+                used += cost
+                written += 1
+                continue
+        if written + omitted >= _SCAN_CAP:
+            capped = any(True for _ in iterator)
+            break
+
+    parts.append(closing)
+    text = "".join(parts)
+
+    if stats is not None:
+        lines = [text.rstrip("\n"), "", "Estatísticas por coluna:"]
+        for name, col_stats in zip(columns, stats):
+            lines.append(f"- {name}: {col_stats.describe()}")
+        if capped:
+            lines.append(f"(estatísticas calculadas sobre as primeiras {_SCAN_CAP} linhas)")
+        text = "\n".join(lines)
+
+    return EncodedResult(text, written, omitted, capped)
+
+
+def format_query_result(cursor: sqlite3.Cursor, fmt: Optional[str] = None,
+                        max_bytes: Optional[int] = None) -> str:
+    """
+    Lê o resultado de um cursor já executado e monta a mensagem enviada ao LLM.
+
+    Usado por execute_sqlite_query e execute_any_sql no modo não paginado.
+    """
+    fmt = fmt if fmt in OUTPUT_FORMATS else DEFAULT_OUTPUT_FORMAT
+    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+    # A leitura das linhas (fetchmany) acontece durante a codificação
+    with tracer.span("encode", format=fmt) as span:
+        encoded = encode_rows(columns, iter_cursor(cursor), fmt, max_bytes)
+        span.set(rows_written=encoded.rows_written, rows_omitted=encoded.rows_omitted,
+                 bytes=len(encoded.text.encode("utf-8")))
+    annotate(rows=encoded.rows_written + encoded.rows_omitted)
+
+    if encoded.rows_written == 0:
+        return "📭 Nenhum resultado encontrado."
+
+    if fmt == "json":
+        message = f"📊 Resultado da consulta:\n\n{encoded.text}"
+    else:
+        message = f"📊 Resultado da consulta ({encoded.rows_written} linhas, formato {fmt}):\n\n{encoded.text}"
+
+    if encoded.rows_omitted:
+        total = f"{encoded.rows_omitted}+" if encoded.omitted_capped else str(encoded.rows_omitted)
+        reason = "prévia" if fmt == "preview" else f"limite de {budget_bytes(max_bytes)} bytes"
+        message += (
+            f"\n\n✂️ {total} linhas omitidas ({reason}). "
+            "Use limit/offset/cursor para paginar ou refine a consulta."
+        )
+    return message
+
+
+def truncate_text(text: str, max_bytes: Optional[int] = None) -> str:
+    """Corta um relatório textual em fronteira de linha para caber no orçamento."""
+    budget = budget_bytes(max_bytes)
+    if len(text.encode("utf-8")) <= budget:
+        return text
+    kept: List[str] = []
+    used = 0
+    lines = text.split("\n")
+    for line in lines:
+        cost = len(line.encode("utf-8")) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    return "\n".join(kept) + f"\n\n✂️ {omitted} linhas omitidas (limite de {budget} bytes)."
+
@@ -0,0 +1,301 @@
+# tools/sqlite_query_guard.py
+import contextvars
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from runtime.tracing import annotate
+
+# Política para consultas sem LIMIT que varrem tabelas grandes: 'limit' (aplica LIMIT
+# automaticamente), 'reject' (recusa com explicação) ou 'off' (desliga a análise do plano)
+GUARD_MODE = os.getenv("DEVCREW_QUERY_GUARD", "limit").lower()
+# A partir de quantas linhas (estimadas) uma tabela é considerada grande
+LARGE_TABLE_ROWS = int(os.getenv("DEVCREW_GUARD_LARGE_TABLE_ROWS", "100000"))
+# LIMIT aplicado automaticamente no modo 'limit'
+AUTO_LIMIT = int(os.getenv("DEVCREW_GUARD_AUTO_LIMIT", "1000"))
+# Orçamento de execução por consulta: tempo de relógio (s) e passos da VM (0 = sem limite)
+QUERY_TIMEOUT = float(os.getenv("DEVCREW_QUERY_TIMEOUT", "30"))
+QUERY_MAX_STEPS = int(os.getenv("DEVCREW_QUERY_MAX_STEPS", "0"))
+# O progress handler é chamado a cada N instruções da VM do SQLite
+PROGRESS_INTERVAL = 10_000
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS (\S+))?( USING (?:COVERING )?INDEX \S+)?", re.IGNORECASE)
+_TRAILING_LIMIT_RE = re.compile(r"\blimit\s+(?:\d+|\?|[:@$]\w+)(?:\s*(?:,|offset)\s*(?:\d+|\?|[:@$]\w+))?\s*;?\s*$",
+                                re.IGNORECASE)
+_SINGLE_ROW_AGGREGATE_RE = re.compile(r"^\s*select\s+(?:count|sum|avg|min|max|total)\s*\(", re.IGNORECASE)
+_GROUP_BY_RE = re.compile(r"\bgroup\s+by\b", re.IGNORECASE)
+
+
+class QueryGuardError(Exception):
+    """Erro do guarda de custo; str(e) já é a mensagem final devolvida pela tool."""
+
+
+class QueryRejected(QueryGuardError):
+    """Consulta recusada antes da execução (plano caro demais)."""
+
+
+class QueryInterrupted(QueryGuardError):
+    """Consulta interrompida durante a execução (tempo, passos da VM ou cancelamento)."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass
+class PlanAssessment:
+    """Resultado da análise do plano: SQL a executar, aviso opcional e tabelas varridas."""
+
+    sql: str
+    note: Optional[str] = None
+    large_scans: List[Tuple[str, int]] = field(default_factory=list)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def resolve_alias(conn: sqlite3.Connection, sql: str, name: str) -> str:
+    """O plano mostra o alias ('SCAN b'); procura a tabela correspondente no SQL."""
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name = ? COLLATE NOCASE;", (name,)
+    ).fetchone()
+    if row:
+        return row[0]
+    match = re.search(
+        r"(?:from|join|,)\s+[\"`\[]?(\w+)[\"`\]]?\s+(?:as\s+)?[\"`\[]?" + re.escape(name) + r"[\"`\]]?\b",
+        sql, re.IGNORECASE,
+    )
+    return match.group(1) if match else name
+
+
+def estimate_rows(conn: sqlite3.Connection, table: str) -> Optional[int]:
+    """Estimativa barata de linhas: sqlite_stat1 (ANALYZE) ou max(rowid)."""
+    try:
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1;", (table,)).fetchone()
+        if row and row[0]:
+            return int(str(row[0]).split()[0])
+    except (sqlite3.Error, ValueError):
+        pass  # sem ANALYZE
+    try:
+        row = conn.execute(f"SELECT max(rowid) FROM {_quote(table)};").fetchone()
+        return int(row[0] or 0)
+    except sqlite3.Error:
+        return None  # WITHOUT ROWID, view ou CTE materializada
+
+
+def _is_wrappable(sql: str) -> bool:
+    return sql.strip().lower().startswith(("select", "with", "values"))
+
+
+def assess_query(conn: sqlite3.Connection, sql: str, paginated: bool = False,
+                 mode: Optional[str] = None) -> PlanAssessment:
+    """
+    Analisa `EXPLAIN QUERY PLAN` antes da execução.
+
+    - Junção entre duas tabelas grandes sem índice (duas varreduras completas no
+      mesmo laço): sempre recusada, pois o custo é o produto dos tamanhos.
+    - Varredura completa de tabela grande sem LIMIT (e que não seja um agregado de
+      linha única): recebe LIMIT automático ou é recusada, conforme `mode`.
+
+    Consultas paginadas (`paginated=True`) já são limitadas pela página e só passam
+    pela verificação de junções. Lança QueryRejected quando a consulta é recusada.
+    """
+    mode = (mode or GUARD_MODE).lower()
+    base_sql = sql.strip().rstrip(";")
+    if mode == "off" or not _is_wrappable(base_sql):
+        return PlanAssessment(sql)
+
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {base_sql}").fetchall()
+    details = [str(row[3]) for row in plan]
+    compound = any(d.startswith(("COMPOUND", "UNION", "EXCEPT", "INTERSECT")) for d in details)
+
+    large_scans: List[Tuple[str, int]] = []
+    for detail in details:
+        match = _SCAN_RE.match(detail)
+        if not match or match.group(1).startswith("("):
+            continue  # SCAN CONSTANT ROW / subconsulta: sem tabela base
+        table = resolve_alias(conn, base_sql, match.group(2) or match.group(1))
+        rows = estimate_rows(conn, table)
+        if rows is not None and rows >= LARGE_TABLE_ROWS:
+            large_scans.append((table, rows))
+
+    if not large_scans:
+        return PlanAssessment(sql)
+
+    annotate(guard_large_scans=len(large_scans))
+    scans_text = ", ".join(f"`{t}` (~{r} linhas)" for t, r in large_scans)
+
+    if len(large_scans) >= 2 and not compound:
+        annotate(guard="rejected_join")
+        raise QueryRejected(
+            f"🚫 Consulta recusada pelo guarda de custo: junção com varredura completa de {scans_text}. "
+            "O custo cresce com o produto dos tamanhos. Crie um índice na coluna de junção "
+            "(CREATE INDEX ...) ou filtre as tabelas antes de juntar."
+        )
+
+    if paginated or _TRAILING_LIMIT_RE.search(base_sql):
+        return PlanAssessment(sql, large_scans=large_scans)
+    if _SINGLE_ROW_AGGREGATE_RE.match(base_sql) and not _GROUP_BY_RE.search(base_sql):
+        return PlanAssessment(sql, large_scans=large_scans)  # devolve uma única linha
+
+    if mode == "reject":
+        annotate(guard="rejected_scan")
+        raise QueryRejected(
+            f"🚫 Consulta recusada pelo guarda de custo: varredura completa de {scans_text} sem LIMIT. "
+            "Adicione um LIMIT, um filtro por coluna indexada ou use limit/cursor para paginar."
+        )
+
+    annotate(guard="auto_limit")
+    limited = f"SELECT * FROM ({base_sql}) LIMIT {AUTO_LIMIT};"
+    note = (
+        f"🛡️ LIMIT {AUTO_LIMIT} aplicado automaticamente: a consulta varre {scans_text} sem LIMIT. "
+        "Use limit/offset/cursor para paginar ou refine o filtro."
+    )
+    return PlanAssessment(limited, note, large_scans)
+
+
+# ---------------------------------------------------------------------- #
+# Orçamento de execução e cancelamento
+# ---------------------------------------------------------------------- #
+_current_scope: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("devcrew_cancel_scope",
+                                                                                 default=None)
+
+
+class _ActiveQuery:
+    __slots__ = ("conn", "scope", "deadline", "max_steps", "steps", "reason")
+
+    def __init__(self, conn: sqlite3.Connection, scope: Optional[str], deadline: Optional[float], max_steps: int):
+        self.conn = conn
+        self.scope = scope
+        self.deadline = deadline
+        self.max_steps = max_steps
+        self.steps = 0
+        self.reason: Optional[str] = None
+
+    def progress(self) -> int:
+        # Retornar valor diferente de zero aborta a instrução com "interrupted"
+        if self.reason:
+            return 1
+        self.steps += PROGRESS_INTERVAL
+        if self.max_steps and self.steps > self.max_steps:
+            self.reason = "steps"
+            return 1
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.reason = "timeout"
+            return 1
+        return 0
+
+
+class QueryGuard:
+    """
+    Limita o tempo e os passos de VM de cada consulta (set_progress_handler) e permite
+    cancelar, de outra thread, todas as consultas de um pedido (escopo de cancelamento)
+    via `Connection.interrupt()`.
+    """
+
+    def __init__(self, timeout: float = QUERY_TIMEOUT, max_steps: int = QUERY_MAX_STEPS):
+        self.timeout = timeout
+        self.max_steps = max_steps
+        self._lock = threading.Lock()
+        self._active: Dict[int, _ActiveQuery] = {}
+        self._cancelled: Set[str] = set()
+
+    # ------------------------------------------------------------------ #
+    # Escopos de cancelamento (um por pedido da UI)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def new_scope() -> str:
+        return uuid.uuid4().hex
+
+    @contextmanager
+    def cancel_scope(self, scope: Optional[str] = None) -> Iterator[str]:
+        """Associa as consultas executadas neste contexto a `scope` (cancelável por `cancel`)."""
+        scope = scope or self.new_scope()
+        token = _current_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_scope.reset(token)
+            with self._lock:
+                self._cancelled.discard(scope)
+
+    def cancel(self, scope: Optional[str]) -> int:
+        """
+        Cancela o escopo: interrompe as consultas em andamento e faz as próximas
+        consultas do mesmo pedido falharem imediatamente. Retorna quantas foram interrompidas.
+        """
+        if not scope:
+            return 0
+        with self._lock:
+            self._cancelled.add(scope)
+            interrupted = 0
+            for active in self._active.values():
+                if active.scope == scope:
+                    active.reason = "cancelled"
+                    active.conn.interrupt()
+                    interrupted += 1
+            return interrupted
+
+    def is_cancelled(self, scope: Optional[str] = None) -> bool:
+        scope = scope or _current_scope.get()
+        with self._lock:
+            return scope is not None and scope in self._cancelled
+
+    # ------------------------------------------------------------------ #
+    # Orçamento por consulta
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def budget(self, conn: sqlite3.Connection, timeout: Optional[float] = None,
+               max_steps: Optional[int] = None) -> Iterator[None]:
+        """
+        Executa o bloco com orçamento de tempo/passos. A leitura das linhas (fetch)
+        deve acontecer dentro do bloco, pois também executa a VM.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        max_steps = self.max_steps if max_steps is None else max_steps
+        scope = _current_scope.get()
+        if self.is_cancelled(scope):
+            raise QueryInterrupted("cancelled", "🚫 Consulta cancelada pelo usuário.")
+
+        deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+        active = _ActiveQuery(conn, scope, deadline, max_steps)
+        with self._lock:
+            self._active[id(active)] = active
+        conn.set_progress_handler(active.progress, PROGRESS_INTERVAL)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if active.reason is None and "interrupt" not in str(e).lower():
+                raise
+            reason = active.reason or "cancelled"
+            annotate(interrupted=reason, vm_steps=active.steps)
+            raise QueryInterrupted(reason, self._message(reason, timeout, max_steps)) from e
+        finally:
+            conn.set_progress_handler(None, 0)
+            with self._lock:
+                self._active.pop(id(active), None)
+
+    @staticmethod
+    def _message(reason: str, timeout: Optional[float], max_steps: int) -> str:
+        if reason == "timeout":
+            return (f"⚠️ Consulta interrompida: excedeu o limite de {timeout:g}s. "
+                    "Adicione filtros/LIMIT ou crie um índice para as colunas usadas.")
+        if reason == "steps":
+            return (f"⚠️ Consulta interrompida: excedeu o orçamento de {max_steps} passos da VM do SQLite. "
+                    "Adicione filtros/LIMIT ou crie um índice para as colunas usadas.")
+        return "🚫 Consulta cancelada pelo usuário."
+
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+
+# ✅ Instância global compartilhada pelas tools e pela UI
+query_guard = QueryGuard()
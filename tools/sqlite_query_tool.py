@@ -1,53 +1,109 @@
 import sqlite3
-import json
+import time
+from typing import Optional
 from crewai.tools import tool
+from runtime.tracing import traced_tool, tracer
+from tools.sqlite_connection_pool import read_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_output_encoder import format_query_result
+from tools.sqlite_query_guard import QueryGuardError, assess_query, query_guard
+from tools.sqlite_result_cache import is_cacheable_sql, result_cache
+from tools.sqlite_result_stream import PageTokenError, render_page, wants_streaming
+from tools.sqlite_workload_log import workload_log
+
+def _run_query(db_name: str, sql: str, limit: Optional[int], offset: int, cursor: Optional[str],
+               keyset_column: Optional[str], output_format: Optional[str],
+               max_bytes: Optional[int] = None) -> str:
+    """Executa a consulta e formata o resultado (sem cache)."""
+    # Conexão somente leitura do pool: em WAL, não bloqueia escritas de outras sessões
+    with read_connection(db_name) as conn:
+        streaming = wants_streaming(limit, cursor, output_format)
+        # Guarda de custo: analisa o plano antes de executar (LIMIT automático ou recusa)
+        plan = assess_query(conn, sql, paginated=streaming)
+
+        # Orçamento de tempo/passos da VM, incluindo a leitura das linhas
+        started = time.perf_counter()
+        with query_guard.budget(conn):
+            # Modo streaming: lê apenas uma página com fetchmany
+            if streaming:
+                result = render_page(sql, conn, limit, offset, cursor, keyset_column, output_format, max_bytes)
+                workload_log.record(db_name, conn, sql, (time.perf_counter() - started) * 1000)
+                return result
+
+            db_cursor = conn.cursor()
+
+            # Executa a query
+            with tracer.span("sql.execute"):
+                db_cursor.execute(plan.sql)
+
+            # Formato compacto com orçamento de bytes (linhas lidas em lotes)
+            result = format_query_result(db_cursor, output_format, max_bytes)
+
+        # Workload (forma normalizada, duração e plano) usado pelo consultor de índices
+        workload_log.record(db_name, conn, sql, (time.perf_counter() - started) * 1000)
+        if plan.note and not result.startswith("📭"):
+            result += f"\n\n{plan.note}"
+        return result
+
 
 @tool("SQLite Query Executor")
-def execute_sqlite_query(db_name: str, sql: str) -> str:
+@traced_tool("SQLite Query Executor")
+def execute_sqlite_query(
+    db_name: Optional[str] = None,
+    sql: str = "",
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    keyset_column: Optional[str] = None,
+    output_format: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> str:
     """
     Executa uma consulta SQL (SELECT) em um banco SQLite e retorna os resultados formatados.
 
     ⚠️ Apenas instruções de leitura são permitidas (SELECT, PRAGMA, etc.).
 
     Args:
-        db_name (str): Nome do arquivo do banco (ex: 'devcrew.db').
+        db_name (str, optional): Nome do arquivo do banco (ex: 'devcrew.db'). Se omitido, usa o banco ativo da sessão.
         sql (str): Instrução SQL a ser executada. Exemplo: 'SELECT * FROM users;'
+        limit (int, optional): tamanho da página. Ativa o modo streaming paginado.
+        offset (int, optional): linha inicial da página (paginação por offset).
+        cursor (str, optional): token de continuação retornado pela página anterior.
+        keyset_column (str, optional): coluna ordenável, única e não nula (ex.: id) usada para
+            paginação por keyset (mais eficiente que offset em tabelas grandes).
+        output_format (str, optional): formato da saída. Sem paginação: 'columnar' (padrão;
+            colunas uma vez + linhas como arrays), 'tsv', 'preview' (primeiras linhas +
+            estatísticas por coluna) ou 'json' (lista de objetos, formato antigo).
+            Em modo streaming: 'compact' ou 'ndjson' (um objeto por linha).
+        max_bytes (int, optional): orçamento de bytes da saída; linhas excedentes são
+            omitidas e contabilizadas no final.
 
     Returns:
         str: Resultado formatado (em tabela ou JSON) ou mensagem de erro.
     """
     try:
         # Verificações básicas
-        if not db_name.endswith(".db"):
-            db_name = f"{db_name}.db"
+        db_name = resolve_db_name(db_name)
 
         sql_lower = sql.strip().lower()
         if not sql_lower.startswith(("select", "pragma", "explain")):
             return "🚫 Somente comandos de leitura são permitidos (SELECT, PRAGMA, EXPLAIN)."
 
-        # Conecta ao banco
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-
-        # Executa a query
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-
-        # Se não houver resultados
-        if not rows:
-            conn.close()
-            return "📭 Nenhum resultado encontrado."
+        call_key = ("query", sql.strip(), limit, offset, cursor, keyset_column, output_format, max_bytes)
 
-        # Pega nomes das colunas
-        columns = [desc[0] for desc in cursor.description]
+        def run() -> str:
+            return _run_query(db_name, sql, limit, offset, cursor, keyset_column, output_format, max_bytes)
 
-        # Formata como JSON para melhor leitura no chat
-        data = [dict(zip(columns, row)) for row in rows]
-        pretty_json = json.dumps(data, ensure_ascii=False, indent=2, default=str)
+        if not is_cacheable_sql(sql):
+            return run()
 
-        conn.close()
-        return f"📊 Resultado da consulta:\n\n{pretty_json}"
+        # Consultas repetidas sobre o mesmo estado do banco são servidas pelo cache
+        return result_cache.get_or_compute(db_name, call_key, run)
 
+    except PageTokenError as e:
+        return f"⚠️ Cursor inválido: {e}"
+    except QueryGuardError as e:
+        return str(e)
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
     except Exception as e:
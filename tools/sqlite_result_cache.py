@@ -0,0 +1,240 @@
+# tools/sqlite_result_cache.py
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from runtime.tracing import annotate
+from tools.sqlite_connection_pool import resolve_db_path
+
+# Configuração do cache de resultados das tools de leitura
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("DEVCREW_TOOL_CACHE_MAX_ENTRIES", "512"))
+TOOL_CACHE_MAX_BYTES = int(os.getenv("DEVCREW_TOOL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TOOL_CACHE_TTL = float(os.getenv("DEVCREW_TOOL_CACHE_TTL", "300"))
+
+Fingerprint = Tuple[int, int]
+
+# Funções cujo resultado muda a cada execução: consultas com elas nunca vão para o cache
+_NON_DETERMINISTIC_MARKERS = (
+    "random(", "randomblob(", "'now'", "current_timestamp", "current_time",
+    "current_date", "changes(", "last_insert_rowid(", "total_changes(",
+)
+
+
+def is_cacheable_sql(sql: str) -> bool:
+    """Indica se o resultado de uma instrução de leitura pode ser reaproveitado."""
+    sql_lower = sql.strip().lower()
+    if sql_lower.startswith("pragma") and "=" in sql_lower:
+        return False  # PRAGMA com atribuição altera configurações
+    return not any(marker in sql_lower for marker in _NON_DETERMINISTIC_MARKERS)
+
+
+class LRUTTLCache:
+    """
+    Cache LRU com expiração por TTL e limites de entradas e de tamanho (bytes).
+
+    Thread-safe. O tamanho de cada valor é estimado por len() (strings) ou informado
+    pelo chamador.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at, _ = item
+            if expires_at < time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        size = size if size is not None else (len(value) if hasattr(value, "__len__") else 1)
+        if size > self.max_bytes:
+            return  # valor maior que o cache inteiro: não vale a pena guardar
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove as entradas cujas chaves satisfazem `predicate`. Retorna quantas foram removidas."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for key in keys:
+                self._pop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _pop(self, key: Hashable) -> None:
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class _FingerprintMonitor:
+    """
+    Conexões dedicadas (uma por banco) usadas apenas para ler
+    `PRAGMA schema_version` e `PRAGMA data_version`.
+
+    data_version só é comparável dentro da mesma conexão: ele muda sempre que
+    *outra* conexão (deste ou de outro processo) faz commit. Por isso o monitor
+    nunca escreve e é separado das conexões do pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conns: Dict[str, sqlite3.Connection] = {}
+
+    def fingerprint(self, path: str) -> Optional[Fingerprint]:
+        if path == ":memory:" or not os.path.exists(path):
+            return None
+        with self._lock:
+            conn = self._conns.get(path)
+            if conn is None:
+                conn = sqlite3.connect(path, check_same_thread=False)
+                self._conns[path] = conn
+            (schema_version,) = conn.execute("PRAGMA schema_version;").fetchone()
+            (data_version,) = conn.execute("PRAGMA data_version;").fetchone()
+            return schema_version, data_version
+
+    def known_paths(self) -> List[str]:
+        with self._lock:
+            return list(self._conns)
+
+    def forget(self, path: str) -> None:
+        """Fecha a conexão do banco (necessário quando o arquivo é substituído)."""
+        with self._lock:
+            conn = self._conns.pop(path, None)
+        if conn is not None:
+            conn.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns.clear()
+
+
+class SQLiteResultCache:
+    """
+    Cache dos resultados das tools somente leitura (consultas e análise do banco).
+
+    Chave: (caminho do banco, chave da chamada, impressão digital do banco). Qualquer
+    commit no arquivo altera a impressão digital e, portanto, torna as entradas
+    antigas inalcançáveis; as tools de escrita ainda chamam `notify_write` para
+    liberar a memória imediatamente e avisar os ouvintes (ex.: cache de prompts).
+    """
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+                 max_bytes: int = TOOL_CACHE_MAX_BYTES, ttl: float = TOOL_CACHE_TTL):
+        self.cache = LRUTTLCache(max_entries, max_bytes, ttl)
+        self._monitor = _FingerprintMonitor()
+        self._listeners: List[Callable[[str], None]] = []
+        self._write_counter = 0
+        self._counter_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Impressões digitais
+    # ------------------------------------------------------------------ #
+    def fingerprint(self, db_name: str) -> Optional[Fingerprint]:
+        return self._monitor.fingerprint(resolve_db_path(db_name))
+
+    def known_databases(self) -> List[str]:
+        return self._monitor.known_paths()
+
+    @property
+    def write_counter(self) -> int:
+        """Contador global de escritas (útil para saber se houve escrita durante uma execução)."""
+        return self._write_counter
+
+    # ------------------------------------------------------------------ #
+    # Leitura com cache
+    # ------------------------------------------------------------------ #
+    def get_or_compute(self, db_name: str, call_key: Hashable, compute: Callable[[], str]) -> str:
+        """
+        Retorna o resultado em cache para `call_key` ou executa `compute()`.
+        Mensagens de erro/aviso (iniciadas por ⚠️ ou 🚫) nunca são guardadas.
+        """
+        path = resolve_db_path(db_name)
+        fingerprint = self._monitor.fingerprint(path)
+        if fingerprint is None:
+            return compute()
+
+        key = (path, call_key, fingerprint)
+        cached = self.cache.get(key)
+        if cached is not None:
+            annotate(cache="hit")
+            return cached
+
+        annotate(cache="miss")
+        result = compute()
+        # Só guarda se o banco não mudou durante a execução (evita associar um
+        # resultado antigo a uma impressão digital nova)
+        if (isinstance(result, str) and not result.startswith(("⚠️", "🚫"))
+                and self._monitor.fingerprint(path) == fingerprint):
+            self.cache.put(key, result)
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Invalidação
+    # ------------------------------------------------------------------ #
+    def add_write_listener(self, listener: Callable[[str], None]) -> None:
+        """Registra uma função chamada com o caminho do banco a cada escrita."""
+        self._listeners.append(listener)
+
+    def notify_write(self, db_name: str, replaced: bool = False) -> None:
+        """
+        Deve ser chamado pelas tools de escrita após alterar o banco. Com replaced=True
+        (arquivo substituído por outro), a conexão de impressão digital é reaberta.
+        """
+        path = resolve_db_path(db_name)
+        if replaced:
+            self._monitor.forget(path)
+        with self._counter_lock:
+            self._write_counter += 1
+        self.cache.invalidate(lambda key: key[0] == path)
+        for listener in list(self._listeners):
+            listener(path)
+
+    def close(self) -> None:
+        self._monitor.close_all()
+
+
+# ✅ Instância global compartilhada por todas as Tools
+result_cache = SQLiteResultCache()
+atexit.register(result_cache.close)
@@ -0,0 +1,213 @@
+# tools/sqlite_result_stream.py
+import base64
+import hashlib
+import io
+import json
+import sqlite3
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from runtime.tracing import annotate
+from tools.sqlite_output_encoder import budget_bytes
+
+# Tamanho padrão de página quando o modo streaming é ativado sem 'limit'
+DEFAULT_PAGE_SIZE = 200
+# Limite máximo de linhas por página (protege o contexto do LLM)
+MAX_PAGE_SIZE = 5000
+# Quantidade de linhas lidas por chamada a fetchmany
+FETCH_BATCH_SIZE = 500
+
+STREAM_FORMATS = ("compact", "ndjson")
+
+
+class PageTokenError(ValueError):
+    """Token de continuação inválido ou pertencente a outra consulta."""
+
+
+def _sql_fingerprint(sql: str) -> str:
+    normalized = " ".join(sql.strip().rstrip(";").split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_page_token(sql: str, offset: Optional[int] = None,
+                      keyset_column: Optional[str] = None, last_key: Any = None) -> str:
+    """Gera o token de continuação (base64) da próxima página de `sql`."""
+    payload = {"h": _sql_fingerprint(sql)}
+    if keyset_column:
+        payload["c"] = keyset_column
+        payload["k"] = last_key
+    else:
+        payload["o"] = offset or 0
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str, sql: str) -> dict:
+    """Decodifica um token e confere se ele pertence à mesma consulta."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise PageTokenError(f"token de continuação inválido: {e}")
+    if payload.get("h") != _sql_fingerprint(sql):
+        raise PageTokenError("o token de continuação pertence a outra consulta")
+    return payload
+
+
+def wants_streaming(limit: Optional[int], cursor: Optional[str], output_format: str) -> bool:
+    """O modo streaming é usado sempre que houver paginação ou formato compacto."""
+    return limit is not None or bool(cursor) or output_format in STREAM_FORMATS
+
+
+def _is_wrappable(sql: str) -> bool:
+    # PRAGMA/EXPLAIN não podem ser usados como subconsulta
+    head = sql.strip().lower()
+    return head.startswith(("select", "with", "values"))
+
+
+def iter_page(conn: sqlite3.Connection, sql: str, limit: int, offset: int = 0,
+              keyset_column: Optional[str] = None, last_key: Any = None,
+              batch_size: int = FETCH_BATCH_SIZE) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+    """
+    Executa `sql` e devolve (colunas, iterador de linhas) limitado a `limit` + 1 linhas.
+
+    A linha extra serve apenas para saber se existe próxima página. A leitura é feita
+    com fetchmany em lotes, mantendo o uso de memória constante.
+    """
+    base_sql = sql.strip().rstrip(";")
+    cursor = conn.cursor()
+    skip = 0
+
+    if _is_wrappable(base_sql):
+        if keyset_column:
+            col = '"' + keyset_column.replace('"', '""') + '"'
+            if last_key is None:
+                cursor.execute(f"SELECT * FROM ({base_sql}) ORDER BY {col} LIMIT ?;", (limit + 1,))
+            else:
+                cursor.execute(
+                    f"SELECT * FROM ({base_sql}) WHERE {col} > ? ORDER BY {col} LIMIT ?;",
+                    (last_key, limit + 1),
+                )
+        else:
+            cursor.execute(f"SELECT * FROM ({base_sql}) LIMIT ? OFFSET ?;", (limit + 1, offset))
+    else:
+        # Sem subconsulta possível: pula o offset no próprio cursor
+        cursor.execute(base_sql)
+        skip = offset
+
+    columns = [d[0] for d in cursor.description] if cursor.description else []
+
+    def rows() -> Iterator[Sequence[Any]]:
+        remaining_skip = skip
+        remaining = limit + 1
+        while remaining > 0:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                if remaining_skip:
+                    remaining_skip -= 1
+                    continue
+                yield row
+                remaining -= 1
+                if remaining == 0:
+                    break
+        cursor.close()
+
+    return columns, rows()
+
+
+def render_page(sql: str, conn: sqlite3.Connection, limit: Optional[int] = None, offset: int = 0,
+                cursor: Optional[str] = None, keyset_column: Optional[str] = None,
+                output_format: str = "compact", max_bytes: Optional[int] = None) -> str:
+    """
+    Lê uma página da consulta e a formata de forma compacta.
+
+    Formatos:
+        - compact: cabeçalho com as colunas uma única vez e cada linha como array JSON.
+        - ndjson: um objeto JSON por linha.
+
+    A página também respeita o orçamento de bytes (`max_bytes`): se ele acabar antes
+    de `limit` linhas, a página é encerrada e o cursor aponta para a linha seguinte.
+    Ao final, inclui o token 'cursor' para solicitar a próxima página (quando houver).
+    """
+    if output_format not in STREAM_FORMATS:
+        output_format = "compact"
+
+    page_size = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    offset = max(int(offset or 0), 0)
+    last_key = None
+
+    if cursor:
+        payload = decode_page_token(cursor, sql)
+        if "c" in payload:
+            keyset_column = payload["c"]
+            last_key = payload.get("k")
+        else:
+            offset = int(payload.get("o", 0))
+
+    columns, rows = iter_page(conn, sql, page_size, offset, keyset_column, last_key)
+
+    key_index = columns.index(keyset_column) if keyset_column and keyset_column in columns else None
+    budget = budget_bytes(max_bytes)
+    buf = io.StringIO()
+    used = 0
+    count = 0
+    has_more = False
+    cut_by_budget = False
+    last_row: Optional[Sequence[Any]] = None
+    next_row: Optional[Sequence[Any]] = None
+
+    if output_format == "compact":
+        buf.write(json.dumps({"columns": columns}, ensure_ascii=False))
+        buf.write("\n")
+
+    for row in rows:
+        if count == page_size:
+            has_more = True
+            next_row = row
+            break
+        if output_format == "ndjson":
+            line = json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str)
+        else:
+            line = json.dumps(list(row), ensure_ascii=False, default=str)
+        cost = len(line.encode("utf-8")) + 1
+        if count and used + cost > budget:
+            has_more = True
+            cut_by_budget = True
+            next_row = row
+            break
+        buf.write(line)
+        buf.write("\n")
+        used += cost
+        last_row = row
+        count += 1
+
+    annotate(rows=count, page_cut_by_budget=cut_by_budget)
+    if count == 0:
+        return "📭 Nenhum resultado encontrado."
+
+    start = offset if key_index is None else None
+    header = f"📊 Resultado da consulta ({count} linhas"
+    header += f", offset {start})" if start is not None else ", keyset)"
+    parts = [header, "", buf.getvalue().rstrip("\n")]
+
+    if has_more:
+        if cut_by_budget:
+            parts += ["", f"✂️ Página encerrada pelo limite de {budget} bytes."]
+        if keyset_column and key_index is not None:
+            last_key = last_row[key_index]
+            # 'col > último valor' pularia as linhas seguintes com o mesmo valor (e NULL nunca
+            # é maior que nada): a coluna do keyset precisa ser única na fronteira da página
+            if last_key is None or next_row[key_index] == last_key:
+                parts += ["", f"⚠️ Há mais resultados, mas '{keyset_column}' tem valores repetidos ou NULL "
+                              "e não serve para paginação por keyset. Use uma coluna única e não nula "
+                              "(ex.: id/rowid) em keyset_column ou pagine por offset."]
+                return "\n".join(parts)
+            token = encode_page_token(sql, keyset_column=keyset_column, last_key=last_key)
+        else:
+            token = encode_page_token(sql, offset=offset + count)
+        parts += ["", f"➡️ Há mais resultados. Para a próxima página use cursor='{token}'"]
+    else:
+        parts += ["", "✅ Fim dos resultados."]
+
+    return "\n".join(parts)
@@ -0,0 +1,121 @@
+# tools/sqlite_schema_cache.py
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from tools.sqlite_connection_pool import resolve_db_path
+
+# (cid, name, type, notnull, dflt_value, pk) — mesmo formato de PRAGMA table_info
+ColumnInfo = Tuple[int, str, str, int, object, int]
+# (nome do índice, unique, colunas indexadas)
+IndexInfo = Tuple[str, bool, List[str]]
+
+
+class _DbSchema:
+    __slots__ = ("token", "tables", "columns", "indexes")
+
+    def __init__(self, token: Tuple):
+        self.token = token
+        self.tables: Optional[List[str]] = None
+        self.columns: Dict[str, List[ColumnInfo]] = {}
+        self.indexes: Dict[str, List[IndexInfo]] = {}
+
+
+class SQLiteSchemaCache:
+    """
+    Cache em memória dos metadados do catálogo (tabelas e colunas) por banco.
+
+    A validade de cada entrada é conferida com `PRAGMA schema_version` (leitura do
+    cabeçalho do arquivo, sem consultar o catálogo) e com a identidade do arquivo
+    (inode), de modo que qualquer DDL — feito por esta ou por outra conexão — ou a
+    substituição do arquivo invalida automaticamente os metadados em cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _DbSchema] = {}
+
+    @staticmethod
+    def _token(conn: sqlite3.Connection, path: str) -> Tuple:
+        (schema_version,) = conn.execute("PRAGMA schema_version;").fetchone()
+        try:
+            inode = os.stat(path).st_ino
+        except OSError:
+            inode = None
+        return schema_version, inode
+
+    def _entry(self, conn: sqlite3.Connection, db_name: str) -> _DbSchema:
+        path = resolve_db_path(db_name)
+        token = self._token(conn, path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.token != token:
+                entry = _DbSchema(token)
+                self._entries[path] = entry
+            return entry
+
+    # ------------------------------------------------------------------ #
+    # Consultas
+    # ------------------------------------------------------------------ #
+    def list_tables(self, conn: sqlite3.Connection, db_name: str) -> List[str]:
+        """Nomes das tabelas do banco (na ordem de sqlite_master)."""
+        entry = self._entry(conn, db_name)
+        if entry.tables is None:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+            entry.tables = [name for (name,) in rows]
+        return list(entry.tables)
+
+    def table_exists(self, conn: sqlite3.Connection, db_name: str, table_name: str) -> bool:
+        wanted = table_name.lower()
+        return any(name.lower() == wanted for name in self.list_tables(conn, db_name))
+
+    def table_columns(self, conn: sqlite3.Connection, db_name: str, table_name: str) -> List[ColumnInfo]:
+        """Resultado de `PRAGMA table_info` da tabela (lista vazia se ela não existir)."""
+        entry = self._entry(conn, db_name)
+        key = table_name.lower()
+        columns = entry.columns.get(key)
+        if columns is None:
+            quoted = '"' + table_name.replace('"', '""') + '"'
+            columns = [tuple(col) for col in conn.execute(f"PRAGMA table_info({quoted});").fetchall()]
+            entry.columns[key] = columns
+        return list(columns)
+
+    def column_names(self, conn: sqlite3.Connection, db_name: str, table_name: str) -> List[str]:
+        return [col[1] for col in self.table_columns(conn, db_name, table_name)]
+
+    def table_indexes(self, conn: sqlite3.Connection, db_name: str, table_name: str) -> List[IndexInfo]:
+        """Índices da tabela (PRAGMA index_list + index_info)."""
+        entry = self._entry(conn, db_name)
+        key = table_name.lower()
+        indexes = entry.indexes.get(key)
+        if indexes is None:
+            quoted = '"' + table_name.replace('"', '""') + '"'
+            indexes = []
+            for row in conn.execute(f"PRAGMA index_list({quoted});").fetchall():
+                index_name, unique = row[1], bool(row[2])
+                quoted_idx = '"' + index_name.replace('"', '""') + '"'
+                cols = [info[2] or "<expr>" for info in conn.execute(f"PRAGMA index_info({quoted_idx});").fetchall()]
+                indexes.append((index_name, unique, cols))
+            entry.indexes[key] = indexes
+        return list(indexes)
+
+    # ------------------------------------------------------------------ #
+    # Invalidação
+    # ------------------------------------------------------------------ #
+    def invalidate(self, db_name: Optional[str] = None) -> None:
+        """Descarta os metadados de um banco (ou de todos, se db_name for None)."""
+        with self._lock:
+            if db_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(resolve_db_path(db_name), None)
+
+    def refresh(self, conn: sqlite3.Connection, db_name: str) -> List[str]:
+        """Invalida e recarrega a lista de tabelas (usado após DDL)."""
+        self.invalidate(db_name)
+        return self.list_tables(conn, db_name)
+
+
+# ✅ Instância global compartilhada por todas as Tools
+schema_cache = SQLiteSchemaCache()
@@ -0,0 +1,324 @@
+# tools/sqlite_statement_engine.py
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Union
+
+from runtime.tracing import annotate, text_attrs, tracer
+from tools.sqlite_output_encoder import budget_bytes, encode_rows, iter_cursor
+
+# Ações do authorizer que apenas leem dados (SQLITE_RECURSIVE = 33 nem sempre é exportado)
+_READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+}
+_READ_KEYWORDS = ("select", "values", "explain")
+_TRANSACTION_KEYWORDS = ("begin", "commit", "end", "rollback", "savepoint", "release")
+_DML_KEYWORDS = ("insert", "update", "delete", "replace")
+_COMMENTS_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_PRAGMA_RE = re.compile(r"^\s*pragma\s+(?:[\w\"`\[\]]+\s*\.\s*)?[\"`\[]?(\w+)[\"`\]]?\s*([(=])?", re.IGNORECASE)
+# PRAGMAs que recebem argumento entre parênteses mas apenas consultam
+_PRAGMA_READ_CALLS = {
+    "table_info", "table_xinfo", "table_list", "index_info", "index_xinfo", "index_list",
+    "foreign_key_list", "foreign_key_check", "integrity_check", "quick_check",
+}
+# PRAGMAs sem argumento que alteram o banco (ou o estado da conexão)
+_PRAGMA_SIDE_EFFECTS = {"optimize", "wal_checkpoint", "incremental_vacuum", "shrink_memory"}
+
+Params = Union[None, str, dict, list, tuple]
+
+
+class StatementError(Exception):
+    """Falha de uma instrução do script; a transação em curso foi desfeita."""
+
+    def __init__(self, index: int, total: int, sql: str, error: Exception, rolled_back: bool):
+        # rolled_back=False: parte do script já tinha sido confirmada antes da falha
+        super().__init__(str(error))
+        self.index = index
+        self.total = total
+        self.sql = sql
+        self.error = error
+        self.rolled_back = rolled_back
+
+
+@dataclass
+class StatementResult:
+    index: int
+    sql: str
+    kind: str  # 'rows' (result set), 'write' (DML), 'ok' (DDL/PRAGMA/outros)
+    rowcount: Optional[int] = None
+    columns: List[str] = field(default_factory=list)
+    text: str = ""
+    rows_written: int = 0
+    rows_omitted: int = 0
+    omitted_capped: bool = False
+    elapsed_ms: float = 0.0
+    outside_transaction: bool = False
+
+
+@dataclass
+class ScriptResult:
+    statements: List[StatementResult]
+    transactional: bool
+    changed_data: bool
+    changed_schema: bool
+
+
+def _strip_comments(sql: str) -> str:
+    return _COMMENTS_RE.sub("", sql).strip()
+
+
+def first_keyword(sql: str) -> str:
+    stripped = _strip_comments(sql).lstrip("(").lower()
+    match = re.match(r"[a-z]+", stripped)
+    return match.group(0) if match else ""
+
+
+def split_statements(script: str) -> List[str]:
+    """
+    Divide um script em instruções usando `sqlite3.complete_statement`.
+
+    Pontos e vírgulas dentro de strings, comentários e corpos de TRIGGER não quebram
+    a instrução. Instruções vazias ou só com comentários são descartadas; o trecho
+    final sem ';' é tratado como uma última instrução.
+    """
+    statements: List[str] = []
+    buffer = ""
+    for piece in script.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if _strip_comments(buffer).strip(" \t\r\n;"):
+                statements.append(buffer.strip())
+            buffer = ""
+    # O split adiciona um ';' após o último trecho: remove-o se sobrou texto incompleto
+    rest = buffer[:-1].strip()
+    if rest and _strip_comments(rest).strip(" \t\r\n;"):
+        statements.append(rest)
+    return statements
+
+
+def is_pragma_write(sql: str) -> bool:
+    """
+    PRAGMA que altera algo: atribuição (`pragma x = v`), forma de chamada com valor
+    (`pragma user_version(5)`, `pragma journal_mode(delete)`) ou PRAGMA com efeito
+    colateral conhecido (optimize, wal_checkpoint, ...).
+    """
+    match = _PRAGMA_RE.match(_strip_comments(sql))
+    if not match:
+        return False
+    name, operator = match.group(1).lower(), match.group(2)
+    if operator == "=" or name in _PRAGMA_SIDE_EFFECTS:
+        return True
+    return operator == "(" and name not in _PRAGMA_READ_CALLS
+
+
+def is_read_only(conn: sqlite3.Connection, sql: str) -> bool:
+    """
+    Indica se a instrução apenas lê dados.
+
+    Compila `EXPLAIN <sql>` com um authorizer que registra as ações pedidas pelo
+    SQLite (nada é executado), o que classifica corretamente `WITH ... SELECT` como
+    leitura e `WITH ... INSERT` como escrita. PRAGMA é leitura quando não altera nada
+    (ver `is_pragma_write`).
+    """
+    keyword = first_keyword(sql)
+    if keyword == "explain":
+        return True
+    if keyword == "pragma":
+        return not is_pragma_write(sql)
+    if keyword not in _READ_KEYWORDS + ("with",):
+        return False
+
+    actions: List[int] = []
+
+    def authorizer(action: int, *_: Any) -> int:
+        actions.append(action)
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        conn.execute(f"EXPLAIN {sql.strip().rstrip(';')}").fetchall()
+    except sqlite3.Error:
+        return keyword in _READ_KEYWORDS  # não compila agora (ex.: tabela criada no mesmo script)
+    finally:
+        conn.set_authorizer(None)
+    return bool(actions) and all(action in _READ_ACTIONS for action in actions)
+
+
+def parse_params(params: Params) -> Optional[Union[Sequence[Any], dict, List[Any]]]:
+    """Aceita parâmetros como lista/dict ou como string JSON."""
+    if params is None or params == "":
+        return None
+    if isinstance(params, str):
+        params = json.loads(params)
+    if isinstance(params, (list, tuple, dict)):
+        return params
+    raise ValueError("'params' deve ser uma lista, um objeto ou um JSON equivalente")
+
+
+def is_many(params: Any) -> bool:
+    """Lista de conjuntos de parâmetros (executemany) em vez de um único conjunto."""
+    return isinstance(params, (list, tuple)) and bool(params) and all(
+        isinstance(p, (list, tuple, dict)) for p in params
+    )
+
+
+def _needs_autocommit(sql: str) -> bool:
+    # Não funcionam (ou não têm efeito) dentro de uma transação
+    keyword = first_keyword(sql)
+    return keyword == "vacuum" or (keyword == "pragma" and is_pragma_write(sql))
+
+
+def _preview(sql: str, limit: int = 80) -> str:
+    text = " ".join(_strip_comments(sql).split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+class StatementEngine:
+    """
+    Executa scripts instrução por instrução em uma única transação explícita.
+
+    - Cada instrução é preparada uma vez (cache de statements da conexão) e gera
+      seu próprio resultado: linhas afetadas (DML) ou conjunto de resultados.
+    - Qualquer erro desfaz a transação inteira (nada é aplicado).
+    - Parâmetros podem ser ligados a uma instrução; uma lista de conjuntos usa
+      executemany, reaproveitando a mesma instrução preparada.
+    - Scripts com controle de transação próprio (BEGIN/COMMIT/SAVEPOINT...) são
+      executados como escritos, sem a transação externa. VACUUM e PRAGMA com
+      atribuição rodam fora da transação (antes/depois dela).
+    """
+
+    def run(self, conn: sqlite3.Connection, statements: List[str], params: Params = None,
+            output_format: Optional[str] = None, max_bytes: Optional[int] = None) -> ScriptResult:
+        bound = parse_params(params)
+        if bound is not None and len(statements) != 1:
+            raise ValueError("'params' só pode ser usado com uma única instrução")
+
+        manual = any(first_keyword(s) in _TRANSACTION_KEYWORDS for s in statements)
+        total = len(statements)
+        # Orçamento de saída dividido entre as instruções que devolvem linhas
+        per_statement_bytes = max(budget_bytes(max_bytes) // max(total, 1), 512)
+        schema_before = conn.execute("PRAGMA schema_version;").fetchone()[0]
+        changes_before = conn.total_changes
+        results: List[StatementResult] = []
+        in_transaction = False
+        committed_any = False
+
+        if conn.in_transaction:
+            conn.commit()  # não mistura o script com uma transação pendente da conexão
+
+        try:
+            for index, sql in enumerate(statements, 1):
+                outside = manual or _needs_autocommit(sql)
+                if outside and in_transaction:
+                    conn.commit()
+                    in_transaction = False
+                    committed_any = True
+                elif not outside and not in_transaction:
+                    conn.execute("BEGIN;")
+                    in_transaction = True
+                try:
+                    results.append(self._execute(conn, index, sql, bound, output_format, per_statement_bytes))
+                except sqlite3.Error as e:
+                    # Interrupção (tempo, passos ou cancelamento de query_guard.budget): repassa
+                    # sem embrulhar para o guarda convertê-la em QueryInterrupted
+                    if isinstance(e, sqlite3.OperationalError) and "interrupt" in str(e).lower():
+                        raise
+                    raise StatementError(index, total, sql, e, rolled_back=not committed_any)
+                results[-1].outside_transaction = outside
+                committed_any = committed_any or outside
+            # No modo manual o Python pode ter aberto uma transação implícita (DML)
+            if in_transaction or conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+        schema_after = conn.execute("PRAGMA schema_version;").fetchone()[0]
+        annotate(statements=total, manual_transaction=manual)
+        return ScriptResult(
+            statements=results,
+            transactional=not manual,
+            changed_data=conn.total_changes != changes_before,
+            changed_schema=schema_after != schema_before,
+        )
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, index: int, sql: str, params: Any,
+                 output_format: Optional[str], max_bytes: int) -> StatementResult:
+        started = time.perf_counter()
+        changes_before = conn.total_changes
+        cursor = conn.cursor()
+        try:
+            with tracer.span("sql.statement", index=index, keyword=first_keyword(sql), **text_attrs("sql", sql)):
+                if params is not None and is_many(params):
+                    cursor.executemany(sql, params)
+                elif params is not None:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+
+                if cursor.description is not None:
+                    columns = [d[0] for d in cursor.description]
+                    # Lê o resultado antes da próxima instrução (o cursor é descartado)
+                    encoded = encode_rows(columns, iter_cursor(cursor), output_format, max_bytes)
+                    return StatementResult(
+                        index, sql, "rows", columns=columns, text=encoded.text,
+                        rows_written=encoded.rows_written, rows_omitted=encoded.rows_omitted,
+                        omitted_capped=encoded.omitted_capped,
+                        elapsed_ms=(time.perf_counter() - started) * 1000,
+                    )
+
+                keyword = first_keyword(sql)
+                # rowcount é -1 para DML iniciado por WITH: usa a variação de total_changes
+                changes = conn.total_changes - changes_before
+                is_dml = keyword in _DML_KEYWORDS or (keyword == "with" and changes > 0)
+                rowcount = cursor.rowcount if cursor.rowcount >= 0 else (changes if is_dml else None)
+                return StatementResult(
+                    index, sql, "write" if is_dml else "ok",
+                    rowcount=rowcount,
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                )
+        finally:
+            cursor.close()
+
+
+def format_script_result(db_name: str, result: ScriptResult, title: Optional[str] = None) -> str:
+    """Resumo por instrução (linhas afetadas ou resultado) enviado ao LLM."""
+    total = len(result.statements)
+    mode = "em uma transação" if result.transactional else "com controle de transação do próprio script"
+    lines = [title or f"✅ {total} instrução(ões) executada(s) {mode} no banco '{db_name}'."]
+    affected = sum(s.rowcount or 0 for s in result.statements if s.kind == "write")
+    if any(s.kind == "write" for s in result.statements):
+        lines.append(f"Linhas afetadas (total): {affected}")
+
+    for s in result.statements:
+        suffix = " (fora da transação)" if s.outside_transaction and result.transactional else ""
+        if s.kind == "rows":
+            plus = "+" if s.omitted_capped else ""
+            omitted = f", {s.rows_omitted}{plus} omitidas" if s.rows_omitted else ""
+            lines.append(f"\n[{s.index}] {_preview(s.sql)} → {s.rows_written} linha(s){omitted}{suffix}")
+            if s.rows_written:
+                lines.append(s.text)
+        elif s.kind == "write":
+            count = s.rowcount if s.rowcount is not None else "N/A"
+            lines.append(f"[{s.index}] {_preview(s.sql)} → {count} linha(s) afetada(s){suffix}")
+        else:
+            lines.append(f"[{s.index}] {_preview(s.sql)} → ok{suffix}")
+    return "\n".join(lines)
+
+
+def format_statement_error(error: StatementError) -> str:
+    status = ("transação desfeita; nenhuma alteração foi aplicada" if error.rolled_back
+              else "transação atual desfeita; instruções anteriores já confirmadas permanecem")
+    return (f"⚠️ Erro na instrução {error.index}/{error.total} ({_preview(error.sql)}): "
+            f"{error.error} — {status}.")
+
+
+# ✅ Instância global
+statement_engine = StatementEngine()
@@ -1,35 +1,144 @@
 import os
 import sqlite3
+import tempfile
+import time
+from typing import List, Optional, Union
 from crewai.tools import tool  # ✅ novo sistema do CrewAI 1.x
+from runtime.tracing import traced_tool
+from tools.sqlite_bulk_loader import BulkLoadError, build_database, seed_format
+from tools.sqlite_connection_pool import replace_database, resolve_db_path, write_connection
+from tools.sqlite_memory_store import resolve_db_name
+from tools.sqlite_query_guard import QueryGuardError
+from tools.sqlite_result_cache import result_cache
+from tools.sqlite_schema_cache import schema_cache
+from tools.sqlite_statement_engine import StatementError, format_statement_error, split_statements, statement_engine
+
+
+def _parse_seeds(seed_file: Union[str, List[str], None]) -> List[str]:
+    if not seed_file:
+        return []
+    if isinstance(seed_file, str):
+        seed_file = seed_file.split(",")
+    return [os.path.expanduser(s.strip()) for s in seed_file if s and s.strip()]
+
 
 @tool("SQLite Database Creator")
-def create_sqlite_db_with_schema(db_name: str, schema_sql: str) -> str:
+@traced_tool("SQLite Database Creator")
+def create_sqlite_db_with_schema(
+    db_name: str,
+    schema_sql: str = "",
+    seed_file: Union[str, List[str], None] = None,
+    seed_table: Optional[str] = None,
+    bulk_load: Optional[bool] = None,
+    vacuum: Optional[bool] = False,
+    page_size: Optional[int] = None,
+) -> str:
     """
     Cria automaticamente um banco SQLite com o nome e o script SQL fornecidos.
 
+    Com arquivos de carga (ou bulk_load=True), o banco novo é construído no modo de
+    carga em massa: arquivo temporário com journal e fsync desligados, tabelas, carga dos dados em uma
+    transação, índices criados só depois dos dados, ANALYZE e VACUUM opcional. O arquivo
+    só aparece no lugar do banco quando está completo.
+
     Args:
-        db_name (str): nome do arquivo do banco (ex: 'devcrew.db')
-        schema_sql (str): script SQL de criação das tabelas
+        db_name (str): nome do arquivo do banco (ex: 'devcrew.db'); passa a ser o banco ativo da sessão
+        schema_sql (str): script SQL de criação das tabelas (e índices)
+        seed_file (str | list, optional): arquivo(s) de carga: dump .sql (CREATE/INSERT),
+            .csv (com cabeçalho) ou .ndjson/.jsonl, opcionalmente compactados (.gz)
+        seed_table (str, optional): tabela de destino dos arquivos CSV/NDJSON (padrão: nome do arquivo)
+        bulk_load (bool, optional): força (True) ou desliga (False) o modo de carga em massa;
+            padrão: ligado só quando há 'seed_file' (bancos existentes nunca são substituídos)
+        vacuum (bool, optional): executa VACUUM ao final da carga em massa
+        page_size (int, optional): tamanho de página do banco novo (padrão DEVCREW_BULK_PAGE_SIZE)
 
     Returns:
         str: mensagem de sucesso ou erro
     """
     try:
-        if not db_name.endswith(".db"):
-            db_name = f"{db_name}.db"
+        if not db_name or not db_name.strip():
+            return "⚠️ Informe o nome do banco a ser criado."
+        db_name = resolve_db_name(db_name)
+        schema_sql = schema_sql or ""
+        seeds = _parse_seeds(seed_file)
 
         # 🚫 Evita comandos destrutivos
         if any(word in schema_sql.lower() for word in ["drop", "delete", "alter", "truncate"]):
             return "🚫 Operações destrutivas não são permitidas."
+        statements = split_statements(schema_sql)
+        if not statements and not seeds:
+            return "⚠️ Informe o script de criação em 'schema_sql' ou um arquivo em 'seed_file'."
+
+        path = resolve_db_path(db_name)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if bulk_load is None:
+            bulk_load = bool(seeds)
+        if bulk_load:
+            if exists:
+                return (f"⚠️ O banco '{db_name}' já existe. A carga em massa só constrói bancos novos: "
+                        "use outro nome ou bulk_load=False para aplicar só o esquema.")
+            return _bulk_create(db_name, path, statements, seeds, seed_table, bool(vacuum), page_size)
+        if seeds:
+            return "⚠️ Arquivos de carga só podem ser usados na criação de um banco novo (carga em massa)."
 
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        cursor.executescript(schema_sql)
-        conn.commit()
-        conn.close()
+        # Banco existente: esquema instrução a instrução em uma única transação (tudo ou nada)
+        with write_connection(db_name) as conn:
+            try:
+                statement_engine.run(conn, statements)
+            except StatementError as se:
+                if not se.rolled_back:
+                    schema_cache.refresh(conn, db_name)
+                    result_cache.notify_write(db_name)
+                return format_statement_error(se)
+            schema_cache.refresh(conn, db_name)
+            result_cache.notify_write(db_name)
 
         return f"✅ Banco '{db_name}' criado/atualizado com sucesso!"
+    except BulkLoadError as e:
+        return str(e)
+    except QueryGuardError as e:
+        return str(e)
+    except FileExistsError as e:
+        return f"⚠️ Banco não criado: {e}."
+    except OSError as e:
+        return f"⚠️ Erro ao ler/gravar arquivo: {e}"
     except sqlite3.Error as e:
         return f"⚠️ Erro SQLite: {e}"
     except Exception as e:
         return f"⚠️ Erro inesperado: {e}"
+
+
+def _bulk_create(db_name: str, path: str, statements: List[str], seeds: List[str], seed_table: Optional[str],
+                 vacuum: bool, page_size: Optional[int]) -> str:
+    for seed in seeds:
+        seed_format(seed)  # valida a extensão antes de começar
+        if not os.path.isfile(seed):
+            return f"⚠️ Arquivo de carga não encontrado: '{seed}'."
+
+    started = time.perf_counter()
+    # Nome exclusivo no mesmo diretório (os.replace atômico); nunca reaproveita o arquivo
+    # de outra construção em andamento
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.build-", dir=os.path.dirname(path) or ".")
+    os.close(fd)
+    try:
+        result = build_database(tmp_path, statements, seeds, seed_table, page_size, vacuum)
+        # Publica o arquivo completo na vez da fila de escrita; recusa (FileExistsError) se
+        # outra operação criou o banco durante a construção
+        replace_database(db_name, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    schema_cache.invalidate(db_name)
+    result_cache.notify_write(db_name, replaced=True)
+
+    elapsed = time.perf_counter() - started
+    phases = " ".join(f"{name[:-3]}={ms / 1000:.2f}s" for name, ms in result.timings_ms.items())
+    seeds_text = f" de {', '.join(result.seeds)}" if result.seeds else ""
+    return (
+        f"✅ Banco '{db_name}' criado em carga em massa: "
+        f"{result.tables} tabela(s), {result.rows} linha(s) carregada(s){seeds_text}, "
+        f"{result.indexes} índice(s) criado(s) após a carga, ANALYZE"
+        + (" e VACUUM executados" if result.vacuumed else " executado") + ".\n"
+        f"page_size={result.page_size} tamanho={result.size_bytes} bytes tempo={elapsed:.2f}s ({phases})"
+    )
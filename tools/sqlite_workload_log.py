@@ -0,0 +1,331 @@
+# tools/sqlite_workload_log.py
+import atexit
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.sqlite_connection_pool import resolve_db_path
+from tools.sqlite_query_guard import resolve_alias
+
+# Registro do workload ligado por padrão; DEVCREW_WORKLOAD_LOG=0 desliga
+WORKLOAD_LOG_ENABLED = os.getenv("DEVCREW_WORKLOAD_LOG", "1") != "0"
+# Banco SQLite com as estatísticas agregadas por instrução normalizada
+WORKLOAD_LOG_PATH = os.getenv("DEVCREW_WORKLOAD_PATH", os.path.join("traces", "workload.db"))
+# Planos guardados em memória (por banco, impressão digital e versão do esquema)
+PLAN_CACHE_ENTRIES = 1024
+# Limites do arquivo: instruções distintas mantidas e idade máxima (dias desde a última execução)
+WORKLOAD_MAX_ENTRIES = int(os.getenv("DEVCREW_WORKLOAD_MAX_ENTRIES", "5000"))
+WORKLOAD_MAX_AGE_DAYS = float(os.getenv("DEVCREW_WORKLOAD_MAX_AGE_DAYS", "30"))
+_PRUNE_INTERVAL = 60.0
+
+# Instruções cujo plano interessa ao consultor de índices
+_PLANNED_KEYWORDS = ("select", "with", "values", "update", "delete", "insert", "replace")
+
+_COMMENTS_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_BLOB_RE = re.compile(r"\bx'[0-9a-f]*'", re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])[-+]?(?:\d+\.?\d*(?:e[-+]?\d+)?|\.\d+)\b", re.IGNORECASE)
+_PARAM_RE = re.compile(r"\?\d*|[:@$][a-z_]\w*", re.IGNORECASE)
+_IN_LIST_RE = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+_PLAN_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS (\S+))?(?: USING (COVERING )?INDEX (\S+))?",
+                           re.IGNORECASE)
+_TEMP_BTREE_RE = re.compile(r"USE TEMP B-TREE FOR (.+)$", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Forma canônica de uma instrução: sem comentários, literais e parâmetros trocados
+    por '?', listas IN (?, ?, ...) reduzidas a IN (?), minúsculas e espaços únicos.
+    Consultas que só diferem nos valores têm a mesma forma normalizada.
+    """
+    text = _COMMENTS_RE.sub(" ", sql)
+    text = _BLOB_RE.sub("?", text)
+    text = _STRING_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _SPACES_RE.sub(" ", text).strip().rstrip(";").strip().lower()
+    return _IN_LIST_RE.sub("in (?)", text)
+
+
+def sql_fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class PlanSummary:
+    """Resumo do EXPLAIN QUERY PLAN: tabelas varridas por completo e ordenações temporárias."""
+
+    details: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+    temp_btrees: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " | ".join(self.details)
+
+
+def explain_plan(conn: sqlite3.Connection, normalized: str) -> Optional[PlanSummary]:
+    """
+    Plano da instrução normalizada (parâmetros ligados a NULL). Varreduras completas
+    ('SCAN t' ou 'SCAN t USING INDEX i', que percorre o índice inteiro e ainda busca cada
+    linha na tabela) são devolvidas com o nome real da tabela, não o alias. Só 'SEARCH'
+    e 'SCAN ... USING COVERING INDEX' ficam de fora.
+    """
+    placeholders = normalized.count("?")
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {normalized}", [None] * placeholders).fetchall()
+    except sqlite3.Error:
+        return None  # instrução que depende de objetos temporários, sintaxe não suportada etc.
+    summary = PlanSummary(details=[str(row[3]) for row in rows])
+    for detail in summary.details:
+        scan = _PLAN_SCAN_RE.match(detail)
+        if scan and not scan.group(3) and not scan.group(1).startswith("("):
+            table = resolve_alias(conn, normalized, scan.group(2) or scan.group(1))
+            if table not in summary.full_scans:
+                summary.full_scans.append(table)
+        temp = _TEMP_BTREE_RE.search(detail)
+        if temp:
+            summary.temp_btrees.append(temp.group(1).strip())
+    return summary
+
+
+@dataclass
+class WorkloadEntry:
+    """Estatísticas agregadas de uma instrução normalizada em um banco."""
+
+    fingerprint: str
+    normalized_sql: str
+    calls: int
+    total_ms: float
+    max_ms: float
+    rows: int
+    plan: str
+    full_scans: List[str]
+    temp_btrees: List[str]
+    last_seen: float
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+_COLUMNS = ("db_path", "fingerprint", "normalized_sql", "calls", "total_ms", "max_ms",
+            "rows", "plan", "full_scans", "temp_btrees", "first_seen", "last_seen")
+
+
+class WorkloadLog:
+    """
+    Registro do workload SQL gerado pelos agentes.
+
+    Cada instrução executada pelas tools é normalizada e identificada por uma impressão
+    digital; chamadas, duração (total/máxima) e o plano (varreduras completas e
+    ordenações em B-tree temporária) são agregados por banco em um arquivo SQLite.
+    Só a forma normalizada é gravada (sem valores literais), e o arquivo é podado por
+    idade e número de instruções.
+
+    O plano é obtido uma única vez por instrução e versão do esquema (cache em memória)
+    e a gravação acontece em uma thread própria: o custo no caminho da consulta é a
+    normalização e, na primeira execução de cada instrução, um EXPLAIN QUERY PLAN.
+    """
+
+    def __init__(self, path: str = WORKLOAD_LOG_PATH, enabled: bool = WORKLOAD_LOG_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._plans: "OrderedDict[Tuple[str, str, int], Optional[PlanSummary]]" = OrderedDict()
+        self._failed = False
+
+    # ------------------------------------------------------------------ #
+    # Registro
+    # ------------------------------------------------------------------ #
+    def record(self, db_name: str, conn: sqlite3.Connection, sql: str, duration_ms: float,
+               rows: int = 0) -> None:
+        """Registra uma execução de `sql` em `conn` (nunca lança exceção)."""
+        if not self.enabled or self._failed or not sql or not sql.strip():
+            return
+        try:
+            normalized = normalize_sql(sql)
+            fingerprint = sql_fingerprint(normalized)
+            path = resolve_db_path(db_name)
+            plan = self._plan(conn, path, fingerprint, normalized)
+            self._enqueue((
+                path, fingerprint, normalized, float(duration_ms), int(rows or 0),
+                plan.text if plan else "",
+                ",".join(plan.full_scans) if plan else "",
+                ",".join(plan.temp_btrees) if plan else "",
+                time.time(),
+            ))
+        except Exception:
+            pass  # o registro do workload nunca deve afetar a consulta
+
+    def _plan(self, conn: sqlite3.Connection, path: str, fingerprint: str,
+              normalized: str) -> Optional[PlanSummary]:
+        if not normalized.startswith(_PLANNED_KEYWORDS):
+            return None
+        schema_version = conn.execute("PRAGMA schema_version;").fetchone()[0]
+        key = (path, fingerprint, schema_version)
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        plan = explain_plan(conn, normalized)
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > PLAN_CACHE_ENTRIES:
+                self._plans.popitem(last=False)
+        return plan
+
+    def _enqueue(self, item: Tuple) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="devcrew-workload-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(item)
+
+    # ------------------------------------------------------------------ #
+    # Gravação em segundo plano
+    # ------------------------------------------------------------------ #
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS workload ("
+            "db_path TEXT NOT NULL, fingerprint TEXT NOT NULL, normalized_sql TEXT NOT NULL, "
+            "calls INTEGER NOT NULL DEFAULT 0, total_ms REAL NOT NULL DEFAULT 0, "
+            "max_ms REAL NOT NULL DEFAULT 0, rows INTEGER NOT NULL DEFAULT 0, plan TEXT, "
+            "full_scans TEXT, temp_btrees TEXT, first_seen REAL, last_seen REAL, "
+            "PRIMARY KEY (db_path, fingerprint));"
+        )
+        # Arquivos de versões anteriores guardavam o SQL original (com valores literais)
+        if "sample_sql" in {row[1] for row in conn.execute("PRAGMA table_info(workload);")}:
+            try:
+                conn.execute("ALTER TABLE workload DROP COLUMN sample_sql;")
+            except sqlite3.Error:
+                conn.execute("UPDATE workload SET sample_sql = NULL;")  # SQLite < 3.35
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection) -> None:
+        """Remove instruções sem execução há mais de WORKLOAD_MAX_AGE_DAYS e as excedentes."""
+        if WORKLOAD_MAX_AGE_DAYS > 0:
+            conn.execute("DELETE FROM workload WHERE last_seen < ?;",
+                         (time.time() - WORKLOAD_MAX_AGE_DAYS * 86400,))
+        if WORKLOAD_MAX_ENTRIES > 0:
+            conn.execute(
+                "DELETE FROM workload WHERE rowid IN "
+                "(SELECT rowid FROM workload ORDER BY last_seen DESC LIMIT -1 OFFSET ?);",
+                (WORKLOAD_MAX_ENTRIES,),
+            )
+        conn.commit()
+
+    def _run(self) -> None:
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error):
+            self._failed = True  # destino indisponível: desliga o registro
+            return
+        pruned_at = 0.0
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    executions = [b for b in batch if b is not None]
+                    if executions:
+                        conn.executemany(
+                            "INSERT INTO workload (db_path, fingerprint, normalized_sql, calls, "
+                            "total_ms, max_ms, rows, plan, full_scans, temp_btrees, first_seen, last_seen) "
+                            "VALUES (?1, ?2, ?3, 1, ?4, ?4, ?5, ?6, ?7, ?8, ?9, ?9) "
+                            "ON CONFLICT (db_path, fingerprint) DO UPDATE SET "
+                            "calls = calls + 1, "
+                            "total_ms = total_ms + excluded.total_ms, max_ms = max(max_ms, excluded.max_ms), "
+                            "rows = rows + excluded.rows, plan = excluded.plan, "
+                            "full_scans = excluded.full_scans, temp_btrees = excluded.temp_btrees, "
+                            "last_seen = excluded.last_seen;",
+                            executions,
+                        )
+                        conn.commit()
+                    if time.monotonic() - pruned_at >= _PRUNE_INTERVAL:
+                        self._prune(conn)
+                        pruned_at = time.monotonic()
+                except sqlite3.Error:
+                    pass  # lote perdido (ex.: disco cheio); o próximo tenta de novo
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if None in batch:
+                    return
+        finally:
+            conn.close()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Aguarda (até `timeout` segundos) a gravação das execuções enfileiradas."""
+        deadline = time.monotonic() + timeout
+        while (self._queue.unfinished_tasks and self._thread is not None
+               and self._thread.is_alive() and time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ------------------------------------------------------------------ #
+    # Consulta
+    # ------------------------------------------------------------------ #
+    def entries(self, db_name: str, min_calls: int = 1, limit: Optional[int] = None) -> List[WorkloadEntry]:
+        """Instruções registradas para o banco, das que mais consumiram tempo às que menos."""
+        self.flush()
+        if not os.path.exists(self.path):
+            return []
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True, timeout=5)
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS[1:])} FROM workload WHERE db_path = ? AND calls >= ? "
+                "ORDER BY total_ms DESC LIMIT ?;",
+                (resolve_db_path(db_name), max(int(min_calls or 1), 1), -1 if limit is None else int(limit)),
+            ).fetchall()
+        except sqlite3.Error:
+            return []  # arquivo ainda sem a tabela
+        finally:
+            conn.close()
+        return [
+            WorkloadEntry(
+                fingerprint=r[0], normalized_sql=r[1], calls=r[2], total_ms=r[3],
+                max_ms=r[4], rows=r[5], plan=r[6] or "",
+                full_scans=[t for t in (r[7] or "").split(",") if t],
+                temp_btrees=[t for t in (r[8] or "").split(",") if t],
+                last_seen=r[10] or 0.0,
+            )
+            for r in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "path": self.path, "pending": self._queue.unfinished_tasks,
+                "plans_cached": len(self._plans)}
+
+
+# ✅ Instância global
+workload_log = WorkloadLog()
+atexit.register(workload_log.close)